@@ -4,6 +4,9 @@
 import gevent.monkey
 gevent.monkey.patch_all()
 
+import time
+_IMPORT_START = time.perf_counter()
+
 import logging
 import os
 import signal
@@ -14,10 +17,19 @@ from geventwebsocket.handler import WebSocketHandler
 from geventwebsocket.gunicorn.workers import GeventWebSocketWorker
 
 # --- Eigene Module ---
+# Die Konfiguration wird vor allen anderen eigenen Modulen geladen (wie in gunicorn.conf.py):
+# @log_function_call entscheidet beim Import anhand von DEBUG, ob eine Funktion gemessen wird.
+from modules.core.config_loader import load_and_parse_config
+load_and_parse_config()
+
 from modules.core.webserver_handler import app, socketio
 from modules.core.app_setup import initialize_application
 from modules.core import shared_state as g
 
+# Startzeit-Messung: Dauer aller Importe (Banner "STARTUP")
+g.startup_started_at       = _IMPORT_START
+g.startup_phases['imports'] = round((time.perf_counter() - _IMPORT_START) * 1000, 1)
+
 #----------------------------------------------------------
 
 # ====================================================
@@ -0,0 +1,108 @@
+# Backend/benchmarks/leg_end_write_latency.py
+
+# Misst die Schreib-Latenz am Leg-Ende für die Speicher-Backends (MariaDB und SQLite).
+#
+# Pro Leg wird genau das ausgeführt, was update_x01_statistic_after_leg für jeden Spieler
+# tut: DB-IDs auflösen, Leg in games_history_x01 speichern, Gesamt-Average aus den letzten
+# 100 Legs neu berechnen, commit. Gemessen wird die Zeit vom Öffnen der Verbindung bis
+# zum commit.
+#
+# Aufruf aus dem Backend-Verzeichnis:
+#   python3 -m benchmarks.leg_end_write_latency                   (beide Backends)
+#   python3 -m benchmarks.leg_end_write_latency --backend sqlite --legs 500
+#
+# Für MariaDB werden die Zugangsdaten aus config.py/.env verwendet. Die Benchmark-Spieler
+# (PLAYERS) werden am Ende samt ihrer Legs wieder gelöscht.
+# SQLite schreibt in eine temporäre Datei.
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from modules.core import shared_state as g
+from modules.core.config_loader import load_and_parse_config
+from modules.core.database_handler import (
+    get_db_connection, resolve_player_db_ids, save_leg_to_history,
+    calculate_and_update_guest_average, STAT_CONFIG
+)
+from modules.core.db_backends import close_db_backends
+from modules.core.player_stats_cache import player_stats_cache
+
+PLAYERS = [{'name': 'bench_player_1'}, {'name': 'bench_player_2'}]
+
+#----------------------------------------------------
+
+def _run_backend(backend, legs):
+    """Führt 'legs' Leg-Ende-Schreibvorgänge aus und liefert die Latenzen in ms."""
+    g.DB_BACKEND = backend
+    g.player_data_map = {}
+    player_stats_cache.clear()
+    match_id  = f"benchmark-{int(time.time())}"
+    latencies = []
+
+    for leg in range(1, legs + 1):
+        start = time.perf_counter()
+        with get_db_connection() as conn:
+            if not conn:
+                return None
+            cursor = conn.cursor(dictionary=True)
+            player_db_ids = resolve_player_db_ids(cursor, PLAYERS, game_mode='x01')
+            for player in PLAYERS:
+                player_db_id = player_db_ids[player['name'].lower()]
+                leg_stats = {'average': 55.67, 'score': 501, 'dartsThrown': 27}
+                save_leg_to_history(cursor, player_db_id, match_id, 1, leg, leg_stats, game_mode='x01')
+                calculate_and_update_guest_average(cursor, player_db_id, game_mode='x01')
+            conn.commit()
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    _cleanup()
+    return latencies
+
+#----------------------------------------------------
+
+def _cleanup():
+    """Löscht die Benchmark-Spieler (ihre Legs werden per ON DELETE CASCADE entfernt)."""
+    with get_db_connection() as conn:
+        if not conn:
+            return
+        cursor = conn.cursor(dictionary=True)
+        names = [player['name'] for player in PLAYERS]
+        cursor.execute(f"DELETE FROM {STAT_CONFIG['x01']['player_table']} WHERE name IN (%s, %s)", tuple(names))
+        conn.commit()
+
+#----------------------------------------------------
+
+def _print_result(backend, latencies):
+    if not latencies:
+        print(f"{backend:8} | keine Verbindung, übersprungen")
+        return
+    ordered = sorted(latencies)
+    p95     = ordered[int(len(ordered) * 0.95) - 1]
+    print(f"{backend:8} | {len(latencies):5} Legs | Median {statistics.median(latencies):7.2f} ms | "
+          f"p95 {p95:7.2f} ms | Max {ordered[-1]:7.2f} ms | Summe {sum(latencies):8.1f} ms")
+
+#----------------------------------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Leg-Ende Schreib-Latenz je Speicher-Backend")
+    parser.add_argument('--backend', choices=['mariadb', 'sqlite', 'all'], default='all')
+    parser.add_argument('--legs', type=int, default=200)
+    args = parser.parse_args()
+
+    load_and_parse_config()
+    g.USE_DATABASE = True
+    g.DEBUG        = 0
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        g.DB_SQLITE_PATH = os.path.join(tmp_dir, 'benchmark.db')
+
+        backends = ['mariadb', 'sqlite'] if args.backend == 'all' else [args.backend]
+        for backend in backends:
+            _print_result(backend, _run_backend(backend, args.legs))
+
+        close_db_backends()
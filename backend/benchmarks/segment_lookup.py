@@ -0,0 +1,69 @@
+# Backend/benchmarks/segment_lookup.py
+
+# Vergleicht die Segment-Bestimmung aus board_geometry.py (Ringgrenzen + Sektorwinkel, O(1))
+# mit der naiven Suche nach dem nächstgelegenen Zielpunkt aus FIELD_COORDS.
+#
+# Aufruf aus dem Backend-Verzeichnis:
+#   python3 -m benchmarks.segment_lookup                 (100.000 Darts)
+#   python3 -m benchmarks.segment_lookup --darts 1000000
+
+import argparse
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from modules.core import shared_state as g
+from modules.core.board_geometry import segment_at, classify_points
+
+FIELD_NAMES = np.array(list(g.FIELD_COORDS.keys()))
+FIELD_XY    = np.array([[p['x'], p['y']] for p in g.FIELD_COORDS.values()])
+
+#----------------------------------------------------
+
+def nearest_field_scalar(x, y):
+    """Naiv: alle Zielpunkte durchsuchen, der nächste gewinnt."""
+    return min(g.FIELD_COORDS, key=lambda name: math.hypot(g.FIELD_COORDS[name]['x'] - x, g.FIELD_COORDS[name]['y'] - y))
+
+
+def nearest_field_batch(x, y):
+    """Naiv, aber vektorisiert: Abstandsmatrix Darts x Zielpunkte."""
+    dx = x[:, None] - FIELD_XY[:, 0]
+    dy = y[:, None] - FIELD_XY[:, 1]
+    return FIELD_NAMES[np.argmin(dx * dx + dy * dy, axis=1)]
+
+#----------------------------------------------------
+
+def _measure(name, func, count):
+    start = time.perf_counter()
+    result = func()
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"{name:34} | {elapsed:9.2f} ms | {elapsed * 1000 / count:8.3f} µs/Dart")
+    return result
+
+#----------------------------------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Segment-Bestimmung: Lookup vs. nächster Nachbar")
+    parser.add_argument('--darts', type=int, default=100_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    r   = np.sqrt(rng.random(args.darts)) * 1.1 # gleichmäßig über die Fläche, etwas über den Rand hinaus
+    phi = rng.random(args.darts) * 2 * math.pi
+    x, y = r * np.sin(phi), r * np.cos(phi)
+    xs, ys = x.tolist(), y.tolist()
+
+    print(f"{args.darts} Darts, {len(g.FIELD_COORDS)} Zielpunkte")
+    naive   = _measure("nächster Nachbar (Python)",    lambda: [nearest_field_scalar(a, b) for a, b in zip(xs, ys)], args.darts)
+    lookup  = _measure("segment_at (Python)",          lambda: [segment_at(a, b) for a, b in zip(xs, ys)], args.darts)
+    naive_b = _measure("nächster Nachbar (NumPy)",     lambda: nearest_field_batch(x, y), args.darts)
+    batch   = _measure("classify_points (NumPy)",      lambda: classify_points(x, y)[0], args.darts)
+
+    # Der nächste Zielpunkt liegt oft im falschen Ring (z.B. Single statt Triple am Rand)
+    agreement = np.mean(np.asarray(naive) == np.asarray(lookup)) * 100
+    print(f"Übereinstimmung nächster Nachbar / Lookup: {agreement:.1f}%  (Batch == Einzeln: {np.array_equal(batch, np.asarray(lookup))})")
@@ -0,0 +1,59 @@
+# Backend/benchmarks/throw_analytics.py
+
+# Misst die Rechenzeit der Einzeldart-Auswertungen (throw_analytics.py) für eine große
+# Anzahl künstlicher Darts, ohne Datenbank.
+#
+# Aufruf aus dem Backend-Verzeichnis:
+#   python3 -m benchmarks.throw_analytics                 (100.000 Darts)
+#   python3 -m benchmarks.throw_analytics --darts 1000000
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
+
+from modules.core.throw_analytics import (
+    TARGET_NAMES, TARGET_XY, heatmap_cartesian, heatmap_polar, dispersion_by_target, intended_vs_hit
+)
+
+#----------------------------------------------------
+
+def _generate_darts(count, seed=42):
+    """Erzeugt Darts, normalverteilt um zufällig gewählte Zielpunkte aus FIELD_COORDS."""
+    rng     = np.random.default_rng(seed)
+    aim_idx = rng.integers(0, len(TARGET_NAMES), count)
+    xy      = TARGET_XY[aim_idx] + rng.normal(0.0, 0.05, (count, 2))
+    targets = TARGET_NAMES[aim_idx]
+
+    # Grobe Treffer-Simulation: ein Teil der Darts trifft das Ziel, der Rest ein zufälliges Segment
+    hits = np.where(rng.random(count) < 0.4, targets, TARGET_NAMES[rng.integers(0, len(TARGET_NAMES), count)])
+    return xy[:, 0], xy[:, 1], hits, targets
+
+#----------------------------------------------------
+
+def _measure(name, func, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    print(f"{name:22} | bestes {min(timings):8.2f} ms | Mittel {sum(timings) / len(timings):8.2f} ms")
+
+#----------------------------------------------------
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rechenzeit der Einzeldart-Auswertungen")
+    parser.add_argument('--darts', type=int, default=100_000)
+    args = parser.parse_args()
+
+    x, y, hits, targets = _generate_darts(args.darts)
+    print(f"{args.darts} Darts, {len(TARGET_NAMES)} Ziele")
+
+    _measure("heatmap_cartesian",    lambda: heatmap_cartesian(x, y, 40))
+    _measure("heatmap_polar",        lambda: heatmap_polar(x, y, 12))
+    _measure("dispersion_by_target", lambda: dispersion_by_target(x, y, targets))
+    _measure("intended_vs_hit",      lambda: intended_vs_hit(targets, hits))
@@ -14,13 +14,69 @@ AUTODARTS_CERT_CHECK = False
 # Steuert, ob die Datenbank für Statistiken verwendet wird.
 USE_DATABASE = True
 
+# Speicher-Backend für die Statistiken:
+#   'mariadb' = externer MariaDB/MySQL-Server (DB_USER, DB_PASSWORD, DB_HOST, DB_PORT, DB_DATABASE)
+#   'sqlite'  = lokale Datei DB_SQLITE_PATH, kein zusätzlicher Dienst nötig (empfohlen für den Raspberry Pi)
+DB_BACKEND = 'mariadb'
+DB_SQLITE_PATH = 'data/statistics.db' # relativ zum Backend-Verzeichnis
+
 DB_USER = ''
 DB_PASSWORD = ''
 DB_HOST = ''
 DB_PORT = 3306
 DB_DATABASE = ''
 
+# Prozessweiter Cache für Spieler-Statistiken (überlebt das Ende eines Matches)
+PLAYER_CACHE_MAX_ENTRIES = 256
+PLAYER_CACHE_TTL_SECONDS = 21600 # 6 Stunden
+
+# Ist die Datenbank am Leg-Ende nicht erreichbar, werden die Legs hier zwischengespeichert
+# und automatisch nachgetragen, sobald die Datenbank wieder erreichbar ist.
+LEG_SPOOL_PATH = 'data/leg_spool.ndjson' # relativ zum Backend-Verzeichnis, die Board-ID wird an den Namen angehängt
+LEG_SPOOL_REPLAY_INTERVAL = 30           # Sekunden zwischen zwei Verbindungsversuchen
+
+# Einzelne Darts (Segment + Koordinaten) werden gepuffert und am Ende jeder Aufnahme,
+# spätestens aber nach so vielen Sekunden gesammelt in 'throws_history' geschrieben.
+THROW_FLUSH_INTERVAL = 5
+
+# Der Zustand eines laufenden Matches (Spielerdaten, letztes Event) wird hier gesichert,
+# damit die Anzeigen nach einem Neustart des Backends sofort wieder den Spielstand zeigen.
+SESSION_JOURNAL_PATH = 'data/session_journal.ndjson' # relativ zum Backend-Verzeichnis, die Board-ID wird an den Namen angehängt
+
+# Pro Board darf nur ein Backend laufen (Sperrdatei data/backend-<Board-ID>.pid). Über einen
+# Status-Socket daneben meldet ein zweiter Start den Zustand der bereits laufenden Instanz.
+INSTANCE_STATUS_SOCKET = True
+
+# Log-Ausgaben werden über eine begrenzte Warteschlange im Hintergrund geschrieben. Ist sie voll,
+# werden Einträge verworfen (gezählt unter /api/metrics). Identische Warnungen und Fehler
+# (z.B. Verbindungsabbrüche) erscheinen nur einmal pro LOG_REPEAT_WINDOW Sekunden.
+LOG_QUEUE_SIZE = 10000
+LOG_REPEAT_WINDOW = 60
+
+# Die Einträge der Debug-Seiten (/api/debug, /api/debugad, /api/debugadall) werden komprimiert
+# in Segmentdateien gespeichert und überstehen einen Neustart. Pro Seite höchstens
+# DEBUG_LOG_MAX_SEGMENTS x DEBUG_LOG_SEGMENT_MB, danach werden die ältesten gelöscht.
+DEBUG_LOG_PATH = 'data/debuglog' # relativ zum Backend-Verzeichnis, die Board-ID wird an den Namen angehängt
+DEBUG_LOG_SEGMENT_MB = 4
+DEBUG_LOG_MAX_SEGMENTS = 32
+
+# Stats und Kamerazustand des Board Managers fragt ein einziger Hintergrund-Task ab (nur solange
+# eine cmd-Seite geöffnet ist) und verteilt sie an alle Seiten. Der Verlauf der letzten
+# BOARD_TELEMETRY_HISTORY Abfragen steht unter /api/board/telemetry.
+BOARD_TELEMETRY_INTERVAL_MS = 1000
+BOARD_TELEMETRY_HISTORY = 600
+
+# Die Konfiguration des Board Managers wird so viele Sekunden zwischengespeichert. Änderungen
+# (auch von außen, z.B. über die Autodarts-Oberfläche) gehen danach an die geöffneten cmd-Seiten.
+BOARD_CONFIG_TTL = 30
+
+# Antworten der Autodarts-API für Board und Match werden mit ETag/Last-Modified hier gespeichert.
+# Wiederholte Abfragen kosten so nur ein 304, und die Adresse des Board Managers steht nach
+# einem Neustart sofort zur Verfügung (sie wird im Hintergrund neu geprüft).
+AUTODARTS_HTTP_CACHE_PATH = 'data/autodarts_http_cache.json' # relativ zum Backend-Verzeichnis, die Board-ID wird an den Namen angehängt
+
 DEBUG = 0  # 0 = kein Debugging, höhere Zahlen für weitere Stufen
+           # ab 2 werden alle mit @log_function_call markierten Funktionen gemessen (/api/profile)
 
 WEBSERVER_DISABLE_HTTPS=False
 WEBSERVER_HOST_IP = '0.0.0.0'
@@ -0,0 +1,66 @@
+-- Migration für bestehende MariaDB-Datenbanken (neue Installationen enthalten dies bereits in database_schema.sql).
+-- Ergänzt die History-Tabellen um die Spalte set_number und den eindeutigen Schlüssel
+-- (player_id, match_id, set_number, leg_number), damit ein Leg nicht doppelt gespeichert werden kann
+-- (Leg-Spool, Neustart während eines Matches). Autodarts zählt die Legs in jedem Satz neu,
+-- deshalb gehört der Satz zum Schlüssel.
+--
+-- Das Backend führt diese Anweisungen beim Start selbst aus (db_backends._migrate_mariadb), für jede
+-- Tabelle, deren Schlüssel 'leg' noch ohne set_number ist. Von Hand wird die Datei nur benötigt,
+-- wenn dem Datenbank-Benutzer dafür die Rechte fehlen.
+--
+-- Ältere Legs haben keine Satznummer. Zeilen mit gleichem (player_id, match_id, leg_number):
+--   - Mit identischen Werten (Average/Punkte/Marks/Trefferquote und Darts) ist es dasselbe, doppelt
+--     gespeicherte Leg (früherer Fehler beim Neustart/Wiederverbinden). Nur die erste Zeile bleibt,
+--     sonst würde das Duplikat als erfundener weiterer Satz für immer in den Average eingehen.
+--   - Die übrigen Zeilen stammen aus verschiedenen Sätzen und werden in der Reihenfolge ihres
+--     Speicherns durchnummeriert (1, 2, ...).
+-- Zwei echte Sätze mit exakt gleichen Werten im selben Leg würden dabei zusammengefasst, das ist
+-- der seltene Preis dafür. Die Anweisungen können gefahrlos erneut ausgeführt werden.
+
+ALTER TABLE `games_history_x01` ADD COLUMN IF NOT EXISTS `set_number` int(11) NOT NULL DEFAULT 1 AFTER `match_id`;
+DELETE h FROM `games_history_x01` h JOIN `games_history_x01` d ON d.player_id = h.player_id AND d.match_id = h.match_id AND d.set_number = h.set_number AND d.leg_number = h.leg_number AND d.`leg_average` = h.`leg_average` AND d.`leg_points` = h.`leg_points` AND d.`leg_darts` = h.`leg_darts` AND d.id < h.id WHERE h.set_number = 1;
+ALTER TABLE `games_history_x01` DROP INDEX IF EXISTS `leg`;
+UPDATE `games_history_x01` h JOIN (SELECT id, ROW_NUMBER() OVER (PARTITION BY player_id, match_id, leg_number ORDER BY id) AS n FROM `games_history_x01` WHERE set_number = 1) r ON h.id = r.id SET h.set_number = r.n;
+ALTER TABLE `games_history_x01` ADD UNIQUE KEY `leg` (`player_id`,`match_id`,`set_number`,`leg_number`);
+
+ALTER TABLE `games_history_cricket` ADD COLUMN IF NOT EXISTS `set_number` int(11) NOT NULL DEFAULT 1 AFTER `match_id`;
+DELETE h FROM `games_history_cricket` h JOIN `games_history_cricket` d ON d.player_id = h.player_id AND d.match_id = h.match_id AND d.set_number = h.set_number AND d.leg_number = h.leg_number AND d.`leg_marks` = h.`leg_marks` AND d.`leg_darts` = h.`leg_darts` AND d.id < h.id WHERE h.set_number = 1;
+ALTER TABLE `games_history_cricket` DROP INDEX IF EXISTS `leg`;
+UPDATE `games_history_cricket` h JOIN (SELECT id, ROW_NUMBER() OVER (PARTITION BY player_id, match_id, leg_number ORDER BY id) AS n FROM `games_history_cricket` WHERE set_number = 1) r ON h.id = r.id SET h.set_number = r.n;
+ALTER TABLE `games_history_cricket` ADD UNIQUE KEY `leg` (`player_id`,`match_id`,`set_number`,`leg_number`);
+
+ALTER TABLE `games_history_tactics` ADD COLUMN IF NOT EXISTS `set_number` int(11) NOT NULL DEFAULT 1 AFTER `match_id`;
+DELETE h FROM `games_history_tactics` h JOIN `games_history_tactics` d ON d.player_id = h.player_id AND d.match_id = h.match_id AND d.set_number = h.set_number AND d.leg_number = h.leg_number AND d.`leg_marks` = h.`leg_marks` AND d.`leg_darts` = h.`leg_darts` AND d.id < h.id WHERE h.set_number = 1;
+ALTER TABLE `games_history_tactics` DROP INDEX IF EXISTS `leg`;
+UPDATE `games_history_tactics` h JOIN (SELECT id, ROW_NUMBER() OVER (PARTITION BY player_id, match_id, leg_number ORDER BY id) AS n FROM `games_history_tactics` WHERE set_number = 1) r ON h.id = r.id SET h.set_number = r.n;
+ALTER TABLE `games_history_tactics` ADD UNIQUE KEY `leg` (`player_id`,`match_id`,`set_number`,`leg_number`);
+
+ALTER TABLE `games_history_atc` ADD COLUMN IF NOT EXISTS `set_number` int(11) NOT NULL DEFAULT 1 AFTER `match_id`;
+DELETE h FROM `games_history_atc` h JOIN `games_history_atc` d ON d.player_id = h.player_id AND d.match_id = h.match_id AND d.set_number = h.set_number AND d.leg_number = h.leg_number AND d.`leg_hit_rate` = h.`leg_hit_rate` AND d.`leg_darts` = h.`leg_darts` AND d.id < h.id WHERE h.set_number = 1;
+ALTER TABLE `games_history_atc` DROP INDEX IF EXISTS `leg`;
+UPDATE `games_history_atc` h JOIN (SELECT id, ROW_NUMBER() OVER (PARTITION BY player_id, match_id, leg_number ORDER BY id) AS n FROM `games_history_atc` WHERE set_number = 1) r ON h.id = r.id SET h.set_number = r.n;
+ALTER TABLE `games_history_atc` ADD UNIQUE KEY `leg` (`player_id`,`match_id`,`set_number`,`leg_number`);
+
+ALTER TABLE `games_history_countup` ADD COLUMN IF NOT EXISTS `set_number` int(11) NOT NULL DEFAULT 1 AFTER `match_id`;
+DELETE h FROM `games_history_countup` h JOIN `games_history_countup` d ON d.player_id = h.player_id AND d.match_id = h.match_id AND d.set_number = h.set_number AND d.leg_number = h.leg_number AND d.`leg_points` = h.`leg_points` AND d.`leg_darts` = h.`leg_darts` AND d.id < h.id WHERE h.set_number = 1;
+ALTER TABLE `games_history_countup` DROP INDEX IF EXISTS `leg`;
+UPDATE `games_history_countup` h JOIN (SELECT id, ROW_NUMBER() OVER (PARTITION BY player_id, match_id, leg_number ORDER BY id) AS n FROM `games_history_countup` WHERE set_number = 1) r ON h.id = r.id SET h.set_number = r.n;
+ALTER TABLE `games_history_countup` ADD UNIQUE KEY `leg` (`player_id`,`match_id`,`set_number`,`leg_number`);
+
+ALTER TABLE `games_history_segment_training` ADD COLUMN IF NOT EXISTS `set_number` int(11) NOT NULL DEFAULT 1 AFTER `match_id`;
+DELETE h FROM `games_history_segment_training` h JOIN `games_history_segment_training` d ON d.player_id = h.player_id AND d.match_id = h.match_id AND d.set_number = h.set_number AND d.leg_number = h.leg_number AND d.`leg_hit_rate` = h.`leg_hit_rate` AND d.`leg_darts` = h.`leg_darts` AND d.id < h.id WHERE h.set_number = 1;
+ALTER TABLE `games_history_segment_training` DROP INDEX IF EXISTS `leg`;
+UPDATE `games_history_segment_training` h JOIN (SELECT id, ROW_NUMBER() OVER (PARTITION BY player_id, match_id, leg_number ORDER BY id) AS n FROM `games_history_segment_training` WHERE set_number = 1) r ON h.id = r.id SET h.set_number = r.n;
+ALTER TABLE `games_history_segment_training` ADD UNIQUE KEY `leg` (`player_id`,`match_id`,`set_number`,`leg_number`);
+
+-- Bereinigung für Datenbanken, die bereits mit der früheren Version dieser Migration umgestellt wurden
+-- (damals wurden auch doppelt gespeicherte Legs als Satz 2, 3, ... durchnummeriert). Die Abfragen
+-- löschen Legs, die mit identischen Werten bereits in einem niedrigeren Satz stehen. Vorher
+-- prüfen (DELETE h durch SELECT h.* ersetzen), dann die Kommentarzeichen entfernen und ausführen.
+-- Die Averages der Gäste werden beim nächsten Leg aus der bereinigten Historie neu berechnet.
+-- DELETE h FROM `games_history_x01` h JOIN `games_history_x01` d ON d.player_id = h.player_id AND d.match_id = h.match_id AND d.leg_number = h.leg_number AND d.`leg_average` = h.`leg_average` AND d.`leg_points` = h.`leg_points` AND d.`leg_darts` = h.`leg_darts` AND d.set_number < h.set_number;
+-- DELETE h FROM `games_history_cricket` h JOIN `games_history_cricket` d ON d.player_id = h.player_id AND d.match_id = h.match_id AND d.leg_number = h.leg_number AND d.`leg_marks` = h.`leg_marks` AND d.`leg_darts` = h.`leg_darts` AND d.set_number < h.set_number;
+-- DELETE h FROM `games_history_tactics` h JOIN `games_history_tactics` d ON d.player_id = h.player_id AND d.match_id = h.match_id AND d.leg_number = h.leg_number AND d.`leg_marks` = h.`leg_marks` AND d.`leg_darts` = h.`leg_darts` AND d.set_number < h.set_number;
+-- DELETE h FROM `games_history_atc` h JOIN `games_history_atc` d ON d.player_id = h.player_id AND d.match_id = h.match_id AND d.leg_number = h.leg_number AND d.`leg_hit_rate` = h.`leg_hit_rate` AND d.`leg_darts` = h.`leg_darts` AND d.set_number < h.set_number;
+-- DELETE h FROM `games_history_countup` h JOIN `games_history_countup` d ON d.player_id = h.player_id AND d.match_id = h.match_id AND d.leg_number = h.leg_number AND d.`leg_points` = h.`leg_points` AND d.`leg_darts` = h.`leg_darts` AND d.set_number < h.set_number;
+-- DELETE h FROM `games_history_segment_training` h JOIN `games_history_segment_training` d ON d.player_id = h.player_id AND d.match_id = h.match_id AND d.leg_number = h.leg_number AND d.`leg_hit_rate` = h.`leg_hit_rate` AND d.`leg_darts` = h.`leg_darts` AND d.set_number < h.set_number;
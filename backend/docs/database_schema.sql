@@ -14,6 +14,7 @@ CREATE TABLE IF NOT EXISTS `games_history_x01` (
   `id` int(11) NOT NULL AUTO_INCREMENT,
   `player_id` int(11) NOT NULL,
   `match_id` varchar(255) NOT NULL,
+  `set_number` int(11) NOT NULL DEFAULT 1,
   `leg_number` int(11) NOT NULL,
   `leg_average` decimal(5,2) NOT NULL,
   `leg_points` int(11) NOT NULL,
@@ -21,6 +22,7 @@ CREATE TABLE IF NOT EXISTS `games_history_x01` (
   `finished_at` timestamp NOT NULL DEFAULT current_timestamp(),
   PRIMARY KEY (`id`),
   KEY `player_id` (`player_id`),
+  UNIQUE KEY `leg` (`player_id`,`match_id`,`set_number`,`leg_number`),
   CONSTRAINT `games_history_x01_ibfk_1` FOREIGN KEY (`player_id`) REFERENCES `players_x01` (`id`) ON DELETE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
 
@@ -40,12 +42,14 @@ CREATE TABLE IF NOT EXISTS `games_history_cricket` (
   `id` int(11) NOT NULL AUTO_INCREMENT,
   `player_id` int(11) NOT NULL,
   `match_id` varchar(255) NOT NULL,
+  `set_number` int(11) NOT NULL DEFAULT 1,
   `leg_number` int(11) NOT NULL,
   `leg_marks` int(11) NOT NULL,
   `leg_darts` int(11) NOT NULL,
   `finished_at` timestamp NOT NULL DEFAULT current_timestamp(),
   PRIMARY KEY (`id`),
   KEY `player_id` (`player_id`),
+  UNIQUE KEY `leg` (`player_id`,`match_id`,`set_number`,`leg_number`),
   CONSTRAINT `games_history_cricket_ibfk_1` FOREIGN KEY (`player_id`) REFERENCES `players_cricket` (`id`) ON DELETE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
 
@@ -65,12 +69,14 @@ CREATE TABLE IF NOT EXISTS `games_history_tactics` (
   `id` int(11) NOT NULL AUTO_INCREMENT,
   `player_id` int(11) NOT NULL,
   `match_id` varchar(255) NOT NULL,
+  `set_number` int(11) NOT NULL DEFAULT 1,
   `leg_number` int(11) NOT NULL,
   `leg_marks` int(11) NOT NULL,
   `leg_darts` int(11) NOT NULL,
   `finished_at` timestamp NOT NULL DEFAULT current_timestamp(),
   PRIMARY KEY (`id`),
   KEY `player_id` (`player_id`),
+  UNIQUE KEY `leg` (`player_id`,`match_id`,`set_number`,`leg_number`),
   CONSTRAINT `games_history_tactics_ibfk_1` FOREIGN KEY (`player_id`) REFERENCES `players_tactics` (`id`) ON DELETE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
 
@@ -90,12 +96,14 @@ CREATE TABLE IF NOT EXISTS `games_history_atc` (
   `id` int(11) NOT NULL AUTO_INCREMENT,
   `player_id` int(11) NOT NULL,
   `match_id` varchar(255) NOT NULL,
+  `set_number` int(11) NOT NULL DEFAULT 1,
   `leg_number` int(11) NOT NULL,
   `leg_hit_rate` decimal(5,4) NOT NULL,
   `leg_darts` int(11) NOT NULL,
   `finished_at` timestamp NOT NULL DEFAULT current_timestamp(),
   PRIMARY KEY (`id`),
   KEY `player_id` (`player_id`),
+  UNIQUE KEY `leg` (`player_id`,`match_id`,`set_number`,`leg_number`),
   CONSTRAINT `games_history_atc_ibfk_1` FOREIGN KEY (`player_id`) REFERENCES `players_atc` (`id`) ON DELETE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
 
@@ -115,12 +123,14 @@ CREATE TABLE IF NOT EXISTS `games_history_countup` (
   `id` int(11) NOT NULL AUTO_INCREMENT,
   `player_id` int(11) NOT NULL,
   `match_id` varchar(255) NOT NULL,
+  `set_number` int(11) NOT NULL DEFAULT 1,
   `leg_number` int(11) NOT NULL,
   `leg_points` int(11) NOT NULL,
   `leg_darts` int(11) NOT NULL,
   `finished_at` timestamp NOT NULL DEFAULT current_timestamp(),
   PRIMARY KEY (`id`),
   KEY `player_id` (`player_id`),
+  UNIQUE KEY `leg` (`player_id`,`match_id`,`set_number`,`leg_number`),
   CONSTRAINT `games_history_countup_ibfk_1` FOREIGN KEY (`player_id`) REFERENCES `players_countup` (`id`) ON DELETE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
 
@@ -140,11 +150,33 @@ CREATE TABLE IF NOT EXISTS `games_history_segment_training` (
   `id` int(11) NOT NULL AUTO_INCREMENT,
   `player_id` int(11) NOT NULL,
   `match_id` varchar(255) NOT NULL,
+  `set_number` int(11) NOT NULL DEFAULT 1,
   `leg_number` int(11) NOT NULL,
   `leg_hit_rate` decimal(5,4) NOT NULL,
   `leg_darts` int(11) NOT NULL,
   `finished_at` timestamp NOT NULL DEFAULT current_timestamp(),
   PRIMARY KEY (`id`),
   KEY `player_id` (`player_id`),
+  UNIQUE KEY `leg` (`player_id`,`match_id`,`set_number`,`leg_number`),
   CONSTRAINT `games_history_segment_training_ibfk_1` FOREIGN KEY (`player_id`) REFERENCES `players_segment_training` (`id`) ON DELETE CASCADE
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
+
+-- Einzelne Darts (unabhängig vom Spielmodus)
+CREATE TABLE IF NOT EXISTS `throws_history` (
+  `match_id` varchar(64) NOT NULL,
+  `set_number` smallint(6) NOT NULL,
+  `leg_number` smallint(6) NOT NULL,
+  `player_name` varchar(255) NOT NULL,
+  `round_number` smallint(6) NOT NULL,
+  `dart_number` tinyint(4) NOT NULL,
+  `variant` varchar(32) DEFAULT NULL,
+  `target` varchar(8) DEFAULT NULL, -- Angespieltes Ziel (Schlüssel aus FIELD_COORDS), nur bei Modi mit festem Ziel
+  `segment_name` varchar(16) DEFAULT NULL,
+  `segment_number` tinyint(4) DEFAULT NULL,
+  `multiplier` tinyint(4) DEFAULT NULL,
+  `x` float DEFAULT NULL,
+  `y` float DEFAULT NULL,
+  `thrown_at` timestamp NOT NULL DEFAULT current_timestamp(),
+  PRIMARY KEY (`match_id`,`set_number`,`leg_number`,`player_name`,`round_number`,`dart_number`),
+  KEY `player_name` (`player_name`,`thrown_at`)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_general_ci;
@@ -0,0 +1,163 @@
+-- SQLite-Variante von database_schema.sql (DB_BACKEND = 'sqlite').
+-- Wird beim ersten Öffnen der Datenbankdatei automatisch angewendet.
+-- Gleiche Tabellen und Spalten wie bei MariaDB; 'name' ist wie bei utf8mb4_general_ci
+-- unabhängig von Groß-/Kleinschreibung eindeutig (COLLATE NOCASE).
+
+-- Tabellen für X01
+CREATE TABLE IF NOT EXISTS players_x01 (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  name TEXT NOT NULL UNIQUE COLLATE NOCASE,
+  is_registered INTEGER NOT NULL DEFAULT 0,
+  average REAL DEFAULT NULL,
+  created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS games_history_x01 (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  player_id INTEGER NOT NULL REFERENCES players_x01 (id) ON DELETE CASCADE,
+  match_id TEXT NOT NULL,
+  set_number INTEGER NOT NULL DEFAULT 1,
+  leg_number INTEGER NOT NULL,
+  leg_average REAL NOT NULL,
+  leg_points INTEGER NOT NULL,
+  leg_darts INTEGER NOT NULL,
+  finished_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS games_history_x01_player_id ON games_history_x01 (player_id, finished_at);
+CREATE UNIQUE INDEX IF NOT EXISTS games_history_x01_leg ON games_history_x01 (player_id, match_id, set_number, leg_number);
+
+-- Tabellen für Cricket
+CREATE TABLE IF NOT EXISTS players_cricket (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  name TEXT NOT NULL UNIQUE COLLATE NOCASE,
+  is_registered INTEGER NOT NULL DEFAULT 0,
+  mpr REAL DEFAULT NULL,
+  created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS games_history_cricket (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  player_id INTEGER NOT NULL REFERENCES players_cricket (id) ON DELETE CASCADE,
+  match_id TEXT NOT NULL,
+  set_number INTEGER NOT NULL DEFAULT 1,
+  leg_number INTEGER NOT NULL,
+  leg_marks INTEGER NOT NULL,
+  leg_darts INTEGER NOT NULL,
+  finished_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS games_history_cricket_player_id ON games_history_cricket (player_id, finished_at);
+CREATE UNIQUE INDEX IF NOT EXISTS games_history_cricket_leg ON games_history_cricket (player_id, match_id, set_number, leg_number);
+
+-- Tabellen für Tactics
+CREATE TABLE IF NOT EXISTS players_tactics (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  name TEXT NOT NULL UNIQUE COLLATE NOCASE,
+  is_registered INTEGER NOT NULL DEFAULT 0,
+  mpr REAL DEFAULT NULL,
+  created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS games_history_tactics (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  player_id INTEGER NOT NULL REFERENCES players_tactics (id) ON DELETE CASCADE,
+  match_id TEXT NOT NULL,
+  set_number INTEGER NOT NULL DEFAULT 1,
+  leg_number INTEGER NOT NULL,
+  leg_marks INTEGER NOT NULL,
+  leg_darts INTEGER NOT NULL,
+  finished_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS games_history_tactics_player_id ON games_history_tactics (player_id, finished_at);
+CREATE UNIQUE INDEX IF NOT EXISTS games_history_tactics_leg ON games_history_tactics (player_id, match_id, set_number, leg_number);
+
+-- Tabellen für ATC
+CREATE TABLE IF NOT EXISTS players_atc (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  name TEXT NOT NULL UNIQUE COLLATE NOCASE,
+  is_registered INTEGER NOT NULL DEFAULT 0,
+  hit_rate REAL DEFAULT NULL,
+  created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS games_history_atc (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  player_id INTEGER NOT NULL REFERENCES players_atc (id) ON DELETE CASCADE,
+  match_id TEXT NOT NULL,
+  set_number INTEGER NOT NULL DEFAULT 1,
+  leg_number INTEGER NOT NULL,
+  leg_hit_rate REAL NOT NULL,
+  leg_darts INTEGER NOT NULL,
+  finished_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS games_history_atc_player_id ON games_history_atc (player_id, finished_at);
+CREATE UNIQUE INDEX IF NOT EXISTS games_history_atc_leg ON games_history_atc (player_id, match_id, set_number, leg_number);
+
+-- Tabellen für Count Up
+CREATE TABLE IF NOT EXISTS players_countup (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  name TEXT NOT NULL UNIQUE COLLATE NOCASE,
+  is_registered INTEGER NOT NULL DEFAULT 0,
+  ppr REAL DEFAULT NULL,
+  created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS games_history_countup (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  player_id INTEGER NOT NULL REFERENCES players_countup (id) ON DELETE CASCADE,
+  match_id TEXT NOT NULL,
+  set_number INTEGER NOT NULL DEFAULT 1,
+  leg_number INTEGER NOT NULL,
+  leg_points INTEGER NOT NULL,
+  leg_darts INTEGER NOT NULL,
+  finished_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS games_history_countup_player_id ON games_history_countup (player_id, finished_at);
+CREATE UNIQUE INDEX IF NOT EXISTS games_history_countup_leg ON games_history_countup (player_id, match_id, set_number, leg_number);
+
+-- Tabellen für Segment Training
+CREATE TABLE IF NOT EXISTS players_segment_training (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  name TEXT NOT NULL UNIQUE COLLATE NOCASE,
+  is_registered INTEGER NOT NULL DEFAULT 0,
+  hit_rate REAL DEFAULT NULL,
+  created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  updated_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS games_history_segment_training (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  player_id INTEGER NOT NULL REFERENCES players_segment_training (id) ON DELETE CASCADE,
+  match_id TEXT NOT NULL,
+  set_number INTEGER NOT NULL DEFAULT 1,
+  leg_number INTEGER NOT NULL,
+  leg_hit_rate REAL NOT NULL,
+  leg_darts INTEGER NOT NULL,
+  finished_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS games_history_segment_training_player_id ON games_history_segment_training (player_id, finished_at);
+CREATE UNIQUE INDEX IF NOT EXISTS games_history_segment_training_leg ON games_history_segment_training (player_id, match_id, set_number, leg_number);
+
+-- Einzelne Darts (unabhängig vom Spielmodus)
+CREATE TABLE IF NOT EXISTS throws_history (
+  match_id TEXT NOT NULL,
+  set_number INTEGER NOT NULL,
+  leg_number INTEGER NOT NULL,
+  player_name TEXT NOT NULL COLLATE NOCASE,
+  round_number INTEGER NOT NULL,
+  dart_number INTEGER NOT NULL,
+  variant TEXT DEFAULT NULL,
+  target TEXT DEFAULT NULL,
+  segment_name TEXT DEFAULT NULL,
+  segment_number INTEGER DEFAULT NULL,
+  multiplier INTEGER DEFAULT NULL,
+  x REAL DEFAULT NULL,
+  y REAL DEFAULT NULL,
+  thrown_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (match_id, set_number, leg_number, player_name, round_number, dart_number)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS throws_history_player ON throws_history (player_name, thrown_at);
\ No newline at end of file
@@ -3,10 +3,11 @@
 import requests
 import logging
 import math
+import gevent
 from ..core import shared_state as g
 from ..core import constants as c
-from ..core import security_module
 from ..core.utils_backend import log_function_call
+from .autodarts_rest_client import autodarts_rest
 
 @log_function_call
 def get_player_average(user_id, variant='x01', limit='100'):
@@ -21,10 +22,7 @@ def get_player_average(user_id, variant='x01', limit='100'):
     """
     try:
         url = f"{g.AUTODARTS_USERS_URL}{user_id}/stats/{variant}?limit={limit}"
-        headers = security_module.get_auth_header()
-        res = requests.get(url, headers=headers, timeout=5)
-        res.raise_for_status()
-        m = res.json()
+        m = autodarts_rest.get(url, 'users.stats').json()
         return m.get(c.KEY_AVERAGE, {}).get(c.KEY_AVERAGE)
     except requests.exceptions.RequestException as e:
         logging.error("API call to receive player-stats failed: %s", e)
@@ -40,9 +38,7 @@ def start_match(lobbyId):
     try:
         if g.active_match_id is not None:
             url = g.AUTODARTS_LOBBIES_URL + lobbyId + "/start"
-            headers = security_module.get_auth_header()
-            res = requests.post(url, headers=headers, timeout=5)
-            res.raise_for_status()
+            autodarts_rest.post(url, 'lobbies.start')
     except requests.exceptions.RequestException as e:
         logging.error("API call to start match failed: %s", e)
 
@@ -52,9 +48,7 @@ def request_next_player():
     try:
         if g.active_match_id is not None:
             url = g.AUTODARTS_MATCHES_URL + g.active_match_id + "/players/next"
-            headers = security_module.get_auth_header()
-            response = requests.post(url, headers=headers, timeout=5)
-            response.raise_for_status()
+            autodarts_rest.post(url, 'matches.next_player')
     except requests.exceptions.RequestException as e:
         logging.error("API call for next player failed: %s", e)
 
@@ -64,9 +58,7 @@ def undo_throw():
     try:
         if g.active_match_id is not None:
             url = g.AUTODARTS_MATCHES_URL + g.active_match_id + "/undo"
-            headers = security_module.get_auth_header()
-            response = requests.post(url, headers=headers, timeout=5)
-            response.raise_for_status()
+            autodarts_rest.post(url, 'matches.undo')
     except requests.exceptions.RequestException as e:
         logging.error("API call to undo throw failed: %s", e)
 
@@ -97,28 +89,48 @@ def next_game():
     try:
         if g.active_match_id is not None:
             url = g.AUTODARTS_MATCHES_URL + g.active_match_id + "/games/next"
-            headers = security_module.get_auth_header()
-            response = requests.post(url, headers=headers, timeout=5)
-            response.raise_for_status()
+            autodarts_rest.post(url, 'matches.next_game')
     except requests.exceptions.RequestException as e:
         logging.error("API call for next game failed: %s", e)
 
 @log_function_call
 def fetch_and_update_board_address():
-    """Fragt die Autodarts-API nach der lokalen IP-Adresse des Board Managers."""
+    """Fragt die Autodarts-API nach der lokalen IP-Adresse des Board Managers.
+
+    Liegt die Board-Ressource bereits im Antwort-Cache (z.B. vom letzten Start), wird die Adresse
+    sofort daraus übernommen und im Hintergrund per bedingtem GET neu geprüft.
+    """
     try:
         if g.boardManagerAddress is None:
             url = f"{g.AUTODARTS_BOARDS_URL}{g.AUTODARTS_BOARD_ID}"
-            response = requests.get(url, headers=security_module.get_auth_header())
-            response.raise_for_status()
-            board_data = response.json()
-            board_ip = board_data.get('ip')
-            if board_ip:
-                g.boardManagerAddress = f"{board_ip}/"
-                if g.DEBUG > 0:
-                    logging.info(f"Board-Manager-Adresse erfolgreich ermittelt: {g.boardManagerAddress}")
-            else:
-                logging.info("Board-Manager-Adresse konnte nicht ermittelt werden (keine IP in API-Antwort).")
+            board_data = autodarts_rest.cached_json(url)
+            if board_data is not None and _apply_board_address(board_data):
+                gevent.spawn(_revalidate_board_address, url)
+                return
+            _apply_board_address(autodarts_rest.get_json_cached(url, 'boards.get'))
     except Exception as e:
         g.boardManagerAddress = None
-        logging.error("Fehler beim Abrufen der Board-Manager-Adresse: %s", e)
\ No newline at end of file
+        logging.error("Fehler beim Abrufen der Board-Manager-Adresse: %s", e)
+
+
+def _apply_board_address(board_data):
+    """Übernimmt die IP aus der Board-Ressource. Gibt zurück, ob eine Adresse gesetzt wurde."""
+    board_ip = board_data.get('ip')
+    if board_ip:
+        address = f"{board_ip}/"
+        if address != g.boardManagerAddress:
+            g.boardManagerAddress = address
+            if g.DEBUG > 0:
+                logging.info(f"Board-Manager-Adresse erfolgreich ermittelt: {g.boardManagerAddress}")
+        return True
+    logging.info("Board-Manager-Adresse konnte nicht ermittelt werden (keine IP in API-Antwort).")
+    return False
+
+
+def _revalidate_board_address(url):
+    """Prüft die aus dem Cache übernommene Adresse bei der Autodarts-API nach (meist ein 304)."""
+    try:
+        _apply_board_address(autodarts_rest.get_json_cached(url, 'boards.get'))
+    except Exception as e:
+        # Die Adresse aus dem Cache bleibt in Gebrauch
+        logging.warning("Board-Manager-Adresse konnte nicht neu geprüft werden: %s", e)
\ No newline at end of file
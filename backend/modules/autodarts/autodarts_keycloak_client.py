@@ -1,18 +1,36 @@
 from datetime import datetime, timedelta
-from keycloak import KeycloakOpenID
+import logging
+import random
+import time
 import gevent
+from gevent.event import AsyncResult
 from ..core import shared_state as g
+from ..core.metrics import register_metrics_provider
+
+# Token-Provider für die Autodarts-API.
+#
+# get_auth_header() wird bei jedem REST-Aufruf und jedem WebSocket-Verbindungsaufbau gebraucht.
+# Der fertige Header liegt deshalb vorbereitet bereit und wird ohne Sperre zurückgegeben,
+# solange der Token gültig ist. Erneuert wird vorausschauend nach etwa 75 % der Laufzeit
+# (mit Zufallsanteil, damit mehrere Backends nicht gleichzeitig anfragen); der Greenlet schläft
+# bis zu diesem Zeitpunkt, statt alle paar Sekunden nachzusehen.
+# Die Erneuerung läuft "single-flight": Fragen viele Greenlets gleichzeitig nach einem
+# abgelaufenen Token, gibt es genau einen Refresh und, falls der fehlschlägt, genau einen
+# vollständigen Login. Alle anderen warten auf dessen Ergebnis.
 
 class AutodartsKeycloakClient:
     token_lifetime_fraction = 0.75
-    tick: int = 3
+    renewal_jitter = 0.05       # ± Anteil der Laufzeit, um den die Erneuerung zufällig verschoben wird
+    retry_delay = 5             # Sekunden bis zum nächsten Versuch nach einem fehlgeschlagenen Login (verdoppelt sich)
+    retry_delay_max = 60
     run: bool = True
     username: str = None
     password: str = None
     debug: bool = False
-    kc: KeycloakOpenID = None
+    kc = None # KeycloakOpenID, erst beim Anlegen des Clients importiert (python-keycloak lädt langsam)
     access_token: str = None
     refresh_token: str = None
+    auth_header: dict = None    # vorbereiteter Header {'Authorization': 'Bearer ...'}, nicht verändern
     user_id: str = None
     expires_at: datetime = None
     renewal_threshold: datetime = None
@@ -20,6 +38,7 @@ class AutodartsKeycloakClient:
     t: gevent.Greenlet = None
 
     def __init__(self, *, username: str, password: str, client_id: str, client_secret: str = None, debug: bool = False):
+        from keycloak import KeycloakOpenID
         self.kc = KeycloakOpenID(
             server_url="https://login.autodarts.io",
             client_id=client_id,
@@ -30,28 +49,43 @@ class AutodartsKeycloakClient:
         self.username = username
         self.password = password
         self.debug = debug
+        self._valid_until = 0.0     # time.monotonic(), bis zu dem der Token ohne Prüfung ausgegeben wird
+        self._renew_at = 0.0        # time.monotonic() der geplanten Erneuerung
+        self._issued_at = None      # time.monotonic() des aktuellen Tokens
+        self._renewal = None        # AsyncResult der gerade laufenden Erneuerung
+        self._stats = {'refreshes': 0, 'logins': 0, 'refresh_failures': 0, 'login_failures': 0, 'joined': 0}
         self.__get_token()
         self.user_id = self.kc.userinfo(self.access_token)['sub']
+        register_metrics_provider('auth_token', self.stats)
 
     def __set_token(self, token: dict):
         self.access_token = token.get('access_token')
         # Der Refresh-Token wird nur aktualisiert, wenn er in der Antwort enthalten ist
-        # Er wird vom Autodarts-Server mit einer LAufzeit von 0 gemeldet, ist also dauerhaft gltg
+        # Er wird vom Autodarts-Server mit einer LAufzeit von 0 gemeldet, ist also dauerhaft gültg
 #        if token.get('refresh_token'):
         self.refresh_token = token.get('refresh_token')
         
-        self.expires_at = datetime.now() + timedelta(seconds=token.get("expires_in", 0))
-        self.renewal_threshold = datetime.now() + timedelta(
-            seconds=int(self.token_lifetime_fraction * token.get("expires_in", 0))
-        )
+        expires_in = token.get("expires_in", 0)
+        fraction = self.token_lifetime_fraction + random.uniform(-self.renewal_jitter, self.renewal_jitter)
+        now = time.monotonic()
+        self.expires_at = datetime.now() + timedelta(seconds=expires_in)
+        self.renewal_threshold = datetime.now() + timedelta(seconds=int(fraction * expires_in))
+        self._issued_at = now
+        self._renew_at = now + fraction * expires_in
+        # Bis kurz vor dem Ablauf ausgeben; danach wartet get_auth_header() auf die Erneuerung
+        self._valid_until = now + max(expires_in - 5, 0)
+        self.auth_header = {'Authorization': 'Bearer ' + self.access_token} if self.access_token else None
+        g.token_refresh_status = "Valid" if self.refresh_token else "Missing"
 
     def __get_token(self):
         self.__set_token(self.kc.token(self.username, self.password))
+        self._stats['logins'] += 1
         if self.debug:
             print("Getting initial token")
 
     def __refresh_token(self):
         self.__set_token(self.kc.refresh_token(self.refresh_token))
+        self._stats['refreshes'] += 1
         if self.debug:
             print("Refreshing access token")
             
@@ -65,36 +99,88 @@ class AutodartsKeycloakClient:
         if minutes > 0: return f"{minutes}m {seconds}s"
         return f"{seconds}s"
 
-    def __get_or_refresh(self):
-        while self.run:
+    def access_expires_in(self):
+        """Restlaufzeit des Access-Tokens als lesbarer String, bei jedem Aufruf aus expires_at berechnet."""
+        if not self.access_token or not self.expires_at:
+            return "N/A"
+        remaining = self.expires_at - datetime.now()
+        return self.__format_timedelta(remaining) if remaining.total_seconds() > 0 else "Expired"
+
+    def __renew(self):
+        """Erneuert den Token: erst per Refresh, schlägt das fehl, genau einmal per Login."""
+        if self.refresh_token:
             try:
-                now = datetime.now()
-                # Wenn der Access Token fehlt oder bald abluft, handle die Erneuerung
-                if self.access_token is None or self.renewal_threshold < now:
-                    if self.refresh_token:
-                        try:
-                            self.__refresh_token()
-                        except Exception:
-                            # Wenn Refresh fehlschlgt, erzwinge kompletten neuen Login
-                            self.__get_token()
-                    else:
-                        self.__get_token()
-                
-                # Aktualisierung der globalen Variablen fr die Anzeige
-                if self.expires_at:
-                    remaining_access = self.expires_at - now
-                    g.token_access_expires_in = self.__format_timedelta(remaining_access) if remaining_access.total_seconds() > 0 else "Expired"
+                self.__refresh_token()
+                return
+            except Exception as e:
+                self._stats['refresh_failures'] += 1
+                logging.warning("Token-Refresh fehlgeschlagen, neuer Login: %s", e)
+        try:
+            self.__get_token()
+        except Exception:
+            self._stats['login_failures'] += 1
+            self.access_token = None
+            self.refresh_token = None
+            self.auth_header = None
+            self._valid_until = 0.0
+            g.token_refresh_status = "Login Failed"
+            raise
 
-                # Setze den Status basierend auf der Existenz des Refresh Tokens
-                g.token_refresh_status = "Valid" if self.refresh_token else "Missing"
+    def renew(self):
+        """Single-flight: Läuft bereits eine Erneuerung, wird auf deren Ergebnis gewartet.
 
+            Raises:
+                Exception: Wenn Refresh und Login fehlgeschlagen sind.
+        """
+        if self._renewal is not None:
+            self._stats['joined'] += 1
+            self._renewal.get()
+            return
+
+        self._renewal = renewal = AsyncResult()
+        try:
+            self.__renew()
+            renewal.set(None)
+        except Exception as e:
+            renewal.set_exception(e)
+            raise
+        finally:
+            self._renewal = None
+
+    def get_auth_header(self):
+        """Der Header mit dem aktuellen Bearer-Token. Ohne Sperre, solange der Token gültig ist;
+           sonst wird (gemeinsam mit anderen Wartenden) auf eine Erneuerung gewartet.
+        """
+        if time.monotonic() < self._valid_until:
+            return self.auth_header
+        self.renew()
+        return self.auth_header
+
+    def __get_or_refresh(self):
+        retry_delay = self.retry_delay
+        while self.run:
+            try:
+                if self.access_token is None or time.monotonic() >= self._renew_at:
+                    self.renew()
+                retry_delay = self.retry_delay
+                # Bis zur geplanten Erneuerung schlafen (wurde zwischendurch erneuert, ist das später)
+                gevent.sleep(max(self._renew_at - time.monotonic(), 1))
             except Exception as e:
-                self.access_token = None
-                self.refresh_token = None
-                g.token_refresh_status = "Login Failed"
                 print(f"Token processing failed: {e}")
+                gevent.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, self.retry_delay_max)
 
-            gevent.sleep(self.tick)
+    def stats(self):
+        """Alter und Restlaufzeit des Tokens sowie die Erneuerungen für /api/metrics."""
+        now = time.monotonic()
+        return dict(
+            self._stats,
+            token_age_s  = round(now - self._issued_at, 1) if self._issued_at is not None and self.access_token else None,
+            expires_in_s = round(max((self.expires_at - datetime.now()).total_seconds(), 0), 1) if self.expires_at and self.access_token else None,
+            renew_in_s   = round(max(self._renew_at - now, 0), 1) if self.access_token else None,
+            expires_in   = self.access_expires_in(),
+            status       = g.token_refresh_status
+        )
                 
     def start(self):
         self.t = gevent.spawn(self.__get_or_refresh)
@@ -104,4 +190,4 @@ class AutodartsKeycloakClient:
         self.run = False
         if self.t and not self.t.dead:
             self.t.kill()
-        print("Keycloak-Client EXIT")
\ No newline at end of file
+        print("Keycloak-Client EXIT")
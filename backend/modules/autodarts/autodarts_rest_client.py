@@ -0,0 +1,350 @@
+# Backend/modules/autodarts/autodarts_rest_client.py
+
+# Gemeinsamer Client für alle REST-Aufrufe an die Autodarts-API (api.autodarts.io).
+#
+# Bisher haben autodarts_api_client, match_handler und websocket_handlers jeweils direkt
+# requests.get/post/patch aufgerufen: jedes Mal eine neue Verbindung (inkl. TLS-Handshake),
+# unterschiedliche Timeouts und teilweise gar keiner. Jetzt laufen alle Aufrufe über
+# autodarts_rest (eine Instanz von AutodartsRestClient):
+#   - eine requests.Session mit Verbindungs-Pool (Keep-Alive),
+#   - einheitliche Timeouts (AUTODARTS_HTTP_TIMEOUT),
+#   - Wiederholungen mit exponentiellem Backoff und Zufallsanteil (Jitter), damit sich mehrere
+#     Boards nach einer Störung nicht im Gleichtakt melden,
+#   - ein Token-Bucket begrenzt die Anfragerate; ein 429 mit Retry-After sperrt ihn für die
+#     angegebene Zeit, alle weiteren Aufrufe warten so lange, statt den Server weiter zu belasten,
+#   - Aufrufe, Fehler, Wiederholungen und Latenzen pro Endpunkt für /api/metrics,
+#   - ein Antwort-Cache für Ressourcen, die sich selten ändern (Board, Match beim Start):
+#     get_json_cached() schickt ETag/Last-Modified der letzten Antwort mit, ein 304 kostet so
+#     keinen Body. Der Cache liegt in AUTODARTS_HTTP_CACHE_PATH und übersteht einen Neustart.
+# Fehler werden wie bisher als requests-Exceptions an den Aufrufer weitergegeben.
+
+import collections
+import email.utils
+import json
+import logging
+import os
+import random
+import threading
+import time
+
+import gevent
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+from ..core import shared_state as g
+from ..core import security_module
+from ..core.instance_lock import board_path, adopt_shared_file
+from ..core.metrics import register_metrics_provider
+
+AUTODARTS_HTTP_TIMEOUT   = (5, 10)   # (Connect-, Read-Timeout) in Sekunden
+AUTODARTS_HTTP_POOL_SIZE = 8
+AUTODARTS_HTTP_RETRIES   = 3
+AUTODARTS_HTTP_BACKOFF   = 0.5       # Sekunden, verdoppelt sich mit jeder Wiederholung (± 50 % Jitter)
+AUTODARTS_HTTP_MAX_WAIT  = 30        # Längste Wartezeit (Backoff oder Retry-After) pro Wiederholung
+AUTODARTS_RATE_LIMIT     = 5.0       # Anfragen pro Sekunde im Mittel
+AUTODARTS_RATE_BURST     = 10        # so viele Anfragen dürfen direkt hintereinander kommen
+
+AUTODARTS_HTTP_CACHE_ENTRIES = 64  # so viele URLs hält der Antwort-Cache, die ältesten fallen heraus
+
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+RETRY_STATUS       = frozenset({429, 502, 503, 504})
+
+#----------------------------------------------------
+
+class TokenBucket:
+    """Begrenzt die Anfragerate und setzt Sperren aus 429-Antworten (Retry-After) um."""
+
+    def __init__(self, rate, burst):
+        self.rate          = rate
+        self.burst         = burst
+        self.tokens        = float(burst)
+        self.updated       = time.monotonic()
+        self.blocked_until = 0.0
+        self.waits         = 0
+        self.waited_s      = 0.0
+
+    def acquire(self):
+        """Wartet (kooperativ), bis eine Anfrage erlaubt ist, und verbraucht ein Token."""
+        while True:
+            now = time.monotonic()
+            self.tokens  = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+            wait = max(self.blocked_until - now, 0.0)
+            if not wait:
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+
+            self.waits    += 1
+            self.waited_s += wait
+            gevent.sleep(wait)
+
+    def block(self, seconds):
+        """Sperrt den Bucket (429 Retry-After) und leert ihn."""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+
+#----------------------------------------------------
+
+class ResponseCache:
+    """Antworten (JSON) mit ETag/Last-Modified pro URL, als JSON-Datei gespeichert."""
+
+    def __init__(self, max_entries):
+        self.max_entries  = max_entries
+        self._entries     = collections.OrderedDict()  # URL -> {'data', 'etag', 'last_modified', 'fetched_at'}
+        self._loaded      = False
+        self._lock        = threading.Lock()
+        self.hits         = 0
+        self.not_modified = 0
+        self.stored       = 0
+
+    def _path(self):
+        # Eine Datei pro Board (mehrere Instanzen nebeneinander)
+        return board_path(g.AUTODARTS_HTTP_CACHE_PATH)
+
+    def _load(self):
+        self._loaded = True
+        adopt_shared_file(g.AUTODARTS_HTTP_CACHE_PATH)
+        try:
+            with open(self._path(), encoding='utf-8') as f:
+                self._entries.update(json.load(f))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            logging.warning("Autodarts-HTTP-Cache konnte nicht geladen werden: %s", e)
+
+    def _save(self):
+        """Schreibt den Cache atomar (erst in eine .tmp-Datei, dann umbenennen)."""
+        try:
+            path     = self._path()
+            tmp_path = path + ".tmp"
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            logging.warning("Autodarts-HTTP-Cache konnte nicht gespeichert werden: %s", e)
+
+    def get(self, url):
+        with self._lock:
+            if not self._loaded:
+                self._load()
+            return self._entries.get(url)
+
+    def put(self, url, data, response):
+        """Speichert eine neue Antwort samt ihrer Validatoren."""
+        with self._lock:
+            self._entries.pop(url, None)
+            self._entries[url] = {
+                'data':          data,
+                'etag':          response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'fetched_at':    time.time()
+            }
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self.stored += 1
+            self._save()
+
+    def touch(self, url):
+        """Nach einem 304: Der Eintrag ist weiterhin aktuell."""
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is not None:
+                entry['fetched_at'] = time.time()
+                self._entries.move_to_end(url)
+            self.not_modified += 1
+
+    def stats(self):
+        return {'entries': len(self._entries), 'hits': self.hits, 'not_modified': self.not_modified, 'stored': self.stored}
+
+#----------------------------------------------------
+
+def _retry_after(response):
+    """Wartezeit aus dem Retry-After-Header (Sekunden oder HTTP-Datum), sonst None."""
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        try:
+            return max(email.utils.parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            return None
+
+
+class AutodartsRestClient:
+    """Gepoolter Client für die REST-API von Autodarts (siehe Modulbeschreibung)."""
+
+    def __init__(self):
+        self._session = None
+        self.bucket   = TokenBucket(AUTODARTS_RATE_LIMIT, AUTODARTS_RATE_BURST)
+        self.rate_limited = 0        # Anzahl der 429-Antworten
+        self._endpoints   = {}       # Endpunkt -> Kennzahlen
+        self.cache        = ResponseCache(AUTODARTS_HTTP_CACHE_ENTRIES)
+
+    def _get_session(self):
+        if self._session is None:
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=AUTODARTS_HTTP_POOL_SIZE)
+            session = requests.Session()
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            self._session = session
+        return self._session
+
+    def _backoff(self, attempt):
+        return min(AUTODARTS_HTTP_BACKOFF * (2 ** attempt) * random.uniform(0.5, 1.5), AUTODARTS_HTTP_MAX_WAIT)
+
+    def _record(self, endpoint, elapsed_ms, error=False, retries=0):
+        stats = self._endpoints.setdefault(endpoint, {'calls': 0, 'errors': 0, 'retries': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'last_ms': None})
+        stats['calls']    += 1
+        stats['errors']   += int(error)
+        stats['retries']  += retries
+        stats['total_ms'] += elapsed_ms
+        stats['max_ms']    = max(stats['max_ms'], elapsed_ms)
+        stats['last_ms']   = round(elapsed_ms, 2)
+
+    #----------------------------------------------------
+
+    def request(self, method, url, endpoint, auth=True, timeout=AUTODARTS_HTTP_TIMEOUT, **kwargs):
+        """Führt einen Aufruf aus (mit Rate-Limit, Wiederholungen und Messung).
+
+            Args:
+                method (str):   HTTP-Methode.
+                url (str):      Vollständige URL.
+                endpoint (str): Name für die Kennzahlen (z.B. 'matches.get').
+                auth (bool):    Den aktuellen Auth-Header mitsenden (bei jeder Wiederholung neu geholt).
+                **kwargs:       Weitere Argumente für requests (json, params, headers, ...).
+
+            Returns:
+                requests.Response: Die Antwort, raise_for_status() wurde bereits aufgerufen.
+
+            Raises:
+                requests.exceptions.RequestException: Wenn auch die letzte Wiederholung fehlschlägt.
+        """
+        method  = method.upper()
+        extra_headers = kwargs.pop('headers', None) or {}
+        start   = time.perf_counter()
+        attempt = 0
+
+        while True:
+            self.bucket.acquire()
+            headers = dict(security_module.get_auth_header(), **extra_headers) if auth else extra_headers
+            wait    = None
+            try:
+                response = self._get_session().request(method, url, headers=headers, timeout=timeout, **kwargs)
+                if response.status_code in RETRY_STATUS:
+                    retry_after = _retry_after(response)
+                    if response.status_code == 429:
+                        self.rate_limited += 1
+                        self.bucket.block(min(retry_after if retry_after is not None else self._backoff(attempt), AUTODARTS_HTTP_MAX_WAIT))
+                        wait = 0.0 # die Sperre im Bucket übernimmt das Warten
+                    elif method in IDEMPOTENT_METHODS:
+                        wait = min(retry_after, AUTODARTS_HTTP_MAX_WAIT) if retry_after is not None else self._backoff(attempt)
+                if wait is None or attempt >= AUTODARTS_HTTP_RETRIES:
+                    response.raise_for_status()
+                    self._record(endpoint, (time.perf_counter() - start) * 1000, retries=attempt)
+                    return response
+
+            except requests.exceptions.HTTPError:
+                self._record(endpoint, (time.perf_counter() - start) * 1000, error=True, retries=attempt)
+                raise
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                # Kam keine Verbindung zustande, wurde nichts ausgeführt: immer wiederholen.
+                # Nach einem Lese-Timeout nur, wenn die Methode idempotent ist.
+                not_sent  = isinstance(e, requests.exceptions.ConnectTimeout) or \
+                            isinstance(getattr(e.args[0] if e.args else None, 'reason', None), NewConnectionError)
+                retryable = not_sent or method in IDEMPOTENT_METHODS
+                if not retryable or attempt >= AUTODARTS_HTTP_RETRIES:
+                    self._record(endpoint, (time.perf_counter() - start) * 1000, error=True, retries=attempt)
+                    raise
+                wait = self._backoff(attempt)
+
+            attempt += 1
+            if wait:
+                gevent.sleep(wait)
+
+    def get(self, url, endpoint, **kwargs):
+        return self.request('GET', url, endpoint, **kwargs)
+
+    def post(self, url, endpoint, **kwargs):
+        return self.request('POST', url, endpoint, **kwargs)
+
+    def patch(self, url, endpoint, **kwargs):
+        return self.request('PATCH', url, endpoint, **kwargs)
+
+    #----------------------------------------------------
+
+    def cached_json(self, url):
+        """Die zuletzt gespeicherte Antwort für eine URL (ohne Netzwerkzugriff), sonst None."""
+        entry = self.cache.get(url)
+        return entry['data'] if entry is not None else None
+
+    def get_json_cached(self, url, endpoint, max_age=0, **kwargs):
+        """GET mit Antwort-Cache: liefert den JSON-Inhalt der Ressource.
+
+            Ist der gespeicherte Eintrag jünger als max_age Sekunden, wird er ohne Anfrage geliefert.
+            Sonst wird mit If-None-Match/If-Modified-Since nachgefragt; bei 304 gilt der Eintrag
+            als aktuell, andernfalls wird die neue Antwort gespeichert.
+
+            Args:
+                url (str):       Vollständige URL (gleichzeitig der Schlüssel im Cache).
+                endpoint (str):  Name für die Kennzahlen.
+                max_age (float): Alter in Sekunden, bis zu dem ohne Nachfrage geliefert wird (0 = immer nachfragen).
+
+            Raises:
+                requests.exceptions.RequestException: Wie request().
+        """
+        entry = self.cache.get(url)
+        if entry is not None and max_age and time.time() - entry['fetched_at'] < max_age:
+            self.cache.hits += 1
+            return entry['data']
+
+        headers = dict(kwargs.pop('headers', None) or {})
+        if entry is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        response = self.get(url, endpoint, headers=headers, **kwargs)
+        if response.status_code == 304 and entry is not None:
+            self.cache.touch(url)
+            return entry['data']
+
+        data = response.json()
+        self.cache.put(url, data, response)
+        return data
+
+    #----------------------------------------------------
+
+    def stats(self):
+        """Kennzahlen pro Endpunkt und des Rate-Limits für /api/metrics."""
+        return {
+            'endpoints': {
+                endpoint: {
+                    'calls':   s['calls'],
+                    'errors':  s['errors'],
+                    'retries': s['retries'],
+                    'avg_ms':  round(s['total_ms'] / s['calls'], 2) if s['calls'] else None,
+                    'max_ms':  round(s['max_ms'], 2),
+                    'last_ms': s['last_ms']
+                }
+                for endpoint, s in list(self._endpoints.items())
+            },
+            'rate_limited':       self.rate_limited,
+            'throttle_waits':     self.bucket.waits,
+            'throttle_wait_s':    round(self.bucket.waited_s, 2),
+            'blocked_for_s':      round(max(self.bucket.blocked_until - time.monotonic(), 0.0), 1),
+            'cache':              self.cache.stats()
+        }
+
+#----------------------------------------------------
+
+autodarts_rest = AutodartsRestClient()
+
+register_metrics_provider('autodarts_rest', autodarts_rest.stats)
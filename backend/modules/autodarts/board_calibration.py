@@ -0,0 +1,166 @@
+# Backend/modules/autodarts/board_calibration.py
+
+# Kalibrierung aller Kameras des Boards in einem Durchgang.
+#
+# calibrate_board() startet die Auto-Kalibrierung für eine Kamera (bzw. den allgemeinen
+# Endpunkt), die cmd-Seite musste es für jede Kamera einzeln aufrufen und jeweils warten.
+# calibrate_all_cameras() startet die Kalibrierung für alle Kameras gleichzeitig:
+#   - Pro Kamera ein Greenlet für den POST an den Board Manager.
+#   - Danach fragt jedes Greenlet den Kamerazustand über den Telemetrie-Cache (cached_cams_state)
+#     ab, bis seine Kamera wieder läuft. Gleichzeitige Abfragen teilen sich eine Abfrage beim
+#     Board Manager, läuft die Telemetrie ohnehin, entstehen gar keine zusätzlichen.
+#   - Jeder Zustandswechsel einer Kamera geht als 'board_calibration' an die Abonnenten der
+#     Telemetrie (Raum TELEMETRY_ROOM).
+#   - Am Ende wird die Gesamtdauer der Summe der Einzeldauern gegenübergestellt. Das ist nur
+#     eine Schätzung für das Kalibrieren nacheinander (estimated_*): Die Einzeldauern wurden
+#     während des parallelen Laufs gemessen, gemessen wird kein echter Lauf nacheinander.
+# Läuft bereits eine Kalibrierung, wartet ein weiterer Aufruf auf deren Ergebnis.
+
+import logging
+import time
+
+import gevent
+from gevent.event import AsyncResult
+
+from ..core import shared_state as g
+from ..core.metrics import register_metrics_provider
+from .local_board_client import calibrate_board
+from .board_config import cached_config
+from .board_telemetry import cached_cams_state, TELEMETRY_ROOM
+
+CALIBRATION_TIMEOUT = 60    # Sekunden, nach denen eine Kamera als nicht fertig gilt
+
+_running = None     # AsyncResult der laufenden Kalibrierung
+
+_stats = {
+    'runs':                   0,
+    'joined':                 0,
+    'failed_cams':            0,
+    'last_total_ms':          None,
+    'last_estimated_speedup': None
+}
+
+#----------------------------------------------------
+
+def _emit(payload):
+    if g.socketio:
+        g.socketio.emit('board_calibration', payload, to=TELEMETRY_ROOM)
+
+
+def _is_running(cams_state, index):
+    """Läuft die Kamera? 'isRunning' ist entweder ein Wert für alle oder eine Liste pro Kamera."""
+    running = (cams_state or {}).get('isRunning')
+    if isinstance(running, list):
+        return index < len(running) and bool(running[index])
+    return bool(running)
+
+
+def _camera_count():
+    config = cached_config() or {}
+    return len(config.get('cam', {}).get('cams') or [])
+
+#----------------------------------------------------
+
+def _calibrate_camera(index, distortion, progress, deadline):
+    """Kalibriert eine Kamera und hält ihren Fortschritt fest."""
+    cam = progress[index]
+    cam['state'] = 'calibrating'
+    _emit({'cam': index, **cam})
+    started = time.perf_counter()
+
+    ok = calibrate_board(camId=index, distortion=distortion)
+    cam['request_ms'] = round((time.perf_counter() - started) * 1000, 1)
+
+    # Der POST kehrt zurück, wenn der Board Manager die Kalibrierung ausgeführt hat.
+    # Fertig ist die Kamera, sobald sie danach wieder läuft.
+    poll_interval = max(g.BOARD_TELEMETRY_INTERVAL_MS, 100) / 1000
+    while ok and not _is_running(cached_cams_state(), index):
+        if time.perf_counter() >= deadline:
+            cam['state'] = 'timeout'
+            break
+        gevent.sleep(poll_interval)
+    else:
+        cam['state'] = 'done' if ok else 'failed'
+
+    cam['duration_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    _emit({'cam': index, **cam})
+
+
+def _run(distortion):
+    count = _camera_count()
+    if not count:
+        # Ohne bekannte Kameras: wie bisher der allgemeine Endpunkt
+        started = time.perf_counter()
+        ok = calibrate_board(distortion=distortion)
+        total_ms = round((time.perf_counter() - started) * 1000, 1)
+        return {'cams': [], 'ok': ok, 'total_ms': total_ms, 'estimated_sequential_ms': total_ms, 'estimated_speedup': 1.0}
+
+    started  = time.perf_counter()
+    progress = [{'state': 'queued', 'request_ms': None, 'duration_ms': None} for _ in range(count)]
+    _emit({'started': True, 'cams': count})
+
+    deadline = started + CALIBRATION_TIMEOUT
+    jobs = [gevent.spawn(_calibrate_camera, i, distortion, progress, deadline) for i in range(count)]
+    try:
+        gevent.joinall(jobs)
+    finally:
+        gevent.killall(jobs) # bei einem Abbruch von außen nicht weiterlaufen lassen
+
+    total_ms      = round((time.perf_counter() - started) * 1000, 1)
+    # Schätzung: Die Einzeldauern stammen aus dem parallelen Lauf (gemeinsame Last auf dem Board Manager)
+    sequential_ms = round(sum(cam['duration_ms'] or 0 for cam in progress), 1)
+    failed        = sum(cam['state'] != 'done' for cam in progress)
+    _stats['failed_cams'] += failed
+
+    return {
+        'cams':                    progress,
+        'ok':                      not failed,
+        'total_ms':                total_ms,
+        'estimated_sequential_ms': sequential_ms,
+        'estimated_speedup':       round(sequential_ms / total_ms, 2) if total_ms else None
+    }
+
+#----------------------------------------------------
+
+def calibrate_all_cameras(distortion=False):
+    """Kalibriert alle Kameras des Boards gleichzeitig und meldet den Fortschritt per Socket.IO.
+
+        Args:
+            distortion (bool): Auch die Verzeichnung neu bestimmen.
+
+        Returns:
+            dict: Zustand und Dauer pro Kamera, Gesamtdauer sowie die daraus geschätzte Dauer
+                  nacheinander und Beschleunigung (estimated_*, keine Messung).
+    """
+    global _running
+    if _running is not None:
+        _stats['joined'] += 1
+        return _running.get()
+
+    _running = waiter = AsyncResult()
+    try:
+        _stats['runs'] += 1
+        result = _run(distortion)
+        _stats['last_total_ms'] = result['total_ms']
+        _stats['last_estimated_speedup'] = result['estimated_speedup']
+        _emit(dict(result, finished=True))
+        if g.DEBUG:
+            logging.info("Kalibrierung beendet: %s ms (nacheinander geschätzt %s ms)", result['total_ms'], result['estimated_sequential_ms'])
+        waiter.set(result)
+        return result
+    except Exception as e:
+        waiter.set_exception(e)
+        raise
+    finally:
+        # Auch bei einem Abbruch (Zeitlimit des Befehls) dürfen Wartende nicht hängen bleiben
+        if not waiter.ready():
+            waiter.set_exception(RuntimeError("Kalibrierung abgebrochen"))
+        _running = None
+
+#----------------------------------------------------
+
+def board_calibration_stats():
+    """Liefert die Kennzahlen der Kalibrierung für /api/metrics."""
+    return dict(_stats, running=_running is not None)
+
+register_metrics_provider('board_calibration', board_calibration_stats)
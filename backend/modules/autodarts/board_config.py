@@ -0,0 +1,156 @@
+# Backend/modules/autodarts/board_config.py
+
+# Cache für die Konfiguration des Board Managers.
+#
+# get_config hat bei jedem Aufruf die gesamte Konfiguration geholt, auch wenn mehrere cmd-Seiten
+# gleichzeitig fragen, und nach einem patch_config wusste niemand vom neuen Stand. Jetzt:
+#   - Die Konfiguration liegt mit einer Versionsnummer im Cache, höchstens BOARD_CONFIG_TTL
+#     Sekunden lang (danach wird neu geholt, um Änderungen von außen zu bemerken).
+#   - Gleichzeitige Abfragen warten auf dieselbe laufende Anfrage (single-flight).
+#   - patch_config schreibt die Änderung direkt in den Cache (write-through).
+#   - Jede Änderung wird als Differenz ('board_config': {Pfad: neuer Wert}) an die Abonnenten
+#     der Board-Telemetrie geschickt, statt dass die Seiten die Konfiguration abfragen.
+
+import copy
+import time
+
+from gevent.event import AsyncResult
+
+from ..core import shared_state as g
+from ..core.metrics import register_metrics_provider
+from .local_board_client import get_config, patch_config
+
+BOARD_CONFIG_ROOM = 'board_telemetry'  # Dieselben Abonnenten wie die Telemetrie (board_telemetry.py)
+
+_config     = None
+_version    = 0
+_fetched_at = 0.0      # time.monotonic() der letzten erfolgreichen Abfrage
+_inflight   = None     # AsyncResult der gerade laufenden Abfrage
+
+_stats = {
+    'hits':          0,
+    'fetches':       0,
+    'joined':        0,     # Abfragen, die auf eine bereits laufende gewartet haben
+    'patches':       0,
+    'pushes':        0,
+    'fetch_errors':  0
+}
+
+#----------------------------------------------------
+
+def _diff(old, new, prefix=''):
+    """Geänderte Werte als {'pfad.zum.wert': neuer Wert}. Listen gelten als ein Wert,
+       entfernte Schlüssel bekommen None.
+    """
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return {} if old == new else {prefix.rstrip('.') or '': new}
+
+    changes = {}
+    for key in old.keys() | new.keys():
+        if key not in new:
+            changes[prefix + key] = None
+        elif key not in old or not isinstance(new[key], dict) or not isinstance(old[key], dict):
+            if old.get(key) != new[key]:
+                changes[prefix + key] = new[key]
+        else:
+            changes.update(_diff(old[key], new[key], prefix + key + '.'))
+    return changes
+
+
+def _merge(base, patch):
+    """Überträgt eine Teil-Änderung (wie sie an den Board Manager geht) auf eine Kopie der Konfiguration."""
+    merged = copy.deepcopy(base) if isinstance(base, dict) else {}
+    for key, value in patch.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = copy.deepcopy(value)
+    return merged
+
+
+def _store(new_config):
+    """Übernimmt einen neuen Stand, erhöht bei Änderungen die Version und verschickt die Differenz."""
+    global _config, _version, _fetched_at
+    _fetched_at = time.monotonic()
+    changes = _diff(_config, new_config) if _config is not None else None
+    _config = new_config
+
+    if _config is not None and changes == {}:
+        return
+    _version += 1
+    if changes and g.socketio:
+        g.socketio.emit('board_config', {'version': _version, 'changes': changes}, to=BOARD_CONFIG_ROOM)
+        _stats['pushes'] += 1
+
+#----------------------------------------------------
+
+def cached_config(max_age=None):
+    """Liefert die Konfiguration des Board Managers (wie get_config), aus dem Cache.
+
+        Args:
+            max_age (float): Maximales Alter in Sekunden, Standard BOARD_CONFIG_TTL.
+
+        Returns:
+            dict | None: Die Konfiguration. Schlägt die Abfrage fehl, der letzte bekannte Stand.
+    """
+    global _inflight
+    if max_age is None:
+        max_age = g.BOARD_CONFIG_TTL
+
+    if _config is not None and time.monotonic() - _fetched_at < max_age:
+        _stats['hits'] += 1
+        return _config
+
+    if _inflight is not None:
+        _stats['joined'] += 1
+        return _inflight.get()
+
+    _inflight = waiter = AsyncResult()
+    try:
+        _stats['fetches'] += 1
+        fresh = get_config()
+        if fresh is not None:
+            _store(fresh)
+        else:
+            _stats['fetch_errors'] += 1
+    finally:
+        _inflight = None
+        waiter.set(_config)
+    return _config
+
+
+def refresh_config_if_stale():
+    """Holt die Konfiguration neu, wenn die TTL abgelaufen ist (Änderungen von außen werden
+       so auch ohne Abfrage einer Seite an die Abonnenten verschickt).
+    """
+    if _config is not None and time.monotonic() - _fetched_at >= g.BOARD_CONFIG_TTL:
+        cached_config()
+
+
+def patch_config_cached(config_data):
+    """Sendet Teil-Änderungen an den Board Manager (wie patch_config) und übernimmt sie in den Cache."""
+    result = patch_config(config_data)
+    if result is None:
+        return None
+
+    _stats['patches'] += 1
+    # Liefert der Board Manager die vollständige neue Konfiguration, wird sie übernommen,
+    # sonst wird die gesendete Änderung auf den Cache angewendet.
+    if _config is None:
+        return result # Noch kein Stand im Cache, die nächste Abfrage holt ihn
+    is_full = isinstance(result, dict) and _config.keys() <= result.keys()
+    _store(result if is_full else _merge(_config, config_data))
+    return result
+
+#----------------------------------------------------
+
+def board_config_stats():
+    """Liefert die Kennzahlen des Konfigurations-Caches für /api/metrics."""
+    return dict(
+        _stats,
+        version = _version,
+        age_s   = round(time.monotonic() - _fetched_at, 1) if _config is not None else None,
+        ttl_s   = g.BOARD_CONFIG_TTL
+    )
+
+register_metrics_provider('board_config', board_config_stats)
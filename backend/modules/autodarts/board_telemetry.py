@@ -0,0 +1,242 @@
+# Backend/modules/autodarts/board_telemetry.py
+
+# Zentrale Abfrage der Board-Manager-Telemetrie (Stats, Kamera-Stats, Kamerazustand).
+#
+# Bisher hat jede geöffnete cmd-Seite jede Sekunde selbst get_stats, get_cams_stats und
+# get_cams_state angefordert: N Browser = N-fache Last auf dem Board Manager, ohne Verlauf.
+# Jetzt fragt ein einziger Greenlet die drei Endpunkte alle BOARD_TELEMETRY_INTERVAL_MS ab:
+#   - Der letzte Stand liegt im Cache, die bisherigen 'get_*'-Befehle werden daraus beantwortet.
+#   - Jede Abfrage landet als kompakter Eintrag (Zeit, FPS gesamt und pro Kamera, Zustand der
+#     Kameras) in einem Ringpuffer fester Größe (BOARD_TELEMETRY_HISTORY).
+#   - Abonnenten (Socket.IO-Raum TELEMETRY_ROOM) bekommen nur die geänderten Teile geschickt.
+# Abgefragt wird nur, solange jemand die Daten braucht: ein Abonnent oder ein 'get_*'-Befehl
+# innerhalb der letzten DEMAND_TIMEOUT Sekunden.
+
+import collections
+import logging
+import time
+
+import gevent
+from gevent.event import Event
+
+from ..core import shared_state as g
+from ..core.metrics import register_metrics_provider
+from .local_board_client import get_stats, get_cams_stats, get_cams_state
+from .board_config import refresh_config_if_stale
+
+TELEMETRY_ROOM = 'board_telemetry'  # Socket.IO-Raum der Abonnenten
+DEMAND_TIMEOUT = 10                 # Sekunden ohne Abonnent/Abfrage, nach denen das Abfragen pausiert
+
+# Dispatcher-Dictionary: Teil der Telemetrie -> Funktion des Board-Manager-Clients
+TELEMETRY_SOURCES = {
+    'stats':      get_stats,
+    'cams_stats': get_cams_stats,
+    'cams_state': get_cams_state
+}
+
+_latest      = {name: None for name in TELEMETRY_SOURCES}
+_sampled_at  = None     # time.time() der letzten Abfrage
+_updated_at  = {name: None for name in TELEMETRY_SOURCES}  # time.time() der letzten Antwort pro Teil
+_history     = collections.deque(maxlen=600)
+_subscribers = set()
+_last_demand = 0.0
+_wake        = Event()
+_sampled     = Event()  # wird nach jeder Abfrage gesetzt und sofort durch ein neues ersetzt
+_sampler     = None
+
+_stats = {
+    'samples':        0,
+    'sample_errors':  0,
+    'cache_hits':     0,
+    'cache_waits':    0,
+    'stale_misses':   0,
+    'pushes':         0,
+    'last_sample_ms': None
+}
+
+#----------------------------------------------------
+
+def _interval():
+    return max(g.BOARD_TELEMETRY_INTERVAL_MS, 100) / 1000
+
+
+def _has_demand():
+    return bool(_subscribers) or time.monotonic() - _last_demand < DEMAND_TIMEOUT
+
+
+def _history_entry(t, latest, failed):
+    """Der kompakte Eintrag für den Ringpuffer. Teile ohne Antwort stehen als None darin und
+       werden unter 'failed' aufgeführt, statt den alten Stand als neuen Messwert einzutragen."""
+    fresh = {name: (None if name in failed else latest[name]) or {} for name in latest}
+    entry = {
+        't':          round(t, 3),
+        'fps':        fresh['stats'].get('fps'),
+        'cam_fps':    fresh['cams_stats'].get('fps'),
+        'is_opened':  fresh['cams_state'].get('isOpened'),
+        'is_running': fresh['cams_state'].get('isRunning')
+    }
+    if failed:
+        entry['failed'] = failed
+    return entry
+
+#----------------------------------------------------
+
+def _sample():
+    """Fragt alle Endpunkte gleichzeitig ab, aktualisiert Cache und Verlauf und verschickt die Änderungen."""
+    global _sampled_at, _sampled
+    start = time.perf_counter()
+    jobs  = {name: gevent.spawn(source) for name, source in TELEMETRY_SOURCES.items()}
+    gevent.joinall(list(jobs.values()))
+
+    now     = time.time()
+    changed = {}
+    failed  = []
+    for name, job in jobs.items():
+        value = job.value
+        if value is None:
+            # Fehler wurden bereits im Client geloggt, der letzte Stand bleibt erhalten, gilt aber nicht als frisch
+            _stats['sample_errors'] += 1
+            failed.append(name)
+            continue
+        if value != _latest[name]:
+            changed[name] = value
+        _latest[name]     = value
+        _updated_at[name] = now
+
+    _sampled_at = now
+    _history.append(_history_entry(_sampled_at, _latest, failed))
+    _stats['samples'] += 1
+    _stats['last_sample_ms'] = round((time.perf_counter() - start) * 1000, 2)
+
+    done, _sampled = _sampled, Event()
+    done.set()
+
+    if changed and _subscribers and g.socketio:
+        g.socketio.emit('board_telemetry', dict(changed, t=_sampled_at), to=TELEMETRY_ROOM)
+        _stats['pushes'] += 1
+
+    # Nach Ablauf der TTL auch die Konfiguration prüfen, Änderungen gehen als 'board_config' raus
+    if _subscribers:
+        refresh_config_if_stale()
+
+
+def _sampler_loop():
+    while True:
+        if g.boardManagerAddress and _has_demand():
+            try:
+                _sample()
+            except Exception as e:
+                _stats['sample_errors'] += 1
+                logging.error("Board-Telemetrie konnte nicht abgefragt werden: %s", e)
+            gevent.sleep(_interval())
+        else:
+            # Pausieren, bis jemand die Daten wieder braucht
+            _wake.wait(timeout=DEMAND_TIMEOUT)
+            _wake.clear()
+
+#----------------------------------------------------
+
+def _is_fresh(name):
+    """Hat der Endpunkt innerhalb der letzten zwei Intervalle geantwortet?"""
+    updated_at = _updated_at[name]
+    return updated_at is not None and time.time() - updated_at < 2 * _interval()
+
+
+def _cached(name):
+    """Liefert einen Teil der Telemetrie aus dem Cache.
+
+        Ist der Teil älter als zwei Intervalle (Abfrage pausiert oder der Endpunkt hat zuletzt
+        nicht geantwortet), wird der Sampler geweckt und auf seine nächste Abfrage gewartet.
+        Gleichzeitige Anfragen warten so auf dieselbe Abfrage. Hat der Endpunkt auch dann nicht
+        geantwortet, wird None geliefert (wie bei der direkten Abfrage), nicht der alte Stand.
+    """
+    global _last_demand
+    _last_demand = time.monotonic()
+
+    if _is_fresh(name):
+        _stats['cache_hits'] += 1
+        return _latest[name]
+
+    if _sampler is None:
+        # Ohne Sampler (z.B. beim Start) direkt beim Board Manager fragen
+        return TELEMETRY_SOURCES[name]()
+
+    _stats['cache_waits'] += 1
+    waiter = _sampled
+    _wake.set()
+    waiter.wait(timeout=2 * _interval() + 2)
+    if not _is_fresh(name):
+        _stats['stale_misses'] += 1
+        return None
+    return _latest[name]
+
+
+def cached_stats():
+    """Live-Statistiken des Board Managers (wie get_stats), aus dem Telemetrie-Cache."""
+    return _cached('stats')
+
+
+def cached_cams_stats():
+    """Statistiken pro Kamera (wie get_cams_stats), aus dem Telemetrie-Cache."""
+    return _cached('cams_stats')
+
+
+def cached_cams_state():
+    """Zustand der Kameras (wie get_cams_state), aus dem Telemetrie-Cache."""
+    return _cached('cams_state')
+
+#----------------------------------------------------
+
+def subscribe_telemetry(sid):
+    """Meldet einen Client für die Telemetrie-Updates an.
+
+        Returns:
+            dict: Der vollständige aktuelle Stand (danach kommen nur noch Änderungen).
+    """
+    _subscribers.add(sid)
+    _wake.set()
+    return dict(_latest, t=_sampled_at)
+
+
+def unsubscribe_telemetry(sid):
+    """Meldet einen Client ab (auch beim Verbindungsabbruch)."""
+    _subscribers.discard(sid)
+
+
+def get_telemetry_history(since=None):
+    """Der Verlauf aus dem Ringpuffer, optional erst ab einem Zeitstempel."""
+    if since is None:
+        return list(_history)
+    return [entry for entry in _history if entry['t'] > since]
+
+#----------------------------------------------------
+
+def start_board_telemetry():
+    """Startet den Sampler-Greenlet."""
+    global _sampler, _history
+    if _sampler is None:
+        _history = collections.deque(_history, maxlen=max(g.BOARD_TELEMETRY_HISTORY, 1))
+        _sampler = gevent.spawn(_sampler_loop)
+
+
+def stop_board_telemetry():
+    """Beendet den Sampler-Greenlet (beim Herunterfahren)."""
+    global _sampler
+    if _sampler is not None:
+        _sampler.kill()
+        _sampler = None
+
+#----------------------------------------------------
+
+def board_telemetry_stats():
+    """Liefert die Kennzahlen der Telemetrie-Abfrage für /api/metrics."""
+    return dict(
+        _stats,
+        subscribers  = len(_subscribers),
+        history      = len(_history),
+        active       = _sampler is not None and _has_demand(),
+        last_sample  = _sampled_at,
+        updated_at   = dict(_updated_at)
+    )
+
+register_metrics_provider('board_telemetry', board_telemetry_stats)
@@ -2,12 +2,103 @@
 
 import requests
 import logging
+import threading
+import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from ..core import shared_state as g
 from ..core.utils_backend import log_function_call
+from ..core.metrics import register_metrics_provider
 
 # Hinweis: Die Funktionen in dieser Datei werden in `webserver_handler.py` verwendet,
 # um auf Befehle zu reagieren, die über die Socket.IO-Schnittstelle empfangen werden.
 # Sie ermöglichen die Fernsteuerung des Boards.
+#
+# Alle Aufrufe laufen über eine gemeinsame requests.Session: Die TCP-Verbindungen zum Board
+# Manager bleiben offen (Keep-Alive) und werden aus einem Pool wiederverwendet, statt für jede
+# Abfrage (die cmd-Seite fragt Stats und Kamerazustand laufend ab) eine neue aufzubauen.
+# Verbindungsfehler werden mit Backoff wiederholt, lesende Anfragen (GET/PUT) auch bei
+# Lese-Timeouts und 502/503/504.
+
+BOARD_HTTP_POOL_SIZE = 4    # Gleichzeitige Verbindungen zum Board Manager
+BOARD_HTTP_RETRIES   = 2    # Wiederholungen nach einem Fehler
+BOARD_HTTP_BACKOFF   = 0.2  # Sekunden, verdoppelt sich mit jeder Wiederholung
+
+# Dispatcher-Dictionary: Endpunkt -> (HTTP-Methode, Pfad, (Connect-, Read-Timeout))
+# Die häufig abgefragten Zustände bekommen kurze Timeouts, damit eine hängende Abfrage die
+# cmd-Seite nicht blockiert. Aktionen, die auf dem Board länger dauern, bekommen mehr Zeit.
+BOARD_ENDPOINTS = {
+    'start':      ('PUT',   '/api/start',                         (2, 5)),
+    'stop':       ('PUT',   '/api/stop',                          (2, 5)),
+    'reset':      ('POST',  '/api/reset',                         (2, 5)),
+    'calibrate':  ('POST',  '/api/config/calibration/auto{cam}',  (2, 10)),
+    'restart':    ('POST',  '/api/restart',                       (2, 5)),
+    'config':     ('GET',   '/api/config',                        (2, 5)),
+    'patch':      ('PATCH', '/api/config',                        (2, 5)),
+    'stats':      ('GET',   '/api/state/stats',                   (1, 2)),
+    'cams_state': ('GET',   '/api/cams/state',                    (1, 2)),
+    'cams_stats': ('GET',   '/api/cams/stats',                    (1, 2))
+}
+
+_session      = None
+_session_lock = threading.Lock()
+
+# Endpunkt -> {'calls', 'errors', 'total_ms', 'max_ms', 'last_ms'}
+_endpoint_stats = {}
+
+#----------------------------------------------------
+
+def _get_session():
+    """Liefert die gemeinsame Session (wird beim ersten Aufruf angelegt)."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                retry = Retry(
+                    total            = BOARD_HTTP_RETRIES,
+                    backoff_factor   = BOARD_HTTP_BACKOFF,
+                    status_forcelist = (502, 503, 504),
+                    allowed_methods  = frozenset({'GET', 'PUT'}), # Verbindungsfehler werden immer wiederholt
+                    raise_on_status  = False
+                )
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=BOARD_HTTP_POOL_SIZE, max_retries=retry)
+                session = requests.Session()
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                _session = session
+    return _session
+
+
+def _board_request(endpoint, cam='', **kwargs):
+    """Führt einen Aufruf an den Board Manager über die gemeinsame Session aus und misst die Dauer.
+
+        Args:
+            endpoint (str): Schlüssel in BOARD_ENDPOINTS.
+            cam (str):      Optionaler Pfad-Zusatz (nur für 'calibrate').
+            **kwargs:       Weitere Argumente für requests (z.B. json, params).
+
+        Returns:
+            requests.Response: Die Antwort (raise_for_status() wurde bereits aufgerufen).
+    """
+    method, path, timeout = BOARD_ENDPOINTS[endpoint]
+    stats = _endpoint_stats.setdefault(endpoint, {'calls': 0, 'errors': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'last_ms': None})
+
+    start = time.perf_counter()
+    try:
+        response = _get_session().request(method, g.boardManagerAddress + path.format(cam=cam), timeout=timeout, **kwargs)
+        response.raise_for_status()
+        return response
+    except requests.exceptions.RequestException:
+        stats['errors'] += 1
+        raise
+    finally:
+        elapsed = (time.perf_counter() - start) * 1000
+        stats['calls']    += 1
+        stats['total_ms'] += elapsed
+        stats['max_ms']    = max(stats['max_ms'], elapsed)
+        stats['last_ms']   = round(elapsed, 2)
+
+#----------------------------------------------------
 
 @log_function_call
 def start_board():
@@ -15,8 +106,7 @@ def start_board():
     try:
         if g.boardManagerAddress:
 #            response = requests.put(g.boardManagerAddress + '/api/detection/start', timeout=5)
-            response = requests.put(g.boardManagerAddress + '/api/start', timeout=5)
-            response.raise_for_status()
+            _board_request('start')
     except requests.exceptions.RequestException as e:
         logging.error("API call to start board failed: %s", e)
 
@@ -28,8 +118,7 @@ def stop_board():
     try:
         if g.boardManagerAddress:
 #            response = requests.put(g.boardManagerAddress + '/api/detection/stop', timeout=5)
-            response = requests.put(g.boardManagerAddress + '/api/stop', timeout=5)
-            response.raise_for_status()
+            _board_request('stop')
     except requests.exceptions.RequestException as e:
         logging.error("API call to stop board failed: %s", e)
 
@@ -40,8 +129,7 @@ def reset_board():
     """Sendet einen Befehl an den lokalen Board Manager, um das Board zurückzusetzen."""
     try:
         if g.boardManagerAddress:
-            response = requests.post(g.boardManagerAddress + '/api/reset', timeout=5)
-            response.raise_for_status()
+            _board_request('reset')
     except requests.exceptions.RequestException as e:
         logging.error("API call to reset board failed: %s", e)
 
@@ -55,19 +143,15 @@ def calibrate_board(camId=None, distortion=False):
     """
     try:
         if g.boardManagerAddress:
-            # Baue die URL dynamisch zusammen
-            if camId is not None:
-                url = f"{g.boardManagerAddress}/api/config/calibration/auto/{camId}?distortion={distortion}"
-            else:
-                # Fallback auf den alten Endpunkt für die Remote-Kalibrierung, falls benötigt,
-                # oder den allgemeinen lokalen Endpunkt.
-                url = f"{g.boardManagerAddress}/api/config/calibration/auto?distortion={distortion}"
-
-            response = requests.post(url, timeout=5)
-            response.raise_for_status()
+            # Mit camId der Endpunkt für eine einzelne Kamera, sonst der allgemeine
+            # lokale Endpunkt (Fallback für die Remote-Kalibrierung).
+            cam = f"/{camId}" if camId is not None else ''
+            _board_request('calibrate', cam=cam, params={'distortion': distortion})
+            return True
 
     except requests.exceptions.RequestException as e:
         logging.error("API call to calibrate board failed: %s", e)
+    return False
 
 #----------------------------------------------------
 
@@ -76,8 +160,7 @@ def restart_board():
     """Sendet einen Befehl an den lokalen Board Manager, um diesen neu zu starten."""
     try:
         if g.boardManagerAddress:
-            response = requests.post(g.boardManagerAddress + '/api/restart', timeout=5)
-            response.raise_for_status()
+            _board_request('restart')
             return True
     except requests.exceptions.RequestException as e:
         logging.error("API call to restart board failed: %s", e)
@@ -90,10 +173,7 @@ def get_config():
     """Ruft die gesamte Konfiguration des lokalen Board Managers ab."""
     try:
         if g.boardManagerAddress:
-            response = requests.get(g.boardManagerAddress + '/api/config', timeout=5)
-            response.raise_for_status()
-            return response.json()
-            logging.info("RES: %s", res)
+            return _board_request('config').json()
         else:
             logging.warning("DEBUG: get_config aufgerufen, aber g.boardManagerAddress ist None.") # DEBUG-Log
     except requests.exceptions.RequestException as e:
@@ -107,9 +187,7 @@ def patch_config(config_data):
     """Sendet Teil-Änderungen an die Konfiguration des lokalen Board Managers."""
     try:
         if g.boardManagerAddress:
-            response = requests.patch(g.boardManagerAddress + '/api/config', json=config_data, timeout=5)
-            response.raise_for_status()
-            return response.json()
+            return _board_request('patch', json=config_data).json()
     except requests.exceptions.RequestException as e:
         logging.error("API call to patch config failed: %s", e)
     return None
@@ -121,9 +199,7 @@ def get_stats():
     """Ruft Live-Statistiken (z.B. FPS) vom lokalen Board Manager ab."""
     try:
         if g.boardManagerAddress:
-            response = requests.get(g.boardManagerAddress + '/api/state/stats', timeout=5)
-            response.raise_for_status()
-            return response.json()
+            return _board_request('stats').json()
         else:
             logging.warning("DEBUG: get_stats aufgerufen, aber g.boardManagerAddress ist None.") # DEBUG-Log
     except requests.exceptions.RequestException as e:
@@ -137,9 +213,7 @@ def get_cams_state():
     """Fragt den Zustand der Kameras vom lokalen Board Manager ab."""
     try:
         if g.boardManagerAddress:
-            response = requests.get(g.boardManagerAddress + '/api/cams/state', timeout=5)
-            response.raise_for_status()
-            return response.json()
+            return _board_request('cams_state').json()
     except requests.exceptions.RequestException as e:
         logging.error("API call to get cams state failed: %s", e)
     return None
@@ -151,9 +225,24 @@ def get_cams_stats():
     """Ruft detaillierte Statistiken (inkl. FPS) für jede einzelne Kamera ab."""
     try:
         if g.boardManagerAddress:
-            response = requests.get(g.boardManagerAddress + '/api/cams/stats', timeout=5)
-            response.raise_for_status()
-            return response.json()
+            return _board_request('cams_stats').json()
     except requests.exceptions.RequestException as e:
         logging.error("API call to get cams_stats failed: %s", e)
-    return None
\ No newline at end of file
+    return None
+
+#----------------------------------------------------
+
+def board_client_stats():
+    """Liefert Aufrufe, Fehler und Latenzen pro Endpunkt des Board Managers für /api/metrics."""
+    return {
+        endpoint: {
+            'calls':   s['calls'],
+            'errors':  s['errors'],
+            'avg_ms':  round(s['total_ms'] / s['calls'], 2) if s['calls'] else None,
+            'max_ms':  round(s['max_ms'], 2),
+            'last_ms': s['last_ms']
+        }
+        for endpoint, s in list(_endpoint_stats.items())
+    }
+
+register_metrics_provider('board_manager', board_client_stats)
\ No newline at end of file
@@ -2,7 +2,6 @@
 
 import logging
 import json
-import requests
 from requests.exceptions import RequestException
 import time
 import ssl
@@ -10,6 +9,7 @@ import websocket
 import logging
 import traceback
 import gevent
+import importlib
 import math
 import urllib3
 from datetime import datetime, timezone, timedelta
@@ -20,23 +20,17 @@ from ..core import shared_state as g
 from ..core import constants as c
 from ..core import security_module
 from ..core.utils_backend import log_event, log_event_ad, log_function_call, broadcast, write_json_to_file
+from ..core.processed_legs import leg_id_of
+from ..core.throw_recorder import record_throws
+from ..core.session_journal import journal_event
+from ..core.debug_log_store import STORES, debug_log_append
 from ..autodarts.autodarts_api_client import fetch_and_update_board_address, get_player_average
+from ..autodarts.autodarts_rest_client import autodarts_rest
 
 # Spiel-Module
 from ..spiellogik.match_handler import orchestrate_match_start_and_finish, _request_initial_game_update
 
-from ..spiellogik.process_match_x01 import process_match_x01, update_x01_statistic_after_leg
-from ..spiellogik.process_match_cricket import process_match_cricket, update_cricket_tactics_statistic_after_leg
-from ..spiellogik.process_match_bermuda import process_match_bermuda
-from ..spiellogik.process_match_shanghai import process_match_shanghai
-from ..spiellogik.process_match_gotcha import process_match_gotcha
-from ..spiellogik.process_match_atc import process_match_atc, update_atc_statistic_after_leg
-from ..spiellogik.process_match_rtw import process_match_rtw
-from ..spiellogik.process_match_bull_off import process_match_bull_off
-from ..spiellogik.process_match_random_checkout import process_match_random_checkout
-from ..spiellogik.process_match_countup import process_match_countup, update_countup_statistic_after_leg
-from ..spiellogik.process_match_segment_training import process_match_segment_training, update_segment_training_statistic_after_leg
-from ..spiellogik.process_match_bobs27 import process_match_bobs27
+# Die einzelnen process_match_*-Module werden erst beim ersten Event ihres Spielmodus geladen (_lazy)
 
 # ============================================================================
 # === Statische Dispatcher auf Modulebene sind am Ende der Datei definiert ===
@@ -99,12 +93,6 @@ def connect_autodarts(cert_check_flag):
     """
     # Starte die Schleife und speichere eine Referenz auf den Greenlet
     g.ws_greenlet = gevent.spawn(_websocket_connection_loop, cert_check_flag)
-    
-    try:
-        res = requests.get(g.AUTODARTS_BOARDS_URL + g.AUTODARTS_BOARD_ID, headers=security_module.get_auth_header())
-
-    except Exception as e:
-        logging.error("Failed to get user name on initial connect: %s", e)
 
 
 #----------------------------------------------------
@@ -149,8 +137,10 @@ def on_open_autodarts(websocket_connection):
     Args:
         websocket_connection: Die aktive WebSocketApp-Instanz.
     """
-    # ermittle die lokale Board-Adresse
-    fetch_and_update_board_address()
+    scan_started = time.perf_counter()
+
+    # ermittle die lokale Board-Adresse, parallel zur Suche nach einem laufenden Match
+    board_address_job = gevent.spawn(fetch_and_update_board_address)
     
     # Es kann vorkommen, dass bei der Wiederverbindung der Autodarts-Server Daten über mehr als ein Spiel liefert die er für das aktuelle Baord
     # gefunden hat. Warum ist unklar. Möglicherweise ist da irgendwo auf dem Autodarts_Server etwas "hängengeblieben". Darum hier folgende zusätzliche Prüfungen:
@@ -160,10 +150,12 @@ def on_open_autodarts(websocket_connection):
     #    - Prüfe ob die Gesamtzahl der geworfenen Darts im aktuellen Leg des Matches (das war bei den bisherigen "GeisterSpielen" so)
     #    - Prüfe ob der Status von is_finished = False ist
 
+    # Match, das beim Start aus dem Sitzungs-Journal wiederhergestellt wurde (oder vor der Wiederverbindung lief)
+    previous_match_id = g.active_match_id if g.active_match_id and not g.active_match_id.startswith('lobby:') else None
+    match_resumed     = False
+
     try:
-        res = requests.get(g.AUTODARTS_MATCHES_URL, headers=security_module.get_auth_header(), timeout=10)
-        res.raise_for_status()
-        all_matches = res.json()
+        all_matches = autodarts_rest.get(g.AUTODARTS_MATCHES_URL, 'matches.list').json()
 
         # 1. Filtere alle Matches heraus, die zu unserem Board gehören
         board_matches = []
@@ -204,6 +196,7 @@ def on_open_autodarts(websocket_connection):
                         {c.KEY_EVENT: 'start', c.KEY_ID: newest_match.get('id')},
                         websocket_connection
                     )
+                    match_resumed = newest_match.get('id') == previous_match_id
                 else:
                     logging.info("Neuestes gefundenes Match ist zu alt. Starte im Leerlauf.")
 
@@ -213,9 +206,22 @@ def on_open_autodarts(websocket_connection):
             if g.DEBUG:
                 logging.info("Keine laufenden Matches für dieses Board gefunden. Starte im Leerlauf.")
 
+        # Das zuvor angezeigte Match läuft nicht mehr: Anzeigen zurücksetzen
+        if previous_match_id and not match_resumed and g.active_match_id == previous_match_id:
+            orchestrate_match_start_and_finish({c.KEY_EVENT: 'finish', c.KEY_ID: previous_match_id}, websocket_connection)
+
     except RequestException as e:
         logging.error('Fetching matches failed: %s', e)
 
+    board_address_job.join()
+
+    # Nur beim ersten Verbindungsaufbau: Dauer der Netzwerk-Phasen ausgeben
+    if 'live' not in g.startup_phases:
+        g.startup_phases['board_and_match_scan'] = round((time.perf_counter() - scan_started) * 1000, 1)
+        if g.startup_started_at is not None:
+            g.startup_phases['live'] = round((time.perf_counter() - g.startup_started_at) * 1000, 1)
+        logging.info("STARTUP: %s", " | ".join(f"{name} {g.startup_phases[name]} ms" for name in ('login', 'board_and_match_scan', 'live') if name in g.startup_phases))
+
     try:
         params = {"channel": c.AUTODARTS_BOARDS, "type": c.TYPE_SUBSCRIBE, "topic": g.AUTODARTS_BOARD_ID + ".matches"}
         websocket_connection.send(json.dumps(params))
@@ -291,18 +297,8 @@ def on_message_autodarts(websocket_connection, message):
         try:
             m = json.loads(message)
 
-            # JEDE eingehende Nachricht vom Autodarts-Server im Live-Log speichern
-            # Initialisiere den Log, falls er noch nicht existiert
-            if not hasattr(g, 'autodarts_raw_log'):
-                g.autodarts_raw_log = []
-            
-            # Füge die neue Nachricht mit einem Zeitstempel hinzu
-            log_entry = {
-                "time": datetime.now().strftime("%H:%M:%S.%f")[:-3],
-                "data": message
-            }
-
-            g.autodarts_raw_log.append(log_entry)
+            # JEDE eingehende Nachricht vom Autodarts-Server im Live-Log speichern (mit Zeitstempel)
+            log_entry = debug_log_append('debugadall', None, message)
             
             # Sende die neue Nachricht an alle verbundenen /debugadall-Clients
             if g.socketio:
@@ -313,18 +309,14 @@ def on_message_autodarts(websocket_connection, message):
             channel = m.get('channel')
             event   = m.get(c.KEY_DATA, {}).get(c.KEY_EVENT)
 
-            #g.ad_debug_log löschen, wenn die Lobby aufgerufen wird
+            #Die Anzeige von /debugad leeren, wenn die Lobby aufgerufen wird
             if m.get('channel') == c.AUTODARTS_USERS and event == "lobby-enter":    
-                g.ad_debug_log.clear()
                 log_event_ad('clear_log')
 
                 #und das ganze für /debug
-                g.debug_log.clear()
                 log_event('clear_log')
 
             # BLOCK FÜR /debugad
-            # Füge die Nachricht zur Liste hinzu
-            g.ad_debug_log.append(m)
             if g.socketio:
                 # Sende nur das letzte Update an die Live-Ansicht
                 log_event_ad('ad_data_update', m)
@@ -387,6 +379,12 @@ def _handle_matches_channel(match_event_data, websocket_connection):
             event_to_broadcast = processor(data)
             broadcast(event_to_broadcast)
 
+            # Event und Sitzungszustand für einen schnellen Neustart sichern (session_journal.py)
+            journal_event(event_to_broadcast)
+
+            # Die einzelnen Darts nur puffern, geschrieben wird im Hintergrund (throw_recorder.py)
+            record_throws(data, event_to_broadcast.get('turn', {}).get(c.KEY_TARGET))
+
         else:
             logging.info(f"WARNUNG: Unbekannter Spielmodus '%s' empfangen. Keine Aktion ausgeführt.", variant)
 
@@ -394,6 +392,16 @@ def _handle_matches_channel(match_event_data, websocket_connection):
         if data.get(c.STATE_GAME_FINISHED):
             # Finde die passende Speicherfunktion im neuen Dispatcher
             saver_function = LEG_END_HANDLERS.get(variant)
+
+            # Schneller Vorfilter: Das doppelte Leg-Ende-Event nach dem Klick auf 'Finish'
+            # erreicht die Datenbank gar nicht erst. Ist das Leg hier unbekannt (z.B. nach einem
+            # Neustart), verhindert der eindeutige Schlüssel in der Datenbank doppeltes Speichern.
+            leg_id = leg_id_of(data)
+            if saver_function and leg_id in g.processed_leg_ids:
+                if g.DEBUG > 0:
+                    logging.info("Leg %s wurde bereits verarbeitet. Überspringe doppeltes Speichern.", leg_id)
+                saver_function = None
+
             if saver_function:
                 # Führe die gefundene Funktion aus
                 saver_function(data)
@@ -523,8 +531,8 @@ def _handle_lobbies_channel(match_event_data, websocket_connection):
     if c.KEY_EVENT in data:
 
         if data.get(c.KEY_EVENT) == 'start':
-            # Leere das Rohdaten-Log
-            g.autodarts_raw_log.clear()
+            # Das Rohdaten-Log beginnt für neu verbundene Seiten hier (gespeichert bleibt alles)
+            STORES['debugadall'].mark_cleared()
 
             # Die gesamte Logik für das "start"-Event gehört hier hinein
             body = data.get('body', {})
@@ -617,20 +625,33 @@ CHANNEL_HANDLERS = {
 
 #----------------------------------------------------
 
+def _lazy(module_name, function_name):
+    """Platzhalter für eine Funktion eines Spielmoduls, das erst beim ersten Aufruf importiert wird."""
+    target = None
+
+    def call(*args, **kwargs):
+        nonlocal target
+        if target is None:
+            target = getattr(importlib.import_module(f"..spiellogik.{module_name}", __package__), function_name)
+        return target(*args, **kwargs)
+
+    call.__name__ = function_name
+    return call
+
 # Dispatcher für Spielmodi
 GAME_PROCESSORS = {
-    'X01'             : process_match_x01,
-    'Cricket'         : process_match_cricket,
-    'Bermuda'         : process_match_bermuda,
-    'Shanghai'        : process_match_shanghai,
-    'Gotcha'          : process_match_gotcha,
-    'ATC'             : process_match_atc,
-    'RTW'             : process_match_rtw,
-    'Random Checkout' : process_match_random_checkout,
-    'Bull-off'        : process_match_bull_off,
-    'CountUp'         : process_match_countup,
-    'Segment Training': process_match_segment_training,
-    "Bob's 27"        : process_match_bobs27
+    'X01'             : _lazy('process_match_x01',              'process_match_x01'),
+    'Cricket'         : _lazy('process_match_cricket',          'process_match_cricket'),
+    'Bermuda'         : _lazy('process_match_bermuda',          'process_match_bermuda'),
+    'Shanghai'        : _lazy('process_match_shanghai',         'process_match_shanghai'),
+    'Gotcha'          : _lazy('process_match_gotcha',           'process_match_gotcha'),
+    'ATC'             : _lazy('process_match_atc',              'process_match_atc'),
+    'RTW'             : _lazy('process_match_rtw',              'process_match_rtw'),
+    'Random Checkout' : _lazy('process_match_random_checkout',  'process_match_random_checkout'),
+    'Bull-off'        : _lazy('process_match_bull_off',         'process_match_bull_off'),
+    'CountUp'         : _lazy('process_match_countup',          'process_match_countup'),
+    'Segment Training': _lazy('process_match_segment_training', 'process_match_segment_training'),
+    "Bob's 27"        : _lazy('process_match_bobs27',           'process_match_bobs27')
 }
 
 # Dispatcher für Events
@@ -641,11 +662,11 @@ EVENT_HANDLERS = {
 
 # Dispatcher für die Statistik-Speicherfunktionen am Leg-Ende
 LEG_END_HANDLERS = {
-    'X01':              update_x01_statistic_after_leg,
-    'Cricket':          update_cricket_tactics_statistic_after_leg,
-    'Tactics':          update_cricket_tactics_statistic_after_leg, #nutzt die gleiche Funktion wie Cricket
-    'ATC':              update_atc_statistic_after_leg,
-    'CountUp':          update_countup_statistic_after_leg,
-    'Segment Training': update_segment_training_statistic_after_leg
+    'X01':              _lazy('process_match_x01',              'update_x01_statistic_after_leg'),
+    'Cricket':          _lazy('process_match_cricket',          'update_cricket_tactics_statistic_after_leg'),
+    'Tactics':          _lazy('process_match_cricket',          'update_cricket_tactics_statistic_after_leg'), #nutzt die gleiche Funktion wie Cricket
+    'ATC':              _lazy('process_match_atc',              'update_atc_statistic_after_leg'),
+    'CountUp':          _lazy('process_match_countup',          'update_countup_statistic_after_leg'),
+    'Segment Training': _lazy('process_match_segment_training', 'update_segment_training_statistic_after_leg')
 }
 #----------------------------------------------------
@@ -6,14 +6,48 @@ import certifi
 import os
 import platform
 import sys
-import logging
+import time
+from contextlib import contextmanager
+
+import gevent
 
 from . import shared_state as g
 from ..core import security_module
 from .config_loader import load_and_parse_config
-from .utils_backend import check_already_running, setup_logger
-from ..autodarts.autodarts_keycloak_client import AutodartsKeycloakClient
-from ..autodarts.websocket_handlers import connect_autodarts
+from .utils_backend import setup_logger
+from .log_pipeline import stop_log_queue
+from .debug_log_store import close_debug_logs
+from .command_pool import start_command_pool, stop_command_pool
+from .instance_lock import acquire_instance_lock, start_status_socket, query_running_instance, release_instance_lock
+from .player_stats_cache import player_stats_cache
+from .db_backends import DB_BACKENDS, check_db_schema, close_db_backends
+from ..autodarts.websocket_handlers import connect_autodarts, LEG_END_HANDLERS
+from .leg_spool import start_leg_spool_replayer, stop_leg_spool_replayer
+from .metrics import register_metrics_provider
+from .throw_recorder import start_throw_recorder, stop_throw_recorder
+from .session_journal import restore_session, close_session_journal
+from ..autodarts.board_telemetry import start_board_telemetry, stop_board_telemetry
+
+#--------------------------------------
+
+@contextmanager
+def _startup_phase(name):
+    """Misst die Dauer einer Startphase und legt sie in g.startup_phases ab (Banner, /api/metrics)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        g.startup_phases[name] = round((time.perf_counter() - start) * 1000, 1)
+
+
+def format_startup_phases(names):
+    """Formatiert die gemessenen Startphasen für die Konsole, z.B. "config 4.1 ms | login 640.2 ms"."""
+    return " | ".join(f"{name} {g.startup_phases[name]} ms" for name in names if name in g.startup_phases)
+
+
+def _startup_stats():
+    """Liefert die Dauer der Startphasen für /api/metrics."""
+    return dict(g.startup_phases)
 
 #--------------------------------------
 
@@ -39,7 +73,14 @@ def _validate_configuration():
 
     
     # Bedingte Prüfung für die Datenbank
-    if g.USE_DATABASE:
+    if g.USE_DATABASE and g.DB_BACKEND not in DB_BACKENDS:
+        missing_vars.append(f"DB_BACKEND (ungültig: '{g.DB_BACKEND}', erlaubt: {', '.join(DB_BACKENDS)})")
+
+    if g.USE_DATABASE and g.DB_BACKEND == 'sqlite' and not g.DB_SQLITE_PATH:
+        missing_vars.append('DB_SQLITE_PATH')
+
+    # Die Zugangsdaten werden nur für einen externen MariaDB-Server benötigt
+    if g.USE_DATABASE and g.DB_BACKEND == 'mariadb':
         db_required_vars = [
             'DB_USER',
             'DB_PASSWORD',
@@ -81,6 +122,16 @@ def shutdown_cleanup():
     if hasattr(g, 'ws_greenlet') and g.ws_greenlet:
         g.ws_greenlet.kill()
         sys.stderr.write("[SHUTDOWN] WebSocket-Client gestoppt.\n")
+
+    stop_leg_spool_replayer()
+    stop_throw_recorder()
+    stop_board_telemetry()
+    stop_command_pool()
+    close_session_journal()
+    close_debug_logs()
+    close_db_backends()
+    release_instance_lock()
+    stop_log_queue()
     sys.stderr.write("[SHUTDOWN] Auf Wiedersehen!\n")
     sys.stderr.flush()
 
@@ -89,22 +140,54 @@ def shutdown_cleanup():
 def initialize_application():
     """Führt alle notwendigen Schritte zur Initialisierung der Backend-Anwendung aus.
 
-        Dies umfasst das Laden der Konfiguration, das Einrichten des Loggings, 
-        das Starten des Keycloak-Authentifizierungs-Clients und den Aufbau der 
-        WebSocket-Verbindung zum Autodarts-Server.
+        Dies umfasst das Laden der Konfiguration, das Einrichten des Loggings und das
+        Wiederherstellen einer laufenden Sitzung. Das Starten des Keycloak-Authentifizierungs-
+        Clients und der Aufbau der WebSocket-Verbindung zum Autodarts-Server laufen danach im
+        Hintergrund (_start_network), damit der Webserver sofort Anfragen beantworten kann.
+        Die Dauer jeder Phase wird im Banner ausgegeben.
     """
-    setup_logger()
+    with _startup_phase('logging'):
+        setup_logger()
     
     os.environ['SSL_CERT_FILE'] = certifi.where()
     g.BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.realpath(__file__))))
     
-    setup_logger()
-    is_gunicorn = "gunicorn" in sys.argv[0]
-    load_and_parse_config()
-    _validate_configuration()
+    with _startup_phase('config'):
+        load_and_parse_config()
+        _validate_configuration()
+        player_stats_cache.configure(g.PLAYER_CACHE_MAX_ENTRIES, g.PLAYER_CACHE_TTL_SECONDS)
+    if g.USE_DATABASE:
+        with _startup_phase('database'):
+            schema_error = check_db_schema()
+        if schema_error:
+            # Jedes Leg würde am Schema scheitern, also lieber gar nicht erst starten
+            logging.critical("FEHLER: Das Datenbankschema ist veraltet und konnte nicht umgestellt werden: %s\n"
+                             "Bitte backend/docs/database_migration_leg_key.sql ausführen. Anwendung wird beendet.", schema_error)
+            sys.exit(1)
+
+    register_metrics_provider('processed_legs', g.processed_leg_ids.stats)
+    register_metrics_provider('startup', _startup_stats)
     atexit.register(shutdown_cleanup)
 
     is_gunicorn = "gunicorn" in sys.argv[0]
+    if not is_gunicorn and not acquire_instance_lock():
+        running = query_running_instance()
+        if running:
+            logging.info("Laufende Instanz: %s", running)
+        sys.exit()
+    start_status_socket()
+
+    # Laufendes Match aus dem Sitzungs-Journal sofort wiederherstellen, noch vor jedem Netzwerkzugriff
+    with _startup_phase('session_restore'):
+        restore_session()
+        start_leg_spool_replayer(LEG_END_HANDLERS)
+        start_throw_recorder()
+        start_board_telemetry()
+        start_command_pool()
+
+    if g.startup_started_at is not None:
+        g.startup_phases['ready'] = round((time.perf_counter() - g.startup_started_at) * 1000, 1)
+
     if is_gunicorn:
         gunicorn_msg = 'RUNNING MODE: Gunicorn'
     else:
@@ -118,19 +201,31 @@ def initialize_application():
 VERSION: {g.VERSION or "nicht gesetzt"}
 RUNNING OS: {platform.system()} | {os.name} | {platform.release()}
 SUPPORTED GAME-VARIANTS: {", ".join(g.SUPPORTED_GAME_VARIANTS)}
+DATABASE: {g.DB_BACKEND if g.USE_DATABASE else "deaktiviert"}
+STARTUP: {format_startup_phases(['imports', 'logging', 'config', 'database', 'session_restore', 'ready'])}
 
 {gunicorn_msg}
 """
     logging.info(banner_message)
 
-    if not is_gunicorn and check_already_running():
-        sys.exit()
+    # Anmeldung und WebSocket-Aufbau blockieren den Start des Webservers nicht mehr
+    gevent.spawn(_start_network)
+
+#--------------------------------------
+
+def _start_network():
+    """Meldet sich am Autodarts-Server an und baut die WebSocket-Verbindung auf.
 
+        Läuft in einem eigenen Greenlet. Die übrigen Netzwerkschritte (Board-Adresse,
+        Suche nach einem laufenden Match) folgen parallel in on_open_autodarts.
+    """
     try:
 #        g.keycloak_client = AutodartsKeycloakClient(username=g.AUTODARTS_USER_EMAIL, password=g.AUTODARTS_USER_PASSWORD, client_id=g.AUTODARTS_CLIENT_ID, client_secret=g.AUTODARTS_CLIENT_SECRET, debug=False)
 #        g.keycloak_client.start()
-        security_module.start()
+        with _startup_phase('login'):
+            security_module.start()
         connect_autodarts(g.AUTODARTS_CERT_CHECK)
     except Exception as e:
         logging.error("Initialisierung fehlgeschlagen: %s", e)
+        # Ein SystemExit aus einem Greenlet wird von gevent im Haupt-Greenlet ausgelöst
         sys.exit(1)
\ No newline at end of file
@@ -0,0 +1,88 @@
+# Backend/modules/core/board_geometry.py
+
+# Geometrie der Dartscheibe: Board-Koordinate (x, y) -> Segment.
+#
+# Die Koordinaten des Autodarts-Servers sind auf den Außenrand des Doppelrings normiert
+# (Radius 1.0 = 170 mm), y zeigt nach oben, x nach rechts (wie FIELD_COORDS).
+#
+# Statt für jeden Dart alle Zielpunkte aus FIELD_COORDS zu durchsuchen (nächster Nachbar),
+# wird das Segment in O(1) bestimmt:
+#   - Ring:   Vergleich des Radius mit den 6 festen Ringgrenzen (RING_EDGES)
+#   - Sektor: direkt aus dem Winkel berechnet (20 Sektoren à 18°, die 20 oben)
+#   - SEGMENT_TABLE[ring, sektor] liefert dann den Index in SEGMENT_NAMES.
+# classify_points() macht dasselbe für ganze NumPy-Arrays auf einmal.
+
+import math
+
+import numpy as np
+
+BOARD_RADIUS_MM = 170.0  # Außenrand des Doppelrings
+
+# Sektoren im Uhrzeigersinn, beginnend oben bei der 20
+SECTOR_ORDER = [20, 1, 18, 4, 13, 6, 10, 15, 2, 17, 3, 19, 7, 16, 8, 11, 14, 9, 12, 5]
+SECTOR_WIDTH = 360.0 / len(SECTOR_ORDER)
+
+# Äußere Ringgrenzen (normiert, Standardmaße in mm / 170): Bullseye, Bull, Single innen,
+# Triple, Single außen, Double. Alles außerhalb ist ein Fehlwurf.
+RING_EDGES = np.array([6.35, 15.9, 99.0, 107.0, 162.0, 170.0]) / BOARD_RADIUS_MM
+RING_NAMES = ['bullseye', 'bull', 'single_inner', 'triple', 'single_outer', 'double', 'miss']
+
+# Segmentnamen wie die Schlüssel in FIELD_COORDS ("0" = Fehlwurf, "25" = Bull, "50" = Bullseye)
+SEGMENT_NAMES = np.array(['0', '25', '50'] + [f"{prefix}{n}" for prefix in ('S', 'D', 'T') for n in range(1, 21)])
+_INDEX        = {name: i for i, name in enumerate(SEGMENT_NAMES)}
+
+def _build_segment_table():
+    """Vorberechnete Tabelle [Ring, Sektor] -> Index in SEGMENT_NAMES."""
+    prefixes = [None, None, 'S', 'T', 'S', 'D', None]
+    fixed    = {0: '50', 1: '25', 6: '0'}
+    table    = np.zeros((len(RING_NAMES), len(SECTOR_ORDER)), dtype=np.int16)
+    for ring, prefix in enumerate(prefixes):
+        for sector, number in enumerate(SECTOR_ORDER):
+            table[ring, sector] = _INDEX[fixed.get(ring) or f"{prefix}{number}"]
+    return table
+
+SEGMENT_TABLE = _build_segment_table()
+
+# Dieselben Daten als Python-Listen für den Einzelwert-Pfad (NumPy-Indizierung einzelner Werte ist langsam)
+_RING_EDGES     = RING_EDGES.tolist()
+_SEGMENT_LOOKUP = [[str(SEGMENT_NAMES[i]) for i in row] for row in SEGMENT_TABLE]
+
+#----------------------------------------------------
+
+def distance_to_bull(x, y, mm=False):
+    """Abstand zur Boardmitte, normiert (1.0 = Außenrand Double) oder in Millimetern.
+       Funktioniert für einzelne Werte und für NumPy-Arrays.
+    """
+    distance = np.hypot(x, y) if isinstance(x, np.ndarray) else math.hypot(x, y)
+    return distance * BOARD_RADIUS_MM if mm else distance
+
+
+def sector_of(x, y):
+    """Index in SECTOR_ORDER des Sektors, in dem (x, y) liegt (auch für NumPy-Arrays)."""
+    if isinstance(x, np.ndarray):
+        return ((np.degrees(np.arctan2(x, y)) + SECTOR_WIDTH / 2) % 360.0 // SECTOR_WIDTH).astype(np.intp) % len(SECTOR_ORDER)
+    return int((math.degrees(math.atan2(x, y)) + SECTOR_WIDTH / 2) % 360.0 // SECTOR_WIDTH) % len(SECTOR_ORDER)
+
+
+def segment_at(x, y):
+    """Segment (Schlüssel wie in FIELD_COORDS) für eine einzelne Koordinate, z.B. "T20"."""
+    ring = 0
+    r    = math.hypot(x, y)
+    while ring < len(_RING_EDGES) and r >= _RING_EDGES[ring]:
+        ring += 1
+    return _SEGMENT_LOOKUP[ring][sector_of(x, y)]
+
+
+def classify_points(x, y):
+    """Bestimmt die Segmente für beliebig viele Koordinaten auf einmal.
+
+        Args:
+            x, y (array-like): Normalisierte Board-Koordinaten.
+
+        Returns:
+            tuple: (Segmentnamen als np.ndarray, Abstand zur Mitte als np.ndarray)
+    """
+    x, y  = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+    r     = np.hypot(x, y)
+    rings = np.searchsorted(RING_EDGES, r, side='right')
+    return SEGMENT_NAMES[SEGMENT_TABLE[rings, sector_of(x, y)]], r
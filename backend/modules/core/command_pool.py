@@ -0,0 +1,192 @@
+# Backend/modules/core/command_pool.py
+
+# Ausführung der 'command'-Befehle der cmd-Seite (webserver_handler.handle_command).
+#
+# Bisher liefen Befehle wie calibrate_board, restart_board oder undo_throw direkt im
+# Socket.IO-Event-Handler: Ein hängender HTTP-Aufruf hielt den Handler bis zu seinem Timeout
+# fest, und mehrfach geklickte Befehle liefen mehrfach. Jetzt:
+#   - Befehle landen in einer begrenzten Warteschlange (COMMAND_QUEUE_SIZE) und werden von
+#     COMMAND_WORKERS Greenlets abgearbeitet. Ist die Warteschlange voll, wird der Befehl
+#     sofort mit einem Fehler beantwortet.
+#   - Nur Befehle aus IDEMPOTENT_ACTIONS und 'get_*' laufen parallel. Alle übrigen
+#     (undo_throw, correct_throw, next_player, start_match, ...) ändern das Spiel und hängen
+#     von der Reihenfolge ab: Sie laufen nacheinander über eine eigene Warteschlange mit EINEM
+#     Worker, damit z.B. next_player nie vor dem zuvor geschickten correct_throw ankommt.
+#   - Jeder Befehl hat ein eigenes Zeitlimit, danach wird er abgebrochen.
+#   - Ein identischer Befehl (gleiche Aktion, gleiche Parameter), der noch wartet oder läuft,
+#     wird nicht erneut ausgeführt; der neue Aufrufer bekommt dasselbe Ergebnis. Das gilt nur
+#     für Befehle, bei denen zweimal dasselbe bewirkt wie einmal (IDEMPOTENT_ACTIONS). Ein
+#     absichtlich doppeltes undo_throw oder next_player wird zweimal ausgeführt.
+#   - Warteschlangen-Tiefe sowie Warte- und Laufzeit pro Aktion stehen unter /api/metrics.
+
+import json
+import logging
+import time
+
+import gevent
+from gevent.queue import Queue, Full
+
+from .metrics import register_metrics_provider
+
+COMMAND_WORKERS    = 4     # Befehle, die gleichzeitig ausgeführt werden
+COMMAND_QUEUE_SIZE = 64    # Wartende Befehle, weitere werden abgelehnt
+
+# Befehle, die dedupliziert werden dürfen (Aktionen mit 'get_'-Präfix zählen immer dazu)
+IDEMPOTENT_ACTIONS = frozenset({
+    'reset_board', 'start_board', 'stop_board',
+    'calibrate_board', 'calibrate_all'
+})
+
+_queue        = Queue(maxsize=COMMAND_QUEUE_SIZE)   # Idempotente Befehle, COMMAND_WORKERS parallel
+_serial_queue = Queue(maxsize=COMMAND_QUEUE_SIZE)   # Reihenfolgeabhängige Befehle, ein Worker
+_inflight = {}      # (Aktion, Parameter) -> Auftrag, solange er wartet oder läuft
+_workers  = []
+
+_stats = {
+    'submitted':       0,
+    'deduplicated':    0,
+    'rejected':        0,
+    'running':         0,
+    'max_queue_depth': 0
+}
+
+# Aktion -> {'calls', 'errors', 'timeouts', 'wait_ms', 'run_ms', 'max_run_ms'}
+_action_stats = {}
+
+#----------------------------------------------------
+
+def _job_key(action, params):
+    return action, json.dumps(params, sort_keys=True, default=str)
+
+
+def _is_idempotent(action):
+    return action in IDEMPOTENT_ACTIONS or action.startswith('get_')
+
+
+def _run(job):
+    """Führt einen Auftrag mit Zeitlimit aus und liefert das Ergebnis (bei Fehlern {'error': ...})."""
+    stats = _action_stats.setdefault(job['action'], {'calls': 0, 'errors': 0, 'timeouts': 0, 'wait_ms': 0.0, 'run_ms': 0.0, 'max_run_ms': 0.0})
+    started = time.perf_counter()
+    stats['wait_ms'] += (started - job['queued_at']) * 1000
+
+    timer = gevent.Timeout(job['timeout'])
+    timer.start()
+    try:
+        handler, params = job['handler'], job['params']
+        return handler(**params) if params else handler()
+    except gevent.Timeout as e:
+        if e is not timer:
+            raise
+        stats['timeouts'] += 1
+        logging.error("Befehl '%s' nach %s s abgebrochen.", job['action'], job['timeout'])
+        return {'error': f"Zeitüberschreitung nach {job['timeout']} s"}
+    except Exception as e:
+        stats['errors'] += 1
+        logging.error("Fehler bei der Ausführung des Befehls '%s': %s", job['action'], e)
+        return {'error': str(e)}
+    finally:
+        timer.close()
+        elapsed = (time.perf_counter() - started) * 1000
+        stats['calls']     += 1
+        stats['run_ms']    += elapsed
+        stats['max_run_ms'] = max(stats['max_run_ms'], elapsed)
+
+
+def _worker_loop(queue):
+    while True:
+        job = queue.get()
+        _stats['running'] += 1
+        try:
+            result = _run(job)
+        finally:
+            _stats['running'] -= 1
+            _inflight.pop(job['key'], None)
+
+        for on_done in job['callbacks']:
+            try:
+                on_done(result)
+            except Exception as e:
+                logging.error("Antwort auf Befehl '%s' konnte nicht gesendet werden: %s", job['action'], e)
+
+#----------------------------------------------------
+
+def submit_command(action, handler, params, on_done, timeout):
+    """Stellt einen Befehl in die Warteschlange, ohne auf seine Ausführung zu warten.
+
+        Args:
+            action (str):      Name der Aktion (für Deduplizierung und Kennzahlen), dedupliziert
+                               werden nur Aktionen aus IDEMPOTENT_ACTIONS und 'get_*'.
+            handler (callable): Die auszuführende Funktion.
+            params (dict):     Schlüsselwort-Parameter für den Handler.
+            on_done (callable): Wird mit dem Ergebnis aufgerufen (auch bei Fehler oder Ablehnung).
+            timeout (float):   Zeitlimit für die Ausführung in Sekunden.
+    """
+    idempotent = _is_idempotent(action)
+    key = _job_key(action, params) if idempotent else None
+    job = _inflight.get(key) if key is not None else None
+    if job is not None:
+        # Derselbe Befehl wartet oder läuft bereits: dessen Ergebnis mitnutzen
+        job['callbacks'].append(on_done)
+        _stats['deduplicated'] += 1
+        return
+
+    job = {
+        'key':       key,
+        'action':    action,
+        'handler':   handler,
+        'params':    params,
+        'timeout':   timeout,
+        'callbacks': [on_done],
+        'queued_at': time.perf_counter()
+    }
+    queue = _queue if idempotent else _serial_queue
+    try:
+        queue.put_nowait(job)
+    except Full:
+        _stats['rejected'] += 1
+        logging.warning("Befehl '%s' abgelehnt: Warteschlange voll.", action)
+        on_done({'error': 'Zu viele Befehle gleichzeitig, bitte erneut versuchen.'})
+        return
+
+    if key is not None:
+        _inflight[key] = job
+    _stats['submitted'] += 1
+    _stats['max_queue_depth'] = max(_stats['max_queue_depth'], queue.qsize())
+
+#----------------------------------------------------
+
+def start_command_pool():
+    """Startet die Worker-Greenlets (COMMAND_WORKERS parallele und einen für die Reihenfolge)."""
+    if not _workers:
+        _workers.extend(gevent.spawn(_worker_loop, _queue) for _ in range(COMMAND_WORKERS))
+        _workers.append(gevent.spawn(_worker_loop, _serial_queue))
+
+
+def stop_command_pool():
+    """Beendet die Worker-Greenlets (beim Herunterfahren)."""
+    gevent.killall(_workers)
+    _workers.clear()
+
+#----------------------------------------------------
+
+def command_pool_stats():
+    """Liefert die Kennzahlen der Befehlsausführung für /api/metrics."""
+    return dict(
+        _stats,
+        queue_depth        = _queue.qsize(),
+        serial_queue_depth = _serial_queue.qsize(),
+        workers            = len(_workers),
+        actions            = {
+            action: {
+                'calls':       s['calls'],
+                'errors':      s['errors'],
+                'timeouts':    s['timeouts'],
+                'avg_wait_ms': round(s['wait_ms'] / s['calls'], 2) if s['calls'] else None,
+                'avg_run_ms':  round(s['run_ms'] / s['calls'], 2) if s['calls'] else None,
+                'max_run_ms':  round(s['max_run_ms'], 2)
+            }
+            for action, s in list(_action_stats.items())
+        }
+    )
+
+register_metrics_provider('commands', command_pool_stats)
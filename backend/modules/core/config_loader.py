@@ -31,6 +31,8 @@ def load_and_parse_config():
     g.AUTODARTS_CERT_CHECK            =                                                  getattr(config, 'AUTODARTS_CERT_CHECK', g.AUTODARTS_CERT_CHECK)
 
     g.USE_DATABASE                    = _to_bool(getattr(config, 'USE_DATABASE', g.USE_DATABASE))
+    g.DB_BACKEND                      =    (os.getenv("DB_BACKEND")                   or getattr(config, 'DB_BACKEND', g.DB_BACKEND)).lower()
+    g.DB_SQLITE_PATH                  =     os.getenv("DB_SQLITE_PATH")               or getattr(config, 'DB_SQLITE_PATH', g.DB_SQLITE_PATH)
     g.DB_USER                         =     os.getenv("DB_USER")                      or getattr(config, 'DB_USER', g.DB_USER)
     g.DB_PASSWORD                     =     os.getenv("DB_PASSWORD")                  or getattr(config, 'DB_PASSWORD', g.DB_PASSWORD)
     g.DB_HOST                         =     os.getenv("DB_HOST")                      or getattr(config, 'DB_HOST', g.DB_HOST)
@@ -43,8 +45,25 @@ def load_and_parse_config():
         g.DB_PORT = int(port_value)
     except (ValueError, TypeError):
         g.DB_PORT = 3306
+
+    g.PLAYER_CACHE_MAX_ENTRIES        = _to_int(                                         getattr(config, 'PLAYER_CACHE_MAX_ENTRIES', g.PLAYER_CACHE_MAX_ENTRIES), g.PLAYER_CACHE_MAX_ENTRIES)
+    g.PLAYER_CACHE_TTL_SECONDS        = _to_int(                                         getattr(config, 'PLAYER_CACHE_TTL_SECONDS', g.PLAYER_CACHE_TTL_SECONDS), g.PLAYER_CACHE_TTL_SECONDS)
+    g.LEG_SPOOL_PATH                  =                                                  getattr(config, 'LEG_SPOOL_PATH', g.LEG_SPOOL_PATH)
+    g.LEG_SPOOL_REPLAY_INTERVAL       = _to_int(                                         getattr(config, 'LEG_SPOOL_REPLAY_INTERVAL', g.LEG_SPOOL_REPLAY_INTERVAL), g.LEG_SPOOL_REPLAY_INTERVAL)
+    g.THROW_FLUSH_INTERVAL            = _to_int(                                         getattr(config, 'THROW_FLUSH_INTERVAL', g.THROW_FLUSH_INTERVAL), g.THROW_FLUSH_INTERVAL)
+    g.SESSION_JOURNAL_PATH            =                                                  getattr(config, 'SESSION_JOURNAL_PATH', g.SESSION_JOURNAL_PATH)
+    g.INSTANCE_STATUS_SOCKET          = _to_bool(                                        getattr(config, 'INSTANCE_STATUS_SOCKET', g.INSTANCE_STATUS_SOCKET))
+    g.LOG_QUEUE_SIZE                  = _to_int(                                         getattr(config, 'LOG_QUEUE_SIZE', g.LOG_QUEUE_SIZE), g.LOG_QUEUE_SIZE)
+    g.LOG_REPEAT_WINDOW               = _to_int(                                         getattr(config, 'LOG_REPEAT_WINDOW', g.LOG_REPEAT_WINDOW), g.LOG_REPEAT_WINDOW)
+    g.DEBUG_LOG_PATH                  =                                                  getattr(config, 'DEBUG_LOG_PATH', g.DEBUG_LOG_PATH)
+    g.DEBUG_LOG_SEGMENT_MB            = _to_int(                                         getattr(config, 'DEBUG_LOG_SEGMENT_MB', g.DEBUG_LOG_SEGMENT_MB), g.DEBUG_LOG_SEGMENT_MB)
+    g.DEBUG_LOG_MAX_SEGMENTS          = _to_int(                                         getattr(config, 'DEBUG_LOG_MAX_SEGMENTS', g.DEBUG_LOG_MAX_SEGMENTS), g.DEBUG_LOG_MAX_SEGMENTS)
+    g.BOARD_TELEMETRY_INTERVAL_MS     = _to_int(                                         getattr(config, 'BOARD_TELEMETRY_INTERVAL_MS', g.BOARD_TELEMETRY_INTERVAL_MS), g.BOARD_TELEMETRY_INTERVAL_MS)
+    g.BOARD_TELEMETRY_HISTORY         = _to_int(                                         getattr(config, 'BOARD_TELEMETRY_HISTORY', g.BOARD_TELEMETRY_HISTORY), g.BOARD_TELEMETRY_HISTORY)
+    g.BOARD_CONFIG_TTL                = _to_int(                                         getattr(config, 'BOARD_CONFIG_TTL', g.BOARD_CONFIG_TTL), g.BOARD_CONFIG_TTL)
+    g.AUTODARTS_HTTP_CACHE_PATH       =                                                  getattr(config, 'AUTODARTS_HTTP_CACHE_PATH', g.AUTODARTS_HTTP_CACHE_PATH)
         
-    g.DEBUG                           = _to_bool(                                        getattr(config, 'DEBUG', g.DEBUG))
+    g.DEBUG                           = _to_level(                                       getattr(config, 'DEBUG', g.DEBUG))
     
     g.WEBSERVER_DISABLE_HTTPS         = _to_bool(                                        getattr(config, 'WEBSERVER_DISABLE_HTTPS', g.WEBSERVER_DISABLE_HTTPS))
     g.WEBSERVER_HOST_IP               =                                                  getattr(config, 'WEBSERVER_HOST_IP', g.WEBSERVER_HOST_IP)
@@ -65,3 +84,14 @@ def load_and_parse_config():
 # Eine Hilfsfunktion, die den Inhalt des Strings prüft
 def _to_bool(value):
     return str(value).lower() in ('true', '1', 't', 'y', 'yes')
+
+# Wandelt eine Debug-Stufe um: Zahlen bleiben erhalten (0, 1, 2, ...), True/'yes' usw. ergeben 1.
+def _to_level(value):
+    return _to_int(value, 1 if _to_bool(value) else 0)
+
+# Wandelt einen Wert in eine Ganzzahl um. Bei einem Fehler wird der Standardwert verwendet.
+def _to_int(value, default):
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return default
@@ -37,6 +37,8 @@ KEY_MATCH           = "match"
 KEY_MODE            = "mode"
 KEY_DATA            = "data"
 KEY_DISPLAY_ORDER   = "display_order"
+KEY_DB_ID           = "db_id"
+KEY_DB_MODE         = "db_mode"
 KEY_GAME_MODE       = "gameMode"
 KEY_INMODE          = "inMode"
 KEY_OUTMODE         = "outMode"
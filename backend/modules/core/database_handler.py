@@ -3,7 +3,6 @@
 import logging
 import traceback
 import inspect
-import mariadb
 import os
 import sys
 from   contextlib import contextmanager
@@ -12,6 +11,8 @@ from   decimal import Decimal
 from . import shared_state as g
 from ..core import constants as c
 from .utils_backend import log_event, log_function_call
+from .player_stats_cache import player_stats_cache
+from .db_backends import DB_BACKENDS, DB_ERRORS
 
 
 #----------------------------------------------------
@@ -19,14 +20,16 @@ from .utils_backend import log_event, log_function_call
 @contextmanager
 @log_function_call
 def get_db_connection():
-    """Stellt eine Verbindung zur MariaDB-Datenbank über einen Context-Manager her.
+    """Stellt über einen Context-Manager eine Verbindung zur Statistik-Datenbank her.
 
-       Die Verbindung wird bei Eintritt in den 'with'-Block aufgebaut und am Ende
-       (auch bei Fehlern) automatisch wieder sicher geschlossen.
+       Welches Backend verwendet wird (externer MariaDB-Server oder lokale
+       SQLite-Datei), legt DB_BACKEND in der Konfiguration fest (siehe db_backends.py).
+       Die Verbindung wird bei Eintritt in den 'with'-Block bereitgestellt und am Ende
+       (auch bei Fehlern) automatisch wieder sicher geschlossen bzw. freigegeben.
 
     Yields:
-        mariadb.connection: Ein aktives Datenbank-Verbindungsobjekt.
-        None:               Wenn der Verbindungsaufbau fehlschlägt.
+        Ein aktives Datenbank-Verbindungsobjekt (cursor(dictionary=True), commit(), rollback()).
+        None: Wenn die Datenbank deaktiviert ist oder der Verbindungsaufbau fehlschlägt.
     """
 
     # 'Hauptschalter', um die Datenbanknutzung zu steuern
@@ -34,28 +37,14 @@ def get_db_connection():
         yield None
         return # Beendet die Funktion hier, wenn die DB deaktiviert ist.
 
-    conn = None
-    
-    try:
-        DB_CONFIG = {
-            'user':     g.DB_USER,
-            'password': g.DB_PASSWORD,
-            'host':     g.DB_HOST,
-            'port':     int(g.DB_PORT) if g.DB_PORT else 3306,
-            'database': g.DB_DATABASE,
-        }
-
-        conn = mariadb.connect(**DB_CONFIG)
-        yield conn # 'return' wird durch 'yield' ersetzt
-
-    except mariadb.Error as e:
-        print(f"FEHLER bei der DB-Verbindung: {e}", file=sys.stderr)
+    backend = DB_BACKENDS.get(g.DB_BACKEND)
+    if backend is None:
+        logging.error("Unbekanntes DB_BACKEND '%s'. Erlaubt sind: %s", g.DB_BACKEND, ", ".join(DB_BACKENDS))
         yield None
+        return
 
-    finally:
-        # Dieser Block wird IMMER ausgeführt, auch bei Fehlern
-        if conn and conn.ping():
-            conn.close()
+    with backend() as conn:
+        yield conn
 
 #----------------------------------------------------
 
@@ -95,7 +84,7 @@ def get_player_data_from_db(cursor, player_name, game_mode):
         
         return player_data
         
-    except mariadb.Error as e:
+    except DB_ERRORS as e:
         logging.error("DB-Fehler beim Lesen des Spielers '%s': %s", player_name, e)
         return None
         
@@ -127,7 +116,7 @@ def create_guest_player(cursor, player_name, game_mode):
         if g.DEBUG:
             logging.info("==> Neuer Gast-Spieler '%s' mit ID %s wurde in der DB angelegt.", player_name, cursor.lastrowid)
         return cursor.lastrowid
-    except mariadb.Error as e:
+    except DB_ERRORS as e:
         if g.DEBUG:
             logging.error("DB-Fehler beim Anlegen des Spielers '%s': %s", player_name, e)
         return None
@@ -135,15 +124,207 @@ def create_guest_player(cursor, player_name, game_mode):
 #----------------------------------------------------
 
 @log_function_call
-def save_leg_to_history(cursor, player_db_id, match_id, leg_number, leg_stats, game_mode):
+def get_players_data_from_db(cursor, player_names, game_mode, cache=True):
+    """Ruft die Stammdaten mehrerer Spieler mit EINER Abfrage
+        (WHERE name IN (...)) aus der spezifischen 'players'-Tabelle ab.
+
+        Args:
+            cursor:             Ein aktiver Datenbank-Cursor mit Dictionary-Unterstützung.
+            player_names (list): Die Namen der zu suchenden Spieler.
+            game_mode (str):    Der Schlüssel des Spielmodus in STAT_CONFIG (z.B. 'x01').
+            cache (bool):       Gelesene Spieler in den player_stats_cache übernehmen. False für
+                                Zeilen, die in der laufenden Transaktion erst angelegt wurden.
+
+        Returns:
+            dict: Ein Dictionary {name_klein: {'id', 'is_registered', <column>}}.
+                  Spieler, die nicht gefunden wurden, fehlen im Dictionary.
+    """
+    config = STAT_CONFIG.get(game_mode)
+    if not config or not player_names:
+        return {}
+
+    table_name  = config['player_table']
+    column_name = config['column']
+
+    placeholders = ", ".join(["%s"] * len(player_names))
+    sql = f"SELECT id, name, is_registered, {column_name} FROM {table_name} WHERE name IN ({placeholders})"
+
+    if g.DEBUG:
+        logging.info("KONSOLE-AUSGABE (SQL): %s (Parameter: %s)", sql, player_names)
+    try:
+        cursor.execute(sql, tuple(player_names))
+        players = {}
+        for row in cursor.fetchall():
+            # Decimal sofort in float umwandeln (wie in get_player_data_from_db)
+            if isinstance(row.get(column_name), Decimal):
+                row[column_name] = float(row[column_name])
+            players[row['name'].lower()] = row
+
+        # Jeder aus der DB gelesene Spieler landet im prozessweiten Cache
+        if cache:
+            cache_players(game_mode, players)
+        return players
+
+    except DB_ERRORS as e:
+        logging.error("DB-Fehler beim Lesen der Spieler %s: %s", player_names, e)
+        return {}
+
+#----------------------------------------------------
+
+@log_function_call
+def get_or_create_players(cursor, player_names, game_mode):
+    """Ermittelt die Stammdaten aller übergebenen Spieler und legt fehlende
+        Spieler als Gäste mit EINEM mehrzeiligen INSERT an.
+
+        Ablauf:
+        1. Eine Abfrage (WHERE name IN (...)) für alle Spieler.
+        2. Ein mehrzeiliges INSERT IGNORE für alle fehlenden Spieler
+           (IGNORE, da 'name' ein UNIQUE KEY ist und ein paralleles Anlegen
+           sonst zu einem Fehler führen würde).
+        3. Eine zweite Abfrage nur für die neu angelegten Spieler, um deren IDs zu erhalten.
+
+        Die neu angelegten Spieler kommen NICHT in den player_stats_cache, da ihre IDs
+        erst mit dem Commit gültig werden. Der Aufrufer übergibt sie nach conn.commit()
+        an cache_players().
+
+        Args:
+            cursor:             Ein aktiver Datenbank-Cursor mit Dictionary-Unterstützung.
+            player_names (list): Die Namen der Spieler.
+            game_mode (str):    Der Schlüssel des Spielmodus in STAT_CONFIG (z.B. 'x01').
+
+        Returns:
+            dict: Ein Dictionary {name_klein: {'id', 'is_registered', <column>}}.
+    """
+    config = STAT_CONFIG.get(game_mode)
+    if not config or not player_names:
+        return {}
+
+    players = get_players_data_from_db(cursor, player_names, game_mode)
+    missing = [name for name in player_names if name.lower() not in players]
+
+    if missing:
+        table_name = config['player_table']
+        values_sql = ", ".join(["(%s, 0)"] * len(missing))
+        sql = f"INSERT IGNORE INTO {table_name} (name, is_registered) VALUES {values_sql}"
+
+        try:
+            if g.DEBUG:
+                logging.info("KONSOLE-AUSGABE (SQL): %s (Parameter: %s)", sql, missing)
+            cursor.execute(sql, tuple(missing))
+        except DB_ERRORS as e:
+            logging.error("DB-Fehler beim Anlegen der Gast-Spieler %s: %s", missing, e)
+            return players
+
+        created = get_players_data_from_db(cursor, missing, game_mode, cache=False)
+        players.update(created)
+
+        if g.DEBUG:
+            logging.info("==> Neue Gast-Spieler in der DB angelegt: %s", {name: row['id'] for name, row in created.items()})
+
+    return players
+
+#----------------------------------------------------
+
+@log_function_call
+def resolve_player_db_ids(cursor, players, game_mode):
+    """Liefert die DB-IDs der übergebenen Spieler für den Leg-Ende-Pfad.
+
+        Die IDs werden beim Matchstart in g.player_data_map gecached. Nur
+        Spieler, für die dort (noch) keine ID für diesen Spielmodus vorliegt
+        (z.B. weil die Datenbank beim Matchstart nicht erreichbar war), werden
+        im prozessweiten player_stats_cache gesucht bzw. gesammelt mit
+        get_or_create_players nachgeladen und danach ebenfalls in
+        g.player_data_map abgelegt. Test-Spieler (Name beginnt mit 'test') werden ignoriert.
+
+        Args:
+            cursor:          Ein aktiver Datenbank-Cursor mit Dictionary-Unterstützung.
+            players (list):  Die Spielerliste aus den Event-Daten (Dictionaries mit 'name').
+            game_mode (str): Der Schlüssel des Spielmodus in STAT_CONFIG (z.B. 'x01').
+
+        Returns:
+            dict: Ein Dictionary {name_klein: player_db_id}.
+    """
+    db_ids  = {}
+    missing = []
+    player_names = [p.get(c.KEY_NAME) for p in players
+                    if p.get(c.KEY_NAME) and not p.get(c.KEY_NAME).lower().startswith('test')]
+
+    for name in player_names:
+        entry = g.player_data_map.get(name.lower(), {})
+        if entry.get(c.KEY_DB_ID) is not None and entry.get(c.KEY_DB_MODE) == game_mode:
+            db_ids[name.lower()] = entry[c.KEY_DB_ID]
+            continue
+
+        cached = player_stats_cache.get(game_mode, name)
+        if cached and cached.get('db_id') is not None:
+            db_ids[name.lower()] = cached['db_id']
+        else:
+            missing.append(name)
+
+    if missing:
+        for name_lower, row in get_or_create_players(cursor, missing, game_mode).items():
+            db_ids[name_lower] = row['id']
+
+    for name_lower, db_id in db_ids.items():
+        if name_lower in g.player_data_map:
+            g.player_data_map[name_lower][c.KEY_DB_ID]   = db_id
+            g.player_data_map[name_lower][c.KEY_DB_MODE] = game_mode
+
+    return db_ids
+
+#----------------------------------------------------
+
+def cache_players(game_mode, players):
+    """Übernimmt Spieler-Zeilen aus der DB in den prozessweiten player_stats_cache.
+
+        Args:
+            game_mode (str): Der Schlüssel des Spielmodus in STAT_CONFIG (z.B. 'x01').
+            players (dict):  {name_klein: {'id', 'name', 'is_registered', <column>}} wie von
+                             get_players_data_from_db bzw. get_or_create_players geliefert.
+    """
+    config = STAT_CONFIG.get(game_mode)
+    if not config:
+        return
+
+    for row in players.values():
+        player_stats_cache.put(game_mode, row['name'], db_id=row['id'], stat=row.get(config['column']), is_registered=row.get('is_registered'))
+
+#----------------------------------------------------
+
+def cache_player_stat(player_name, game_mode, stat_value):
+    """Schreibt eine neue Gesamt-Statistik (write-through) in beide Caches:
+        in g.player_data_map für die sofortige Anzeige im nächsten Event und in
+        den prozessweiten player_stats_cache für die nächsten Matches.
+
+        Args:
+            player_name (str):  Der Name des Spielers.
+            game_mode (str):    Der Schlüssel des Spielmodus in STAT_CONFIG (z.B. 'x01').
+            stat_value (float): Der neue Gesamt-Wert (Average, MPR, Hit-Rate oder PPR).
+    """
+    config = STAT_CONFIG.get(game_mode)
+    if not config:
+        return
+
+    player_name_lower = player_name.lower()
+    if player_name_lower in g.player_data_map:
+        g.player_data_map[player_name_lower][config['cache_key']] = stat_value
+
+    player_stats_cache.put(game_mode, player_name, stat=stat_value)
+
+#----------------------------------------------------
+
+@log_function_call
+def save_leg_to_history(cursor, player_db_id, match_id, set_number, leg_number, leg_stats, game_mode):
     """Speichert die detaillierten Statistiken eines einzelnen, beendeten Legs 
-        in der spezifischen 'games_history'-Tabelle.
+        in der spezifischen 'games_history'-Tabelle. Ist das Leg für diesen
+        Spieler bereits gespeichert, passiert nichts (idempotent).
 
         Args:
             cursor:             Ein aktiver Datenbank-Cursor.
             player_db_id (int): Die ID des Spielers aus der 'players'-Tabelle.
             match_id (str):     Die ID des Matches, zu dem das Leg gehört.
-            leg_number (int):   Die Nummer des gespielten Legs.
+            set_number (int):   Die Nummer des Satzes (ohne Sätze immer 1).
+            leg_number (int):   Die Nummer des gespielten Legs (zählt in jedem Satz neu).
             leg_stats (dict):   Ein Dictionary mit den Statistiken des Legs (erwartet 'average', 'score', 'dartsThrown').
     """
     config      = SAVE_LEG_CONFIG.get(game_mode)
@@ -155,11 +336,58 @@ def save_leg_to_history(cursor, player_db_id, match_id, leg_number, leg_stats, g
     sql = config['sql'].format(table=history_table)
     
     # Baut das values-Tupel dynamisch anhand der Konfiguration zusammen
-    values = tuple([player_db_id, match_id, leg_number] + [leg_stats.get(key, 0) for key in config['keys']])
+    values = tuple([player_db_id, match_id, set_number, leg_number] + [leg_stats.get(key, 0) for key in config['keys']])
     
     cursor.execute(sql, values)    
 #----------------------------------------------------
 
+def save_throws_to_history(cursor, rows):
+    """Schreibt mehrere einzelne Darts mit EINEM Bulk-Insert (executemany) in die
+        Tabelle 'throws_history'.
+
+        REPLACE statt INSERT IGNORE: Wird ein Dart nachträglich korrigiert, gewinnt
+        der zuletzt übermittelte Wert für (match, set, leg, player, round, dart).
+
+        Args:
+            cursor:      Ein aktiver Datenbank-Cursor.
+            rows (list): Tupel in der Reihenfolge von THROW_HISTORY_COLUMNS.
+    """
+    if not rows:
+        return
+
+    columns      = ", ".join(THROW_HISTORY_COLUMNS)
+    placeholders = ", ".join(["%s"] * len(THROW_HISTORY_COLUMNS))
+    sql = f"REPLACE INTO {THROW_HISTORY_TABLE} ({columns}) VALUES ({placeholders})"
+
+    if g.DEBUG:
+        logging.info("KONSOLE-AUSGABE (SQL): %s (%d Zeilen)", sql, len(rows))
+    cursor.executemany(sql, rows)
+
+#----------------------------------------------------
+
+def delete_undone_throws_from_history(cursor, turns):
+    """Löscht Darts, die rückgängig gemacht oder weg-korrigiert wurden, aus 'throws_history'.
+
+        REPLACE überschreibt nur Darts, die es noch gibt. Hat eine Aufnahme danach weniger
+        Darts, bleiben die überzähligen Zeilen sonst stehen.
+
+        Args:
+            cursor:      Ein aktiver Datenbank-Cursor.
+            turns (list): Tupel (match_id, set_number, leg_number, player_name, round_number, anzahl_darts).
+                          Gelöscht werden alle Darts der Aufnahme mit dart_number > anzahl_darts.
+    """
+    if not turns:
+        return
+
+    sql = (f"DELETE FROM {THROW_HISTORY_TABLE} WHERE match_id = %s AND set_number = %s AND leg_number = %s "
+           f"AND player_name = %s AND round_number = %s AND dart_number > %s")
+
+    if g.DEBUG:
+        logging.info("KONSOLE-AUSGABE (SQL): %s (%d Aufnahmen)", sql, len(turns))
+    cursor.executemany(sql, turns)
+
+#----------------------------------------------------
+
 @log_function_call
 def calculate_and_update_guest_average(cursor, player_db_id, game_mode):
     """Berechnet den Gesamt-Durchschnitt (Average, MPR oder Hit-Rate) für einen Gast-Spieler."""
@@ -344,34 +572,41 @@ CALCULATION_HANDLERS = {
 }
 
 # --- Konfigurations-Dictionary für save_leg_to_history ---
+# INSERT IGNORE + eindeutiger Schlüssel (player_id, match_id, set_number, leg_number) in den History-Tabellen:
+# Ein bereits gespeichertes Leg (z.B. beim Nachspielen des Leg-Spools) wird nicht doppelt gespeichert.
 SAVE_LEG_CONFIG = {
     'x01': {
-        'sql':  "INSERT INTO {table} (player_id, match_id, leg_number, leg_average, leg_points, leg_darts) VALUES (%s, %s, %s, %s, %s, %s)",
+        'sql':  "INSERT IGNORE INTO {table} (player_id, match_id, set_number, leg_number, leg_average, leg_points, leg_darts) VALUES (%s, %s, %s, %s, %s, %s, %s)",
         'keys': ['average', 'score', 'dartsThrown']
     },
     'cricket': {
-        'sql':  "INSERT INTO {table} (player_id, match_id, leg_number, leg_marks, leg_darts) VALUES (%s, %s, %s, %s, %s)",
+        'sql':  "INSERT IGNORE INTO {table} (player_id, match_id, set_number, leg_number, leg_marks, leg_darts) VALUES (%s, %s, %s, %s, %s, %s)",
         'keys': ['marks', 'darts']
     },
     'tactics': {
-        'sql':  "INSERT INTO {table} (player_id, match_id, leg_number, leg_marks, leg_darts) VALUES (%s, %s, %s, %s, %s)",
+        'sql':  "INSERT IGNORE INTO {table} (player_id, match_id, set_number, leg_number, leg_marks, leg_darts) VALUES (%s, %s, %s, %s, %s, %s)",
         'keys': ['marks', 'darts']
     },
         'atc': {
-        'sql':  "INSERT INTO {table} (player_id, match_id, leg_number, leg_hit_rate, leg_darts) VALUES (%s, %s, %s, %s, %s)",
+        'sql':  "INSERT IGNORE INTO {table} (player_id, match_id, set_number, leg_number, leg_hit_rate, leg_darts) VALUES (%s, %s, %s, %s, %s, %s)",
         'keys': ['hit_rate', 'darts']
     },
     'countup': {
-        'sql': "INSERT INTO {table} (player_id, match_id, leg_number, leg_points, leg_darts) VALUES (%s, %s, %s, %s, %s)",
+        'sql': "INSERT IGNORE INTO {table} (player_id, match_id, set_number, leg_number, leg_points, leg_darts) VALUES (%s, %s, %s, %s, %s, %s)",
         'keys': ['score', 'dartsThrown']
     },
         'segment_training': {
-        'sql':  "INSERT INTO {table} (player_id, match_id, leg_number, leg_hit_rate, leg_darts) VALUES (%s, %s, %s, %s, %s)",
+        'sql':  "INSERT IGNORE INTO {table} (player_id, match_id, set_number, leg_number, leg_hit_rate, leg_darts) VALUES (%s, %s, %s, %s, %s, %s)",
         'keys': ['hit_rate', 'darts']
     }
 
 }
 
+# Tabelle für die einzelnen Darts (unabhängig vom Spielmodus, Schlüssel: match, set, leg, player, round, dart)
+THROW_HISTORY_TABLE   = 'throws_history'
+THROW_HISTORY_COLUMNS = ['match_id', 'set_number', 'leg_number', 'player_name', 'round_number', 'dart_number',
+                         'variant', 'target', 'segment_name', 'segment_number', 'multiplier', 'x', 'y']
+
 # Ein zentrales Konfigurations-Dictionary für alle Statistik-Typen
 STAT_CONFIG = {
     'x01': {
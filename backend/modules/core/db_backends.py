@@ -0,0 +1,295 @@
+# Backend/modules/core/db_backends.py
+
+# Speicher-Backends für die Statistik-Datenbank.
+#
+# database_handler.py spricht ausschließlich über get_db_connection() mit der Datenbank.
+# Welches Backend dahinter steckt, wird über DB_BACKEND in der Konfiguration gewählt:
+#
+#   'mariadb': Externer MariaDB/MySQL-Server (bisheriges Verhalten).
+#   'sqlite':  Eine einzelne lokale Datei (DB_SQLITE_PATH) im WAL-Modus, ohne zusätzlichen
+#              Dienst. Gedacht für den Raspberry Pi neben dem Board.
+#
+# Beide Backends liefern ein Verbindungsobjekt mit derselben Schnittstelle
+# (cursor(dictionary=True), commit(), rollback()) und verstehen dieselben SQL-Anweisungen
+# aus STAT_CONFIG/SAVE_LEG_CONFIG. Für SQLite werden die wenigen MariaDB-Eigenheiten
+# ('%s'-Platzhalter, INSERT IGNORE) beim Ausführen übersetzt.
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+from   contextlib import contextmanager
+from   functools import lru_cache
+
+from . import shared_state as g
+
+# Der MariaDB-Connector ist optional: Für das SQLite-Backend werden weder der
+# Connector noch die libmariadb-dev Build-Werkzeuge benötigt.
+try:
+    import mariadb
+except ImportError:
+    mariadb = None
+
+# Alle Fehlerklassen, die ein Datenbankzugriff werfen kann (für 'except DB_ERRORS:')
+DB_ERRORS = (sqlite3.Error,) + ((mariadb.Error,) if mariadb else ())
+
+SQLITE_SCHEMA_FILE = os.path.join(os.path.dirname(__file__), '..', '..', 'docs', 'database_schema_sqlite.sql')
+
+# History-Tabellen, die in älteren Datenbanken noch keine Spalte set_number haben -> Spalten mit den Leg-Werten
+HISTORY_TABLES = {
+    'games_history_x01':              ['leg_average', 'leg_points', 'leg_darts'],
+    'games_history_cricket':          ['leg_marks', 'leg_darts'],
+    'games_history_tactics':          ['leg_marks', 'leg_darts'],
+    'games_history_atc':              ['leg_hit_rate', 'leg_darts'],
+    'games_history_countup':          ['leg_points', 'leg_darts'],
+    'games_history_segment_training': ['leg_hit_rate', 'leg_darts']
+}
+
+# Umstellung einer MariaDB-History-Tabelle auf den Schlüssel (player_id, match_id, set_number, leg_number),
+# entspricht docs/database_migration_leg_key.sql. Vor dem Durchnummerieren werden doppelt gespeicherte
+# Legs (gleiches Leg mit identischen Werten, früherer Doppel-Speicher-Fehler) bis auf das erste gelöscht.
+MARIADB_LEG_KEY_MIGRATION = [
+    "ALTER TABLE `{table}` ADD COLUMN IF NOT EXISTS `set_number` int(11) NOT NULL DEFAULT 1 AFTER `match_id`",
+    "DELETE h FROM `{table}` h JOIN `{table}` d ON d.player_id = h.player_id AND d.match_id = h.match_id "
+    "AND d.set_number = h.set_number AND d.leg_number = h.leg_number AND {same_values} AND d.id < h.id WHERE h.set_number = 1",
+    "ALTER TABLE `{table}` DROP INDEX IF EXISTS `leg`",
+    "UPDATE `{table}` h JOIN (SELECT id, ROW_NUMBER() OVER (PARTITION BY player_id, match_id, leg_number ORDER BY id) AS n "
+    "FROM `{table}` WHERE set_number = 1) r ON h.id = r.id SET h.set_number = r.n",
+    "ALTER TABLE `{table}` ADD UNIQUE KEY `leg` (`player_id`,`match_id`,`set_number`,`leg_number`)"
+]
+
+_mariadb_migrated = False   # Schema in dieser Sitzung bereits geprüft
+_schema_error     = None    # Fehlermeldung, wenn die History-Tabellen nicht umgestellt werden konnten
+
+#----------------------------------------------------
+# MariaDB
+
+def _migrate_mariadb(conn):
+    """Stellt History-Tabellen ohne set_number im Schlüssel automatisch um (MARIADB_LEG_KEY_MIGRATION).
+
+        Ohne die Spalte schlägt jedes Speichern eines Legs fehl. Geprüft wird über
+        information_schema, umgestellt werden nur vorhandene Tabellen, deren Schlüssel 'leg'
+        die Spalte noch nicht enthält.
+    """
+    cursor = conn.cursor()
+    cursor.execute("SELECT TABLE_NAME FROM information_schema.TABLES WHERE TABLE_SCHEMA = DATABASE()")
+    existing = {row[0] for row in cursor.fetchall()}
+    cursor.execute("SELECT TABLE_NAME FROM information_schema.STATISTICS "
+                   "WHERE TABLE_SCHEMA = DATABASE() AND INDEX_NAME = 'leg' AND COLUMN_NAME = 'set_number'")
+    migrated = {row[0] for row in cursor.fetchall()}
+
+    for table in HISTORY_TABLES:
+        if table in existing and table not in migrated:
+            same_values = " AND ".join(f"d.`{column}` = h.`{column}`" for column in HISTORY_TABLES[table])
+            for sql in MARIADB_LEG_KEY_MIGRATION:
+                cursor.execute(sql.format(table=table, same_values=same_values))
+            conn.commit()
+            logging.info("MariaDB-Datenbank: Schlüssel mit set_number in %s angelegt.", table)
+    cursor.close()
+
+
+@contextmanager
+def _connect_mariadb():
+    """Baut für jeden 'with'-Block eine eigene Verbindung zum MariaDB-Server auf."""
+    if mariadb is None:
+        logging.error("DB_BACKEND = 'mariadb', aber das Python-Paket 'mariadb' ist nicht installiert.")
+        yield None
+        return
+
+    conn = None
+    try:
+        conn = mariadb.connect(
+            user     = g.DB_USER,
+            password = g.DB_PASSWORD,
+            host     = g.DB_HOST,
+            port     = int(g.DB_PORT) if g.DB_PORT else 3306,
+            database = g.DB_DATABASE,
+        )
+    except mariadb.Error as e:
+        logging.error("FEHLER bei der DB-Verbindung: %s", e)
+
+    global _mariadb_migrated, _schema_error
+    if conn is not None and not _mariadb_migrated:
+        try:
+            _migrate_mariadb(conn)
+            _mariadb_migrated, _schema_error = True, None
+        except mariadb.Error as e:
+            # Ohne Umstellung könnte kein Leg gespeichert werden: wie eine fehlende Verbindung
+            # behandeln, damit die Legs im Spool warten, statt nach Fehlversuchen verworfen zu werden
+            _schema_error = str(e)
+            logging.error("FEHLER: Die History-Tabellen konnten nicht auf den Schlüssel mit set_number "
+                          "umgestellt werden (%s). Bitte docs/database_migration_leg_key.sql ausführen.", e)
+            conn.close()
+            conn = None
+
+    try:
+        yield conn
+    finally:
+        # Dieser Block wird IMMER ausgeführt, auch bei Fehlern
+        if conn and conn.ping():
+            conn.close()
+
+#----------------------------------------------------
+# SQLite
+
+def _migrate_sqlite(conn):
+    """Ergänzt History-Tabellen älterer Datenbankdateien um die Spalte set_number.
+
+        Muss vor dem Schema laufen, da dessen eindeutiger Index die Spalte bereits
+        enthält. Der alte Index ohne Satz wird entfernt, das Schema legt ihn neu an.
+        Vorhandene Legs werden nicht gelöscht: Sie wurden bisher nur ohne Satz gespeichert,
+        sind also nach (player_id, match_id, leg_number) bereits eindeutig.
+    """
+    for table in HISTORY_TABLES:
+        columns = [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+        if columns and 'set_number' not in columns:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN set_number INTEGER NOT NULL DEFAULT 1")
+            conn.execute(f"DROP INDEX IF EXISTS {table}_leg")
+            logging.info("SQLite-Datenbank: Spalte set_number in %s ergänzt.", table)
+
+
+@lru_cache(maxsize=256)
+def _translate_sql(sql):
+    """Übersetzt eine MariaDB-Anweisung in SQLite-Syntax (Ergebnis wird gecached)."""
+    sql = sql.replace('%s', '?')
+    sql = re.sub(r'^\s*INSERT\s+IGNORE\s+INTO', 'INSERT OR IGNORE INTO', sql, flags=re.IGNORECASE)
+    return sql
+
+
+def _dict_factory(cursor, row):
+    return {col[0]: row[i] for i, col in enumerate(cursor.description)}
+
+
+class SQLiteCursor:
+    """Cursor mit derselben Schnittstelle wie der MariaDB-Cursor (execute mit '%s',
+       fetchone/fetchall, lastrowid, rowcount).
+    """
+
+    def __init__(self, conn, dictionary=False):
+        self._cursor = conn.cursor()
+        if dictionary:
+            self._cursor.row_factory = _dict_factory
+
+    def execute(self, sql, params=()):
+        self._cursor.execute(_translate_sql(sql), params)
+        return self
+
+    def executemany(self, sql, seq_of_params):
+        self._cursor.executemany(_translate_sql(sql), seq_of_params)
+        return self
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    def close(self):
+        self._cursor.close()
+
+
+class SQLiteConnection:
+    """Hält EINE dauerhaft geöffnete Verbindung zur SQLite-Datei.
+
+       Eine dauerhafte Verbindung spart das Öffnen der Datei und nutzt den Statement-Cache
+       von sqlite3 (vorbereitete Anweisungen werden wiederverwendet). Da SQLite ohnehin nur
+       einen Schreiber zulässt, wird der Zugriff über einen Lock serialisiert.
+    """
+
+    def __init__(self):
+        self._conn = None
+        self._path = None
+        self._lock = threading.RLock()
+
+    def _open(self):
+        # Relative Pfade beziehen sich auf das Backend-Verzeichnis
+        path = os.path.join(g.BACKEND_DIR or '', g.DB_SQLITE_PATH)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        conn = sqlite3.connect(path, check_same_thread=False, cached_statements=256)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")  # Im WAL-Modus sicher und deutlich schneller als FULL
+        conn.execute("PRAGMA foreign_keys=ON")
+        conn.execute("PRAGMA busy_timeout=5000")
+
+        _migrate_sqlite(conn)
+        with open(SQLITE_SCHEMA_FILE, 'r', encoding='utf-8') as f:
+            conn.executescript(f.read())
+        conn.commit()
+
+        logging.info("SQLite-Datenbank geöffnet: %s (WAL-Modus)", path)
+        self._conn, self._path = conn, path
+
+    @contextmanager
+    def connect(self):
+        with self._lock:
+            try:
+                if self._conn is None:
+                    self._open()
+            except (sqlite3.Error, OSError) as e:
+                logging.error("FEHLER beim Öffnen der SQLite-Datenbank '%s': %s", g.DB_SQLITE_PATH, e)
+                yield None
+                return
+
+            try:
+                yield self
+            finally:
+                # Nicht abgeschlossene Transaktionen dürfen nicht in den nächsten 'with'-Block wandern
+                if self._conn.in_transaction:
+                    self._conn.rollback()
+
+    def cursor(self, dictionary=False):
+        return SQLiteCursor(self._conn, dictionary=dictionary)
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_sqlite_connection = SQLiteConnection()
+
+#----------------------------------------------------
+
+# Dispatcher-Dictionary: Wert von DB_BACKEND -> Context-Manager, der eine Verbindung liefert
+DB_BACKENDS = {
+    'mariadb': _connect_mariadb,
+    'sqlite':  _sqlite_connection.connect,
+}
+
+#----------------------------------------------------
+
+def check_db_schema():
+    """Baut beim Start eine erste Verbindung auf, dabei wird das Schema geprüft und bei Bedarf umgestellt.
+
+        Returns:
+            str: Die Fehlermeldung, wenn die History-Tabellen nicht umgestellt werden konnten,
+                 sonst None (auch wenn die Datenbank gerade nicht erreichbar ist, dann wird
+                 bei der ersten Verbindung geprüft).
+    """
+    backend = DB_BACKENDS.get(g.DB_BACKEND)
+    if backend is not None:
+        with backend():
+            pass
+    return _schema_error
+
+
+def close_db_backends():
+    """Schließt dauerhaft geöffnete Verbindungen (beim Herunterfahren)."""
+    _sqlite_connection.close()
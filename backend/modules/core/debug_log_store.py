@@ -0,0 +1,327 @@
+# Backend/modules/core/debug_log_store.py
+
+# Dauerhafte Ablage der Debug-Logs (/api/debug, /api/debugad, /api/debugadall).
+#
+# Bisher lagen die Einträge in unbegrenzt wachsenden Listen in shared_state und waren nach einem
+# Neustart verloren. Jetzt schreibt jeder Log-Stream in rotierende Segmentdateien:
+#
+#   data/debuglog/<stream>/000001.ndjson.gz   Blöcke von bis zu BLOCK_RECORDS NDJSON-Zeilen, jeder
+#                                             Block ein eigenes gzip-Member (die Datei bleibt mit
+#                                             zcat lesbar, jeder Block ist einzeln entpackbar)
+#   data/debuglog/<stream>/000001.idx         Pro Block ein Eintrag fester Länge (INDEX_RECORD):
+#                                             erste Nummer, Zeit, Offset, Länge, Anzahl
+#
+# Im Speicher liegen nur der Index und der aktuelle, noch nicht komprimierte Block. Gelesen wird
+# über mmap: Der Index liefert per Binärsuche den Block zu einer Nummer oder Uhrzeit, nur dieser
+# Block wird entpackt. Ist ein Segment größer als DEBUG_LOG_SEGMENT_MB, beginnt ein neues, über
+# DEBUG_LOG_MAX_SEGMENTS hinaus werden die ältesten gelöscht.
+
+import bisect
+import gzip
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from datetime import datetime
+
+from . import shared_state as g
+from .instance_lock import board_path
+from .metrics import register_metrics_provider
+
+BLOCK_RECORDS   = 64     # Einträge pro komprimiertem Block
+BLOCK_MAX_AGE   = 5.0    # Sekunden, nach denen ein angefangener Block spätestens geschrieben wird
+INITIAL_ENTRIES = 500    # So viele Einträge bekommt eine Debug-Seite beim Verbinden
+READ_LIMIT_MAX  = 1000   # Obergrenze für eine Seite der Paginierungs-API
+
+INDEX_RECORD = struct.Struct('<QdQII')  # erste Nummer, Zeit des ersten Eintrags, Offset, Länge, Anzahl
+
+#----------------------------------------------------
+
+class DebugLogStore:
+    """Ein Debug-Log-Stream mit Segmentdateien, Offset-Index und Lesezugriff per mmap."""
+
+    def __init__(self, name):
+        self.name        = name
+        self.cleared_at  = 0        # Nummer des ersten Eintrags nach dem letzten 'clear_log'
+        self._lock       = threading.RLock()
+        self._opened     = False
+        self._blocks     = []       # [(erste Nummer, Zeit, Segment, Offset, Länge, Anzahl)]
+        self._first_seq  = []       # parallel zu _blocks, für bisect
+        self._first_ts   = []
+        self._segments   = []       # Segmentnummern, aufsteigend
+        self._pending    = []       # Einträge des aktuellen, noch nicht geschriebenen Blocks
+        self._next_seq   = 0
+        self._data_file  = None
+        self._index_file = None
+        self._segment_bytes = 0
+        self._maps       = {}       # Segment -> mmap des Segments (nur gelesene Segmente)
+        self._stats      = {'written_bytes': 0, 'raw_bytes': 0, 'blocks_read': 0, 'read_ms_total': 0.0, 'reads': 0}
+
+    #----------------------------------------------------
+
+    def _dir(self):
+        # Ein Verzeichnis pro Board (mehrere Instanzen nebeneinander)
+        return os.path.join(board_path(g.DEBUG_LOG_PATH), self.name)
+
+    def _path(self, segment, suffix):
+        return os.path.join(self._dir(), f"{segment:06d}{suffix}")
+
+    def _open(self):
+        """Liest beim ersten Zugriff die vorhandenen Index-Dateien ein und öffnet das letzte Segment."""
+        if self._opened:
+            return
+        self._opened = True
+        os.makedirs(self._dir(), exist_ok=True)
+
+        self._segments = sorted(int(f[:-4]) for f in os.listdir(self._dir()) if f.endswith('.idx') and f[:-4].isdigit())
+        for segment in self._segments:
+            data_size = os.path.getsize(self._path(segment, '.ndjson.gz')) if os.path.exists(self._path(segment, '.ndjson.gz')) else 0
+            with open(self._path(segment, '.idx'), 'rb') as f:
+                raw = f.read()
+            # Ein unvollständiger letzter Index-Eintrag (Absturz beim Schreiben) wird ignoriert
+            for pos in range(0, len(raw) - INDEX_RECORD.size + 1, INDEX_RECORD.size):
+                first_seq, first_ts, offset, length, count = INDEX_RECORD.unpack_from(raw, pos)
+                if offset + length <= data_size:
+                    self._add_block((first_seq, first_ts, segment, offset, length, count))
+
+        if self._blocks:
+            self._next_seq = self._blocks[-1][0] + self._blocks[-1][5]
+        self._open_segment(self._segments[-1] if self._segments else 1)
+
+    def _open_segment(self, segment):
+        if self._data_file is not None:
+            self._data_file.close()
+            self._index_file.close()
+        if segment not in self._segments:
+            self._segments.append(segment)
+        self._data_file     = open(self._path(segment, '.ndjson.gz'), 'ab')
+        self._index_file    = open(self._path(segment, '.idx'), 'ab')
+        self._segment_bytes = self._data_file.seek(0, os.SEEK_END) # tell() direkt nach open('ab') liefert 0
+
+    def _add_block(self, block):
+        self._blocks.append(block)
+        self._first_seq.append(block[0])
+        self._first_ts.append(block[1])
+
+    #----------------------------------------------------
+
+    def append(self, entry):
+        """Vergibt Nummer und Zeitstempel, merkt sich den Eintrag und schreibt volle Blöcke.
+
+            Returns:
+                dict: Der Eintrag inkl. 'seq' und 'ts' (so wird er auch an die Debug-Seiten gesendet).
+        """
+        with self._lock:
+            self._open()
+            entry = dict(entry, seq=self._next_seq, ts=time.time())
+            self._next_seq += 1
+            self._pending.append(entry)
+
+            if len(self._pending) >= BLOCK_RECORDS or entry['ts'] - self._pending[0]['ts'] >= BLOCK_MAX_AGE:
+                self._flush_block()
+            return entry
+
+    def _flush_block(self):
+        if not self._pending:
+            return
+        raw  = ''.join(json.dumps(e, ensure_ascii=False, default=str) + "\n" for e in self._pending).encode('utf-8')
+        blob = gzip.compress(raw, compresslevel=6, mtime=0)
+
+        if self._segment_bytes and self._segment_bytes + len(blob) > g.DEBUG_LOG_SEGMENT_MB * 1024 * 1024:
+            self._rotate()
+
+        first = self._pending[0]
+        block = (first['seq'], first['ts'], self._segments[-1], self._segment_bytes, len(blob), len(self._pending))
+        try:
+            # Erst die Daten, dann der Index: Ein Block ohne Index-Eintrag wird beim Einlesen übergangen
+            self._data_file.write(blob)
+            self._data_file.flush()
+            self._index_file.write(INDEX_RECORD.pack(block[0], block[1], block[3], block[4], block[5]))
+            self._index_file.flush()
+        except OSError as e:
+            logging.error("Debug-Log '%s': Block konnte nicht geschrieben werden: %s", self.name, e)
+            self._pending.clear()
+            return
+
+        self._segment_bytes += len(blob)
+        self._stats['written_bytes'] += len(blob)
+        self._stats['raw_bytes']     += len(raw)
+        self._add_block(block)
+        self._pending.clear()
+
+    def _rotate(self):
+        """Beginnt ein neues Segment und löscht die ältesten über DEBUG_LOG_MAX_SEGMENTS hinaus."""
+        self._open_segment(self._segments[-1] + 1)
+
+        while len(self._segments) > max(g.DEBUG_LOG_MAX_SEGMENTS, 1):
+            oldest = self._segments.pop(0)
+            old_map = self._maps.pop(oldest, None)
+            if old_map is not None:
+                old_map.close()
+            for suffix in ('.ndjson.gz', '.idx'):
+                try:
+                    os.remove(self._path(oldest, suffix))
+                except OSError:
+                    pass
+            self._blocks    = [b for b in self._blocks if b[2] != oldest]
+            self._first_seq = [b[0] for b in self._blocks]
+            self._first_ts  = [b[1] for b in self._blocks]
+
+    def flush(self):
+        """Schreibt den angefangenen Block (beim Herunterfahren)."""
+        with self._lock:
+            if self._opened:
+                self._flush_block()
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            for segment_map in self._maps.values():
+                segment_map.close()
+            self._maps.clear()
+            if self._data_file is not None:
+                self._data_file.close()
+                self._index_file.close()
+                self._data_file = self._index_file = None
+            self._opened = False
+            self._blocks, self._first_seq, self._first_ts, self._segments = [], [], [], []
+
+    def mark_cleared(self):
+        """Die Debug-Seiten beginnen wieder bei einer leeren Anzeige, die Einträge bleiben gespeichert."""
+        with self._lock:
+            self._open()
+            self.cleared_at = self._next_seq
+
+    #----------------------------------------------------
+
+    def _read_block(self, block):
+        """Entpackt einen Block über die mmap seines Segments."""
+        _first_seq, _first_ts, segment, offset, length, _count = block
+        segment_map = self._maps.get(segment)
+        if segment_map is None or len(segment_map) < offset + length:
+            # Das aktuelle Segment wächst noch, dann wird die mmap neu angelegt
+            if segment_map is not None:
+                segment_map.close()
+            with open(self._path(segment, '.ndjson.gz'), 'rb') as f:
+                segment_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[segment] = segment_map
+
+        self._stats['blocks_read'] += 1
+        raw = gzip.decompress(segment_map[offset:offset + length])
+        return [json.loads(line) for line in raw.splitlines() if line]
+
+    def _forward(self, start_block):
+        for block in self._blocks[start_block:]:
+            yield from self._read_block(block)
+        yield from self._pending
+
+    def _backward(self, end_block):
+        yield from reversed(self._pending)
+        for block in reversed(self._blocks[:end_block]):
+            yield from reversed(self._read_block(block))
+
+    def read(self, before=None, after=None, since=None, until=None, limit=100):
+        """Liest eine Seite von Einträgen, aufsteigend sortiert.
+
+            Args:
+                before (int): Nur Einträge mit kleinerer Nummer, die neuesten davon (zurückblättern).
+                after (int):  Nur Einträge mit größerer Nummer, die ältesten davon (vorblättern).
+                since, until (float): Zeitbereich als Unix-Zeitstempel.
+                limit (int):  Maximale Anzahl Einträge (höchstens READ_LIMIT_MAX).
+                Ohne Angaben werden die neuesten Einträge geliefert.
+
+            Returns:
+                dict: {'entries': [...], 'has_more': bool, 'oldest_seq': int, 'next_seq': int}
+        """
+        limit = max(1, min(int(limit), READ_LIMIT_MAX))
+        start = time.perf_counter()
+
+        with self._lock:
+            self._open()
+            if after is not None or since is not None:
+                if after is not None:
+                    start_block = max(bisect.bisect_right(self._first_seq, after) - 1, 0)
+                else:
+                    start_block = max(bisect.bisect_right(self._first_ts, since) - 1, 0)
+                entries = []
+                for entry in self._forward(start_block):
+                    if (after is not None and entry['seq'] <= after) or (since is not None and entry['ts'] < since):
+                        continue
+                    if (until is not None and entry['ts'] > until) or (before is not None and entry['seq'] >= before):
+                        break
+                    entries.append(entry)
+                    if len(entries) > limit:
+                        break
+                has_more = len(entries) > limit
+                entries  = entries[:limit]
+            else:
+                end_block = len(self._blocks)
+                if before is not None:
+                    end_block = bisect.bisect_left(self._first_seq, before)
+                elif until is not None:
+                    end_block = bisect.bisect_right(self._first_ts, until)
+                entries = []
+                for entry in self._backward(end_block):
+                    if (before is not None and entry['seq'] >= before) or (until is not None and entry['ts'] > until):
+                        continue
+                    entries.append(entry)
+                    if len(entries) > limit:
+                        break
+                has_more = len(entries) > limit
+                entries  = entries[:limit][::-1]
+
+            oldest_seq = self._blocks[0][0] if self._blocks else (self._pending[0]['seq'] if self._pending else self._next_seq)
+            result = {'entries': entries, 'has_more': has_more, 'oldest_seq': oldest_seq, 'next_seq': self._next_seq}
+
+        self._stats['reads'] += 1
+        self._stats['read_ms_total'] += (time.perf_counter() - start) * 1000
+        return result
+
+    def recent(self):
+        """Die Einträge seit dem letzten 'clear_log' (höchstens INITIAL_ENTRIES) für eine neue Debug-Seite."""
+        return [e for e in self.read(limit=INITIAL_ENTRIES)['entries'] if e['seq'] >= self.cleared_at]
+
+    #----------------------------------------------------
+
+    def stats(self):
+        with self._lock:
+            disk_bytes = sum(os.path.getsize(self._path(s, '.ndjson.gz')) for s in self._segments if os.path.exists(self._path(s, '.ndjson.gz')))
+            written, raw = self._stats['written_bytes'], self._stats['raw_bytes']
+            return {
+                'entries':           self._next_seq - (self._blocks[0][0] if self._blocks else self._next_seq - len(self._pending)),
+                'pending':           len(self._pending),
+                'segments':          len(self._segments),
+                'disk_bytes':        disk_bytes,
+                'compression_ratio': round(raw / written, 2) if written else None,
+                'blocks_read':       self._stats['blocks_read'],
+                'avg_read_ms':       round(self._stats['read_ms_total'] / self._stats['reads'], 3) if self._stats['reads'] else None
+            }
+
+#----------------------------------------------------
+
+STORES = {name: DebugLogStore(name) for name in ('debug', 'debugad', 'debugadall')}
+
+
+def debug_log_append(stream, title, data):
+    """Speichert einen Eintrag im Stream und gibt ihn (mit 'seq' und 'ts') zurück."""
+    return STORES[stream].append({
+        "time":  datetime.now().strftime("%H:%M:%S.%f")[:-3],
+        "title": title,
+        "data":  data
+    })
+
+
+def close_debug_logs():
+    """Schreibt alle angefangenen Blöcke und schließt die Segmentdateien (beim Herunterfahren)."""
+    for store in STORES.values():
+        store.close()
+
+
+def debug_log_stats():
+    """Liefert die Kennzahlen aller Debug-Log-Streams für /api/metrics."""
+    return {name: store.stats() for name, store in STORES.items() if store._opened}
+
+register_metrics_provider('debug_log', debug_log_stats)
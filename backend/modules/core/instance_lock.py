@@ -0,0 +1,216 @@
+# Backend/modules/core/instance_lock.py
+
+# Schutz gegen einen zweiten Start des Backends für dasselbe Board.
+#
+# Statt alle Prozesse des Rechners zu durchsuchen, hält die laufende Instanz eine exklusive
+# Sperre (fcntl.flock, unter Windows msvcrt.locking) auf einer PID-Datei pro Board-ID. Die Sperre
+# gibt das Betriebssystem beim Beenden des Prozesses automatisch frei, auch nach einem Absturz.
+# Eine übrig gebliebene Datei mit einer alten PID stört deshalb nicht.
+#
+# Da pro Board eine eigene Instanz laufen darf, bekommen auch die Dateien einer Instanz
+# (Sitzungs-Journal, Leg-Spool, HTTP-Cache, Debug-Logs) die Board-ID in den Namen (board_path).
+#
+# Optional (INSTANCE_STATUS_SOCKET) beantwortet die laufende Instanz über einen Unix-Socket neben
+# der PID-Datei Statusabfragen (JSON). Eine zweite Instanz fragt ihn ab und meldet, in welchem
+# Zustand die laufende Instanz ist, bevor sie sich beendet.
+
+import json
+import logging
+import os
+import re
+import socket
+import time
+
+from . import shared_state as g
+
+try:
+    import fcntl
+except ImportError:     # Windows
+    fcntl = None
+    import msvcrt
+
+LOCK_DIR              = 'data'  # relativ zum Backend-Verzeichnis
+STATUS_SOCKET_TIMEOUT = 2.0     # Sekunden für die Abfrage einer laufenden Instanz
+
+_lock_fd       = None
+_status_server = None
+_started_at    = None
+
+#----------------------------------------------------
+
+def _board_slug():
+    # Die Board-ID wird für den Dateinamen auf unkritische Zeichen reduziert
+    return re.sub(r'[^A-Za-z0-9_-]', '_', str(g.AUTODARTS_BOARD_ID or 'default'))
+
+
+def _lock_path(suffix):
+    return os.path.join(g.BACKEND_DIR or '', LOCK_DIR, f"backend-{_board_slug()}{suffix}")
+
+
+def board_path(path):
+    """Der Pfad einer Datei dieser Instanz: Die Board-ID wird vor der Endung eingefügt
+       (data/leg_spool.ndjson -> data/leg_spool-<Board-ID>.ndjson). Relative Pfade beziehen
+       sich auf das Backend-Verzeichnis."""
+    root, ext = os.path.splitext(path)
+    return os.path.join(g.BACKEND_DIR or '', f"{root}-{_board_slug()}{ext}")
+
+
+def adopt_shared_file(path):
+    """Übernimmt eine Datei aus älteren Versionen ohne Board-ID im Namen, damit z.B. gespoolte
+       Legs nach dem Update nicht verloren gehen. Nur die Instanz mit der Sperre übernimmt sie.
+
+        Args:
+            path (str): Der konfigurierte Pfad (ohne Board-ID).
+
+        Returns:
+            str: Der Pfad dieser Instanz (board_path).
+    """
+    own    = board_path(path)
+    shared = os.path.join(g.BACKEND_DIR or '', path)
+    if _lock_fd is not None and not os.path.exists(own) and os.path.isfile(shared):
+        try:
+            os.replace(shared, own)
+            logging.info("%s wird ab jetzt als %s für Board %s verwendet.", shared, own, g.AUTODARTS_BOARD_ID)
+        except OSError as e:
+            logging.warning("%s konnte nicht übernommen werden: %s", shared, e)
+    return own
+
+
+def _try_lock(fd):
+    """Versucht, die Datei exklusiv zu sperren, ohne zu warten."""
+    try:
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+#----------------------------------------------------
+
+def acquire_instance_lock():
+    """Sperrt die PID-Datei dieses Boards für die gesamte Laufzeit des Prozesses.
+
+        Returns:
+            bool: True, wenn diese Instanz die einzige ist. False, wenn bereits eine
+                  andere Instanz für dasselbe Board läuft.
+    """
+    global _lock_fd, _started_at
+    if _lock_fd is not None:
+        return True
+
+    path = _lock_path('.pid')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+
+    if not _try_lock(fd):
+        try:
+            os.lseek(fd, 0, os.SEEK_SET)
+            running_pid = os.read(fd, 32).decode(errors='ignore').strip() or '?'
+        except OSError: # Unter Windows ist der gesperrte Bereich auch nicht lesbar
+            running_pid = '?'
+        os.close(fd)
+        logging.info("Backend für Board %s läuft bereits (PID %s).", g.AUTODARTS_BOARD_ID, running_pid)
+        return False
+
+    # Die Sperre gehört jetzt uns: eine evtl. veraltete PID überschreiben
+    os.ftruncate(fd, 0)
+    os.lseek(fd, 0, os.SEEK_SET)
+    os.write(fd, str(os.getpid()).encode())
+    os.fsync(fd)
+
+    _lock_fd    = fd
+    _started_at = time.time()
+    return True
+
+#----------------------------------------------------
+
+def _status():
+    """Zustand dieser Instanz für den Status-Socket."""
+    return {
+        'pid':             os.getpid(),
+        'version':         g.VERSION,
+        'board_id':        g.AUTODARTS_BOARD_ID,
+        'uptime_s':        round(time.time() - _started_at, 1) if _started_at else None,
+        'active_match_id': g.active_match_id,
+        'websocket':       bool(g.ws_greenlet and not g.ws_greenlet.dead),
+        'token_status':    g.token_refresh_status,
+        'startup_ms':      g.startup_phases.get('live') or g.startup_phases.get('ready')
+    }
+
+
+def _handle_status_client(client, address):
+    try:
+        client.sendall((json.dumps(_status(), default=str) + "\n").encode())
+    except OSError:
+        pass
+    finally:
+        client.close()
+
+
+def start_status_socket():
+    """Startet den Status-Socket (nur mit Sperre und nur, wo Unix-Sockets verfügbar sind)."""
+    global _status_server
+    if not g.INSTANCE_STATUS_SOCKET or _lock_fd is None or _status_server is not None or not hasattr(socket, 'AF_UNIX'):
+        return
+
+    from gevent.server import StreamServer
+
+    path = _lock_path('.sock')
+    try:
+        # Wir halten die Sperre, ein vorhandener Socket stammt also von einer beendeten Instanz
+        if os.path.exists(path):
+            os.unlink(path)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(path)
+        listener.listen(8)
+    except OSError as e:
+        logging.warning("Status-Socket %s konnte nicht angelegt werden: %s", path, e)
+        return
+
+    _status_server = StreamServer(listener, _handle_status_client)
+    _status_server.start()
+
+
+def query_running_instance():
+    """Fragt den Status-Socket der laufenden Instanz ab.
+
+        Returns:
+            dict | None: Der Zustand der laufenden Instanz oder None, wenn sie nicht antwortet.
+    """
+    path = _lock_path('.sock')
+    if not hasattr(socket, 'AF_UNIX') or not os.path.exists(path):
+        return None
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+            client.settimeout(STATUS_SOCKET_TIMEOUT)
+            client.connect(path)
+            data = b''
+            while not data.endswith(b"\n"):
+                chunk = client.recv(4096)
+                if not chunk:
+                    break
+                data += chunk
+        return json.loads(data.decode())
+    except (OSError, ValueError):
+        return None
+
+#----------------------------------------------------
+
+def release_instance_lock():
+    """Gibt Sperre und Status-Socket frei (beim Herunterfahren)."""
+    global _lock_fd, _status_server
+    if _status_server is not None:
+        _status_server.stop()
+        _status_server = None
+        try:
+            os.unlink(_lock_path('.sock'))
+        except OSError:
+            pass
+
+    if _lock_fd is not None:
+        # Die Datei bleibt liegen, damit keine zweite Instanz zwischen unlink und Ende eine andere Datei sperrt
+        os.close(_lock_fd)
+        _lock_fd = None
@@ -0,0 +1,304 @@
+# Backend/modules/core/leg_spool.py
+
+# Offline-Spool für Leg-Statistiken.
+#
+# Ist die Datenbank am Leg-Ende nicht erreichbar (get_db_connection liefert None) oder schlägt
+# das Speichern fehl (INSERT oder COMMIT), wird das komplette Leg-Event an eine lokale, nur
+# anhängende Datei (NDJSON, eine Zeile pro Leg) geschrieben, statt es zu verwerfen. Ein Hintergrund-Greenlet prüft regelmäßig, ob die
+# Datenbank wieder erreichbar ist, und spielt die Legs dann über dieselben Leg-Ende-Funktionen
+# (LEG_END_HANDLERS) nach. Da die History-Tabellen einen eindeutigen Schlüssel
+# (player_id, match_id, set_number, leg_number) haben und mit INSERT IGNORE geschrieben wird, entstehen
+# auch bei einem erneuten Nachspielen keine doppelten Legs. Die Leg-Ende-Funktionen melden
+# True nach einem erfolgreichen Commit und False, wenn das Leg nicht gespeichert wurde; nur
+# bestätigte Legs werden aus dem Spool entfernt.
+#
+# fsync-Bündelung: Jede Zeile wird sofort geschrieben und geflusht, das teure fsync erfolgt
+# aber erst nach SPOOL_FSYNC_BATCH Einträgen bzw. spätestens nach SPOOL_FSYNC_INTERVAL Sekunden.
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+import gevent
+
+from . import shared_state as g
+from ..core import constants as c
+from .database_handler import get_db_connection
+from .instance_lock import board_path, adopt_shared_file
+from .metrics import register_metrics_provider
+
+SPOOL_FSYNC_BATCH    = 5    # fsync spätestens nach so vielen neuen Einträgen ...
+SPOOL_FSYNC_INTERVAL = 2.0  # ... oder nach so vielen Sekunden
+SPOOL_MAX_ATTEMPTS   = 10   # Fehlversuche bei erreichbarer Datenbank, danach wird ein Leg verworfen
+
+_lock          = threading.RLock()
+_replay_state  = threading.local() # Greenlet-lokal (gevent monkey patching): markiert einen laufenden Replay und den Grund eines Fehlschlags
+_spool_file    = None
+_pending_keys  = set()  # (variant, match_id, set, leg) aller Einträge im Spool, verhindert doppeltes Spoolen
+_unsynced      = 0
+_last_fsync    = 0.0
+_replayer      = None
+_handlers      = {}
+
+_stats = {
+    'spooled_total':  0,
+    'replayed_total': 0,
+    'failed_total':   0,
+    'fsyncs':         0,
+    'last_replay_at': None,
+    'last_error':     None
+}
+
+#----------------------------------------------------
+
+def _spool_path():
+    # Eine Datei pro Board, mehrere Instanzen spielen sonst gegenseitig ihre Legs nach
+    return board_path(g.LEG_SPOOL_PATH)
+
+
+def _leg_key(event_data):
+    return (event_data.get(c.KEY_VARIANT), event_data.get(c.KEY_ID), event_data.get(c.KEY_SET, 1), event_data.get(c.KEY_LEG))
+
+
+def _read_records():
+    """Liest alle Einträge aus der Spool-Datei. Eine unvollständige letzte Zeile
+       (Absturz während des Schreibens) wird übersprungen.
+    """
+    path = _spool_path()
+    if not os.path.exists(path):
+        return []
+
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                logging.warning("Leg-Spool: Defekte Zeile in %s wird übersprungen.", path)
+    return records
+
+
+def _fsync(force=False):
+    global _unsynced, _last_fsync
+    if _spool_file is None or _unsynced == 0:
+        return
+    if force or _unsynced >= SPOOL_FSYNC_BATCH or time.monotonic() - _last_fsync >= SPOOL_FSYNC_INTERVAL:
+        os.fsync(_spool_file.fileno())
+        _unsynced   = 0
+        _last_fsync = time.monotonic()
+        _stats['fsyncs'] += 1
+
+
+def _close_file():
+    global _spool_file
+    if _spool_file is not None:
+        _fsync(force=True)
+        _spool_file.close()
+        _spool_file = None
+
+#----------------------------------------------------
+
+def spool_leg(event_data, error=None):
+    """Hängt ein Leg-Event an die Spool-Datei an, weil es nicht gespeichert werden konnte.
+
+        Wird von den update_*_statistic_after_leg Funktionen aufgerufen, wenn
+        get_db_connection() keine Verbindung liefert oder das Speichern mit einem Fehler
+        abbricht (Rollback). Während eines Replays wird nichts geschrieben (der Eintrag steht
+        ja noch im Spool), sondern nur gemerkt, ob die Verbindung fehlte.
+
+        Args:
+            event_data (dict): Das vollständige Leg-Event vom Autodarts-Server.
+            error (Exception): Der Fehler beim Speichern, None wenn keine Verbindung zustande kam.
+    """
+    global _spool_file, _unsynced
+
+    # Die Datenbank ist absichtlich abgeschaltet, nicht ausgefallen
+    if not g.USE_DATABASE:
+        return
+
+    if getattr(_replay_state, 'active', False):
+        _replay_state.connection_lost = error is None
+        return
+
+    key = _leg_key(event_data)
+    with _lock:
+        if key in _pending_keys:
+            return
+
+        try:
+            if _spool_file is None:
+                os.makedirs(os.path.dirname(_spool_path()), exist_ok=True)
+                _spool_file = open(_spool_path(), 'a', encoding='utf-8')
+
+            record = {'spool_id': uuid.uuid4().hex, 'spooled_at': time.time(), 'event_data': event_data}
+            _spool_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            _spool_file.flush()
+            _unsynced += 1
+            _fsync()
+        except OSError as e:
+            _stats['last_error'] = str(e)
+            logging.error("Leg-Spool: Leg %s konnte nicht gesichert werden: %s", key, e)
+            return
+
+        _pending_keys.add(key)
+        _stats['spooled_total'] += 1
+
+    if error is None:
+        logging.warning("Datenbank nicht erreichbar: Leg %s wurde im Spool gesichert (%d wartend).", key, len(_pending_keys))
+    else:
+        logging.warning("Leg %s konnte nicht gespeichert werden (%s) und wurde im Spool gesichert (%d wartend).", key, error, len(_pending_keys))
+
+#----------------------------------------------------
+
+def replay_spool():
+    """Spielt alle Einträge des Spools über die LEG_END_HANDLERS nach.
+
+        Bricht beim ersten Leg ab, für das wieder keine DB-Verbindung zustande kommt.
+        Aus der Datei entfernt werden nur Einträge, deren Leg-Ende-Funktion den Commit
+        bestätigt hat (True), sowie unbrauchbare Einträge. Schlägt das Speichern bei
+        erreichbarer Datenbank fehl, bleibt der Eintrag für SPOOL_MAX_ATTEMPTS Versuche
+        erhalten. Während des Replays neu hinzugekommene Einträge bleiben ebenfalls erhalten.
+
+        Returns:
+            int: Die Anzahl der erfolgreich nachgespielten Legs.
+    """
+    with _lock:
+        _fsync(force=True)
+        records = _read_records()
+    if not records:
+        return 0
+
+    done_ids = set()
+    attempts = {}   # spool_id -> Fehlversuche der Einträge, die erhalten bleiben
+    replayed = 0
+    for record in records:
+        event_data = record.get('event_data', {})
+        handler    = _handlers.get(event_data.get(c.KEY_VARIANT))
+
+        if handler:
+            _replay_state.active          = True
+            _replay_state.connection_lost = False
+            try:
+                saved = handler(event_data)
+            except Exception as e:
+                # Ein Fehler in den Daten selbst würde bei jedem Versuch erneut auftreten
+                logging.error("Leg-Spool: Leg %s konnte nicht nachgespielt werden und wird verworfen: %s", _leg_key(event_data), e)
+                _stats['failed_total'] += 1
+                done_ids.add(record.get('spool_id'))
+                continue
+            finally:
+                _replay_state.active = False
+
+            if saved is False:
+                if _replay_state.connection_lost:
+                    break
+
+                failed = record.get('attempts', 0) + 1
+                if failed < SPOOL_MAX_ATTEMPTS:
+                    attempts[record.get('spool_id')] = failed
+                    continue
+                logging.error("Leg-Spool: Leg %s nach %d Fehlversuchen verworfen.", _leg_key(event_data), failed)
+                _stats['failed_total'] += 1
+            elif saved:
+                replayed += 1
+                _stats['replayed_total'] += 1
+            else:
+                # Die Leg-Ende-Funktion hatte nichts zu speichern (unvollständige Event-Daten)
+                logging.warning("Leg-Spool: Leg %s enthält keine speicherbaren Daten und wird verworfen.", _leg_key(event_data))
+        else:
+            logging.error("Leg-Spool: Kein Leg-Ende-Handler für Variante '%s', Eintrag wird verworfen.", event_data.get(c.KEY_VARIANT))
+            _stats['failed_total'] += 1
+
+        done_ids.add(record.get('spool_id'))
+
+    if not done_ids and not attempts:
+        return 0
+
+    # Die Datei neu schreiben: alles, was noch nicht erledigt ist (inkl. neuer Einträge)
+    with _lock:
+        _close_file()
+        remaining = [r for r in _read_records() if r.get('spool_id') not in done_ids]
+        for record in remaining:
+            if record.get('spool_id') in attempts:
+                record['attempts'] = attempts[record.get('spool_id')]
+        path      = _spool_path()
+        tmp_path  = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for record in remaining:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+        _pending_keys.clear()
+        _pending_keys.update(_leg_key(r.get('event_data', {})) for r in remaining)
+        _stats['last_replay_at'] = time.strftime('%Y-%m-%d %H:%M:%S')
+
+    logging.info("Leg-Spool: %d Leg(s) nachgespielt, %d wartend.", replayed, len(_pending_keys))
+    return replayed
+
+#----------------------------------------------------
+
+def _replayer_loop():
+    while True:
+        gevent.sleep(min(g.LEG_SPOOL_REPLAY_INTERVAL, SPOOL_FSYNC_INTERVAL) if _unsynced else g.LEG_SPOOL_REPLAY_INTERVAL)
+        try:
+            with _lock:
+                _fsync()
+
+            if not _pending_keys:
+                continue
+
+            # Erst prüfen, ob die Datenbank wieder da ist, dann nachspielen
+            with get_db_connection() as conn:
+                available = conn is not None
+            if available:
+                replay_spool()
+
+        except Exception as e:
+            _stats['last_error'] = str(e)
+            logging.error("Leg-Spool: Fehler im Replayer: %s", e)
+
+#----------------------------------------------------
+
+def start_leg_spool_replayer(handlers):
+    """Lädt einen vorhandenen Spool (z.B. nach einem Neustart) und startet den Replayer.
+
+        Args:
+            handlers (dict): Die LEG_END_HANDLERS (Variante -> Leg-Ende-Funktion).
+    """
+    global _replayer
+    if not g.USE_DATABASE or _replayer is not None:
+        return
+
+    _handlers.update(handlers)
+    adopt_shared_file(g.LEG_SPOOL_PATH)
+    with _lock:
+        _pending_keys.update(_leg_key(r.get('event_data', {})) for r in _read_records())
+
+    if _pending_keys:
+        logging.info("Leg-Spool: %d Leg(s) aus einer früheren Sitzung warten auf die Datenbank.", len(_pending_keys))
+
+    _replayer = gevent.spawn(_replayer_loop)
+
+
+def stop_leg_spool_replayer():
+    """Beendet den Replayer und schreibt ausstehende Einträge sicher auf die Platte."""
+    global _replayer
+    if _replayer is not None:
+        _replayer.kill()
+        _replayer = None
+    with _lock:
+        _close_file()
+
+#----------------------------------------------------
+
+def spool_stats():
+    """Liefert die Kennzahlen des Spools für /api/metrics."""
+    with _lock:
+        return dict(_stats, depth=len(_pending_keys), unsynced=_unsynced, path=_spool_path())
+
+register_metrics_provider('leg_spool', spool_stats)
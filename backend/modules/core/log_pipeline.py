@@ -0,0 +1,122 @@
+# Backend/modules/core/log_pipeline.py
+
+# Asynchrone Log-Ausgabe.
+#
+# Ohne diese Stufe formatiert jeder logging-Aufruf (auch im Wurf- und Leg-Ende-Pfad) die Ausgabe
+# mit rich und schreibt sie synchron auf die Konsole. Jetzt legt der Aufrufer den Eintrag nur in
+# eine begrenzte Warteschlange, geschrieben wird von einem eigenen Writer (QueueListener, unter
+# gevent ein Greenlet) mit dem eigentlichen Handler (RichHandler).
+#
+#   - Ist die Warteschlange voll, wird der Eintrag verworfen und gezählt statt zu blockieren.
+#   - Identische Warnungen/Fehler (z.B. WebSocket-Reconnects) werden innerhalb von
+#     LOG_REPEAT_WINDOW Sekunden nur einmal ausgegeben, die Anzahl der unterdrückten
+#     Wiederholungen wird beim nächsten Auftreten angehängt.
+
+import logging
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+
+from . import shared_state as g
+from .metrics import register_metrics_provider
+
+REPEAT_KEYS_MAX = 256  # So viele verschiedene Meldungen merkt sich der Filter höchstens
+
+_listener = None
+
+_stats = {
+    'queued':     0,
+    'dropped':    0,
+    'suppressed': 0
+}
+
+#----------------------------------------------------
+
+class BoundedQueueHandler(QueueHandler):
+    """QueueHandler, der bei voller Warteschlange verwirft statt zu blockieren."""
+
+    def prepare(self, record):
+        # Nur die Nachricht jetzt fertig bauen (die Argumente könnten sich später noch ändern).
+        # exc_info bleibt erhalten, damit der RichHandler den Traceback wie gewohnt darstellt.
+        record.msg  = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+            _stats['queued'] += 1
+        except queue.Full:
+            _stats['dropped'] += 1
+
+#----------------------------------------------------
+
+class RepeatedMessageFilter(logging.Filter):
+    """Lässt identische Warnungen und Fehler nur einmal pro Zeitfenster durch."""
+
+    def __init__(self, window):
+        super().__init__()
+        self.window = window
+        self._seen  = {}   # (Level, Logger, Nachricht) -> [erste Ausgabe, unterdrückt]
+        self._lock  = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno < logging.WARNING or self.window <= 0:
+            return True
+
+        key = (record.levelno, record.name, record.getMessage())
+        now = time.monotonic()
+        with self._lock:
+            entry = self._seen.get(key)
+            if entry and now - entry[0] < self.window:
+                entry[1] += 1
+                _stats['suppressed'] += 1
+                return False
+
+            suppressed = entry[1] if entry else 0
+            self._seen.pop(key, None)
+            self._seen[key] = [now, 0]
+            while len(self._seen) > REPEAT_KEYS_MAX:
+                self._seen.pop(next(iter(self._seen)))
+
+        if suppressed:
+            record.msg  = f"{record.getMessage()} ({suppressed}x wiederholt, unterdrückt)"
+            record.args = None
+        return True
+
+#----------------------------------------------------
+
+def install_log_queue(root_logger, handler):
+    """Schaltet eine Warteschlange vor den Handler und startet den Writer.
+
+        Args:
+            root_logger (logging.Logger): Der Logger, an den die Warteschlange gehängt wird.
+            handler (logging.Handler):    Der Handler, der tatsächlich schreibt (z.B. RichHandler).
+    """
+    global _listener
+    stop_log_queue()
+
+    queue_handler = BoundedQueueHandler(queue.Queue(maxsize=g.LOG_QUEUE_SIZE))
+    queue_handler.addFilter(RepeatedMessageFilter(g.LOG_REPEAT_WINDOW))
+    root_logger.addHandler(queue_handler)
+
+    _listener = QueueListener(queue_handler.queue, handler, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_log_queue():
+    """Schreibt alle wartenden Einträge und beendet den Writer (beim Herunterfahren)."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+#----------------------------------------------------
+
+def log_queue_stats():
+    """Liefert die Kennzahlen der Log-Warteschlange für /api/metrics."""
+    depth = _listener.queue.qsize() if _listener is not None else 0
+    return dict(_stats, depth=depth, max_size=g.LOG_QUEUE_SIZE, repeat_window=g.LOG_REPEAT_WINDOW)
+
+register_metrics_provider('logging', log_queue_stats)
@@ -0,0 +1,42 @@
+# Backend/modules/core/metrics.py
+
+# Zentrale Sammelstelle für Laufzeit-Kennzahlen (Cache-Treffer, Warteschlangen-Tiefen,
+# Latenzen, ...). Jedes Modul meldet beim Import eine Funktion an, die seine aktuellen
+# Kennzahlen als Dictionary liefert. Der Endpunkt /api/metrics ruft alle angemeldeten
+# Funktionen auf und gibt das Ergebnis als JSON aus.
+
+import logging
+
+# Dispatcher-Dictionary: Name des Bereichs -> Funktion, die ein Dictionary liefert
+METRICS_PROVIDERS = {}
+
+#----------------------------------------------------
+
+def register_metrics_provider(name, provider):
+    """Meldet eine Funktion an, die die Kennzahlen eines Bereichs liefert.
+
+        Args:
+            name (str):          Der Name des Bereichs (z.B. 'player_stats_cache').
+            provider (callable): Eine Funktion ohne Parameter, die ein Dictionary liefert.
+    """
+    METRICS_PROVIDERS[name] = provider
+
+#----------------------------------------------------
+
+def collect_metrics():
+    """Sammelt die Kennzahlen aller angemeldeten Bereiche.
+
+        Ein Fehler in einem Bereich wird geloggt und als 'error' ausgegeben,
+        damit die übrigen Kennzahlen trotzdem angezeigt werden.
+
+        Returns:
+            dict: {name: {kennzahl: wert}}
+    """
+    result = {}
+    for name, provider in METRICS_PROVIDERS.items():
+        try:
+            result[name] = provider()
+        except Exception as e:
+            logging.error("Kennzahlen für '%s' konnten nicht ermittelt werden: %s", name, e)
+            result[name] = {'error': str(e)}
+    return result
@@ -0,0 +1,105 @@
+# Backend/modules/core/player_stats_cache.py
+
+# Prozessweiter Cache für Spieler-Statistiken.
+#
+# Im Gegensatz zu g.player_data_map (wird bei jedem Matchstart neu aufgebaut und bei
+# Matchende geleert) überlebt dieser Cache das Ende eines Matches. Spielen die gleichen
+# Spieler an einem Abend mehrere Matches, sind ihre DB-IDs und Gesamt-Statistiken
+# (Average, MPR, Hit-Rate, PPR) beim nächsten Matchstart ohne DB-Zugriff verfügbar.
+#
+# Verdrängung: LRU (die am längsten nicht genutzten Einträge fliegen zuerst raus) plus
+# TTL (Einträge, die älter als die konfigurierte Lebensdauer sind, gelten als Fehltreffer).
+# Die Leg-Ende-Funktionen schreiben neue Werte per write-through direkt in den Cache.
+
+import threading
+import time
+from collections import OrderedDict
+
+from .metrics import register_metrics_provider
+
+
+class PlayerStatsCache:
+    """LRU+TTL-Cache mit Schlüssel (Spielmodus, Spielername klein)."""
+
+    def __init__(self, max_entries=256, ttl_seconds=6 * 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries    = OrderedDict() # (game_mode, name) -> {'db_id', 'stat', 'is_registered', 'stored_at'}
+        self._lock       = threading.RLock()
+        self.hits        = 0
+        self.misses      = 0
+        self.evictions   = 0
+
+    def configure(self, max_entries, ttl_seconds):
+        """Übernimmt die Werte aus der Konfiguration (wird beim Start aufgerufen)."""
+        with self._lock:
+            self.max_entries = max_entries
+            self.ttl_seconds = ttl_seconds
+            self._evict()
+
+    def get(self, game_mode, player_name):
+        """Liefert eine Kopie des Eintrags oder None (Fehltreffer oder abgelaufen)."""
+        key = (game_mode, player_name.lower())
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry['stored_at'] > self.ttl_seconds:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry)
+
+    def put(self, game_mode, player_name, **values):
+        """Legt einen Eintrag an oder aktualisiert die übergebenen Felder (write-through).
+
+            Erlaubte Felder: db_id, stat, is_registered. Felder mit dem Wert None
+            überschreiben vorhandene Werte nicht.
+        """
+        key = (game_mode, player_name.lower())
+        with self._lock:
+            entry = self._entries.pop(key, None) or {'db_id': None, 'stat': None, 'is_registered': None}
+            entry.update({k: v for k, v in values.items() if v is not None})
+            entry['stored_at'] = time.monotonic()
+            self._entries[key] = entry
+            self._evict()
+
+    def invalidate(self, game_mode, player_name=None):
+        """Entfernt einen Spieler oder (ohne Namen) alle Spieler eines Spielmodus."""
+        with self._lock:
+            if player_name is not None:
+                self._entries.pop((game_mode, player_name.lower()), None)
+                return
+            for key in [k for k in self._entries if k[0] == game_mode]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Liefert die Kennzahlen des Caches für /api/metrics."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries':     len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                'hits':        self.hits,
+                'misses':      self.misses,
+                'hit_rate':    round(self.hits / lookups, 3) if lookups else None,
+                'evictions':   self.evictions
+            }
+
+    def _evict(self):
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+#----------------------------------------------------
+
+# Die eine, prozessweite Instanz
+player_stats_cache = PlayerStatsCache()
+register_metrics_provider('player_stats_cache', player_stats_cache.stats)
@@ -0,0 +1,80 @@
+# Backend/modules/core/processed_legs.py
+
+# Schneller Vorfilter gegen doppeltes Speichern eines Legs.
+#
+# Der Autodarts-Server sendet beim Matchende sofort nach dem Gewinn des finalen Legs ein Event,
+# das alle Daten (inkl. des Matchgewinners) enthält. Nach dem Klick auf den Finish-Button sendet
+# er ein - bis auf den Zeitstempel - absolut identisches Event.
+#
+# Die eigentliche Garantie, dass ein Leg nur einmal gespeichert wird, liefert die Datenbank
+# (eindeutiger Schlüssel player_id, match_id, set_number, leg_number + INSERT IGNORE). Diese Menge erspart
+# nur den DB-Zugriff für bereits bekannte Legs. Sie ist begrenzt (die ältesten Einträge fliegen
+# zuerst raus) und wird beim Matchstart NICHT geleert: Nach einem Neustart oder wenn ein Eintrag
+# verdrängt wurde, entscheidet einfach wieder die Datenbank.
+
+import threading
+from collections import OrderedDict
+
+from ..core import constants as c
+
+
+def leg_id_of(event_data):
+    """Bildet die Leg-ID ("matchid-satznummer-legnummer") aus einem Leg-Event. Der Satz gehört
+       dazu, da Autodarts die Legs in jedem Satz neu zählt."""
+    return f"{event_data.get(c.KEY_ID)}-{event_data.get(c.KEY_SET, 1)}-{event_data.get(c.KEY_LEG)}"
+
+
+class ProcessedLegIds:
+    """Begrenzte Menge der zuletzt gespeicherten Leg-IDs (LRU)."""
+
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._ids        = OrderedDict()
+        self._lock       = threading.Lock()
+        self.hits        = 0
+        self.misses      = 0
+        self.on_add      = None  # Optionaler Callback(leg_id), z.B. für das Sitzungs-Journal
+
+    def __contains__(self, leg_id):
+        with self._lock:
+            if leg_id in self._ids:
+                self._ids.move_to_end(leg_id)
+                self.hits += 1
+                return True
+            self.misses += 1
+            return False
+
+    def add(self, leg_id):
+        with self._lock:
+            self._ids[leg_id] = True
+            self._ids.move_to_end(leg_id)
+            while len(self._ids) > self.max_entries:
+                self._ids.popitem(last=False)
+        if self.on_add:
+            self.on_add(leg_id)
+
+    def ids(self):
+        """Alle Leg-IDs, älteste zuerst (für Snapshots)."""
+        with self._lock:
+            return list(self._ids)
+
+    def restore(self, leg_ids):
+        """Übernimmt Leg-IDs aus einem Snapshot, ohne den Callback auszulösen."""
+        with self._lock:
+            for leg_id in leg_ids:
+                self._ids[leg_id] = True
+                self._ids.move_to_end(leg_id)
+            while len(self._ids) > self.max_entries:
+                self._ids.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._ids.clear()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def stats(self):
+        """Liefert die Kennzahlen für /api/metrics."""
+        with self._lock:
+            return {'entries': len(self._ids), 'max_entries': self.max_entries, 'hits': self.hits, 'misses': self.misses}
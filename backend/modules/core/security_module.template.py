@@ -147,9 +147,12 @@ def get_auth_header():
     """
     Gibt den fertigen, sicheren Header mit dem Autodarts Bearer-Token für 
     normale REST-API-Aufrufe zurück.
+    Der Header wird vom Keycloak-Client vorbereitet und darf nicht verändert werden.
     """
-    if _keycloak_client and _keycloak_client.access_token:
-        return {'Authorization': 'Bearer ' + _keycloak_client.access_token}
+    if _keycloak_client:
+        header = _keycloak_client.get_auth_header()
+        if header:
+            return header
     raise Exception("Security Modul nicht initialisiert oder Token nicht verfügbar.")
 
 #--------------------------------------------------------------------------------------
@@ -165,3 +168,11 @@ def get_user_id():
     if _keycloak_client:
         return _keycloak_client.user_id
     return None
+
+#--------------------------------------------------------------------------------------
+
+def get_token_expires_in():
+    """Gibt die aktuelle Restlaufzeit des Access-Tokens zurück (z.B. "4m 12s" oder "Expired")."""
+    if _keycloak_client:
+        return _keycloak_client.access_expires_in()
+    return "N/A"
@@ -0,0 +1,298 @@
+# Backend/modules/core/session_journal.py
+
+# Sitzungs-Journal für einen schnellen Neustart während eines laufenden Matches.
+#
+# Ohne Journal gehen bei einem Neustart player_data_map (inkl. der "eingerasteten"
+# display_order), processed_leg_ids und das zuletzt gesendete Event verloren. Das Backend muss
+# dann alle Matches abfragen, die Spielerdaten neu laden und per Kickstart-PATCH einen neuen
+# Spielstand anfordern, bevor die Anzeigen wieder etwas zeigen.
+#
+# Das Journal ist eine nur anhängende Datei (NDJSON) im Backend-Verzeichnis:
+#   {"t": ..., "state": {"last_message_to_frontend": ..., "player_data_map": ...}}  Zustandsänderung
+#   {"t": ..., "leg": "matchid-3"}                                                  gespeichertes Leg
+# Nach JOURNAL_COMPACT_EVERY Einträgen (und beim Matchende/Herunterfahren) wird der gesamte
+# Zustand als kompakter Snapshot geschrieben und das Journal geleert.
+#
+# Geschrieben wird nicht auf dem Weg des Events: journal_state()/journal_event() merken sich
+# die Änderung nur. Ein Schreib-Greenlet sammelt JOURNAL_FLUSH_INTERVAL Sekunden lang, schreibt
+# dann pro Zustandsvariable nur den letzten Wert in EINEN Eintrag und flusht einmal. Das fsync
+# des Snapshots läuft im Threadpool von gevent und blockiert den Event-Loop nicht.
+#
+# Beim Start stellt restore_session() den Zustand aus Snapshot + Journal wieder her und sendet
+# das letzte Event sofort an die Anzeigen, noch bevor eine Netzwerkverbindung besteht.
+
+import json
+import logging
+import os
+import threading
+import time
+
+import gevent
+from gevent.event import Event
+
+from . import shared_state as g
+from .utils_backend import broadcast
+from .instance_lock import board_path, adopt_shared_file
+from .metrics import register_metrics_provider
+
+JOURNAL_COMPACT_EVERY  = 200 # Einträge bis zum nächsten Snapshot
+JOURNAL_FLUSH_INTERVAL = 0.5 # Sekunden, in denen Änderungen gesammelt und gemeinsam geschrieben werden
+
+# Zustandsvariablen aus shared_state, die im Journal gesichert werden
+JOURNALED_STATE = ['active_match_id', 'player_data_map', 'last_message_to_frontend', 'bull_off_winner', 'checkoutsCounter']
+
+_lock          = threading.RLock()
+_journal_file  = None
+_records       = 0       # Einträge seit dem letzten Snapshot
+_pending_state = {}      # Noch nicht geschriebene Zustandsänderungen (neuere ersetzen ältere)
+_pending_legs  = []      # Noch nicht geschriebene Leg-IDs
+_snapshot_due  = False   # Snapshot beim nächsten Schreiben (Matchende)
+_wake          = Event()
+_writer        = None
+
+_stats = {
+    'records_total':   0,
+    'coalesced':       0,
+    'flushes':         0,
+    'snapshots':       0,
+    'restored_match':  None,
+    'restore_ms':      None,
+    'last_error':      None
+}
+
+#----------------------------------------------------
+
+def _shared_snapshot_path():
+    return os.path.splitext(g.SESSION_JOURNAL_PATH)[0] + '.snapshot.json'
+
+
+def _journal_path():
+    # Eine Datei pro Board, mehrere Instanzen überschreiben sonst gegenseitig ihre Sitzung
+    return board_path(g.SESSION_JOURNAL_PATH)
+
+
+def _snapshot_path():
+    return board_path(_shared_snapshot_path())
+
+
+def _fsync(fileno):
+    """fsync in einem Thread des gevent-Threadpools, damit der Event-Loop weiterläuft."""
+    gevent.get_hub().threadpool.apply(os.fsync, (fileno,))
+
+
+def _flush():
+    """Schreibt die gesammelten Änderungen als Einträge ans Journal (ein flush, ohne fsync)
+       und kompaktiert bei Bedarf."""
+    global _journal_file, _records, _pending_state, _pending_legs, _snapshot_due
+    with _lock:
+        # Übernehmen, bevor etwas blockiert: Neue Änderungen landen im nächsten Durchlauf
+        state, _pending_state = _pending_state, {}
+        legs,  _pending_legs  = _pending_legs, []
+        snapshot_due, _snapshot_due = _snapshot_due, False
+
+        records = [{'leg': leg_id} for leg_id in legs] + ([{'state': state}] if state else [])
+        if records:
+            try:
+                if _journal_file is None:
+                    os.makedirs(os.path.dirname(_journal_path()), exist_ok=True)
+                    _journal_file = open(_journal_path(), 'a', encoding='utf-8')
+
+                t = time.time()
+                _journal_file.write("".join(json.dumps(dict(record, t=t), ensure_ascii=False, default=str) + "\n" for record in records))
+                _journal_file.flush()
+            except (OSError, TypeError, ValueError) as e:
+                _stats['last_error'] = str(e)
+                logging.error("Sitzungs-Journal: Eintrag konnte nicht geschrieben werden: %s", e)
+                return
+
+            _records += len(records)
+            _stats['records_total'] += len(records)
+            _stats['flushes'] += 1
+
+        if snapshot_due or _records >= JOURNAL_COMPACT_EVERY:
+            write_snapshot()
+
+
+def _writer_loop():
+    while True:
+        _wake.wait()
+        _wake.clear()
+        # Weitere Änderungen sammeln, damit mehrere Darts einen einzigen Eintrag ergeben
+        gevent.sleep(JOURNAL_FLUSH_INTERVAL)
+        try:
+            _flush()
+        except Exception as e:
+            _stats['last_error'] = str(e)
+            logging.error("Sitzungs-Journal: Fehler im Schreib-Greenlet: %s", e)
+
+#----------------------------------------------------
+
+def journal_state(**changes):
+    """Merkt geänderte Zustandsvariablen (Schlüssel aus JOURNALED_STATE) zum Schreiben vor."""
+    if changes:
+        _stats['coalesced'] += sum(1 for name in changes if name in _pending_state)
+        _pending_state.update(changes)
+        _wake.set()
+
+
+def journal_event(event):
+    """Sichert das gerade gesendete Event zusammen mit dem dazugehörigen Sitzungszustand.
+       Bei mehreren Darts innerhalb von JOURNAL_FLUSH_INTERVAL wird nur der letzte Stand geschrieben."""
+    journal_state(
+        last_message_to_frontend = event,
+        player_data_map          = g.player_data_map,
+        checkoutsCounter         = g.checkoutsCounter,
+        bull_off_winner          = g.bull_off_winner
+    )
+
+
+def _journal_leg(leg_id):
+    _pending_legs.append(leg_id)
+    _wake.set()
+
+#----------------------------------------------------
+
+def write_snapshot():
+    """Schreibt den vollständigen Zustand atomar als Snapshot und leert das Journal."""
+    global _journal_file, _records
+    with _lock:
+        snapshot = {name: getattr(g, name) for name in JOURNALED_STATE}
+        snapshot['processed_leg_ids'] = g.processed_leg_ids.ids()
+        snapshot['t'] = time.time()
+
+        try:
+            path     = _snapshot_path()
+            tmp_path = path + ".tmp"
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, ensure_ascii=False, default=str)
+                f.flush()
+                _fsync(f.fileno())
+            os.replace(tmp_path, path)
+
+            # Erst nach dem sicheren Snapshot das Journal leeren
+            if _journal_file is not None:
+                _journal_file.close()
+            _journal_file = open(_journal_path(), 'w', encoding='utf-8')
+        except (OSError, TypeError, ValueError) as e:
+            _stats['last_error'] = str(e)
+            logging.error("Sitzungs-Journal: Snapshot konnte nicht geschrieben werden: %s", e)
+            return
+
+        _records = 0
+        _stats['snapshots'] += 1
+
+
+def journal_reset():
+    """Das Match ist beendet: Ein Snapshot mit dem zurückgesetzten Zustand ersetzt das Journal
+       (im Schreib-Greenlet, nach den noch ausstehenden Einträgen)."""
+    global _snapshot_due
+    _snapshot_due = True
+    _wake.set()
+
+#----------------------------------------------------
+
+def _load():
+    """Liest Snapshot und Journal und spielt die Einträge der Reihe nach ein.
+
+        Returns:
+            tuple: (Zustand als dict, Leg-IDs, Zeitstempel der letzten Änderung)
+    """
+    state, leg_ids, last_change = {}, [], 0.0
+
+    if os.path.exists(_snapshot_path()):
+        with open(_snapshot_path(), 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+        leg_ids     = snapshot.pop('processed_leg_ids', [])
+        last_change = snapshot.pop('t', 0.0)
+        state       = {k: v for k, v in snapshot.items() if k in JOURNALED_STATE}
+
+    if os.path.exists(_journal_path()):
+        with open(_journal_path(), 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Unvollständige letzte Zeile (Absturz während des Schreibens)
+                    logging.warning("Sitzungs-Journal: Defekte Zeile wird übersprungen.")
+                    continue
+                if 'leg' in record:
+                    leg_ids.append(record['leg'])
+                state.update({k: v for k, v in record.get('state', {}).items() if k in JOURNALED_STATE})
+                last_change = record.get('t', last_change)
+
+    return state, leg_ids, last_change
+
+#----------------------------------------------------
+
+def restore_session():
+    """Stellt die Sitzung aus dem Journal wieder her, sendet das letzte Event an die Anzeigen
+        und startet den Schreib-Greenlet.
+
+        Ein Match wird nur wiederhergestellt, wenn die letzte Änderung nicht älter als
+        RECONNECT_MATCH_MAX_AGE_HOURS ist. Ob das Match noch läuft, prüft anschließend wie
+        gewohnt on_open_autodarts.
+
+        Returns:
+            bool: True, wenn ein laufendes Match wiederhergestellt wurde.
+    """
+    global _writer
+    start = time.perf_counter()
+    g.processed_leg_ids.on_add = _journal_leg
+    if _writer is None:
+        _writer = gevent.spawn(_writer_loop)
+
+    adopt_shared_file(g.SESSION_JOURNAL_PATH)
+    adopt_shared_file(_shared_snapshot_path())
+
+    try:
+        state, leg_ids, last_change = _load()
+    except (OSError, ValueError) as e:
+        _stats['last_error'] = str(e)
+        logging.error("Sitzungs-Journal: Wiederherstellung fehlgeschlagen: %s", e)
+        return False
+
+    g.processed_leg_ids.restore(leg_ids)
+
+    restored = False
+    is_recent = time.time() - last_change < g.RECONNECT_MATCH_MAX_AGE_HOURS * 3600
+    if is_recent and state.get('active_match_id') and state.get('last_message_to_frontend'):
+        for name, value in state.items():
+            setattr(g, name, value)
+        restored = True
+        _stats['restored_match'] = g.active_match_id
+
+    # Den wiederhergestellten (oder leeren) Zustand sofort als neuen Snapshot festschreiben
+    write_snapshot()
+    _stats['restore_ms'] = round((time.perf_counter() - start) * 1000, 2)
+
+    if restored:
+        logging.info("Sitzungs-Journal: Match %s in %s ms wiederhergestellt.", g.active_match_id, _stats['restore_ms'])
+        broadcast(g.last_message_to_frontend)
+    return restored
+
+#----------------------------------------------------
+
+def close_session_journal():
+    """Schreibt beim Herunterfahren die ausstehenden Änderungen und einen letzten Snapshot
+       und schließt das Journal."""
+    global _journal_file, _writer
+    if _writer is not None:
+        _writer.kill()
+        _writer = None
+    with _lock:
+        if _journal_file is None:
+            return
+        _flush()
+        write_snapshot()
+        _journal_file.close()
+        _journal_file = None
+
+#----------------------------------------------------
+
+def session_journal_stats():
+    """Liefert die Kennzahlen des Journals für /api/metrics."""
+    with _lock:
+        return dict(_stats, records_since_snapshot=_records, pending=len(_pending_state) + len(_pending_legs), path=_journal_path())
+
+register_metrics_provider('session_journal', session_journal_stats)
@@ -3,6 +3,8 @@
 # Dieses Modul enthält alle globalen Variablen, die von verschiedenen
 # Teilen der Anwendung gemeinsam genutzt werden.
 
+from .processed_legs import ProcessedLegIds
+
 # ==============================================================================
 # === 1. BENUTZER-KONFIGURATION (Wird beim Start geladen und ist dann konstant) ===
 # ==============================================================================
@@ -18,10 +20,29 @@ AUTODARTS_CERT_CHECK     = True
 
 # --- Datenbank Konfiguration ---
 USE_DATABASE             = None
+DB_BACKEND               = 'mariadb'            # 'mariadb' oder 'sqlite'
+DB_SQLITE_PATH           = 'data/statistics.db' # Pfad der SQLite-Datei (relativ zum Backend-Verzeichnis)
 DB_USER                  = ''
 DB_PASSWORD              = ''
 DB_HOST                  = ''
 DB_PORT                  = 3306
+DB_DATABASE              = ''
+PLAYER_CACHE_MAX_ENTRIES = 256   # Maximale Anzahl Einträge im prozessweiten Spieler-Cache
+PLAYER_CACHE_TTL_SECONDS = 21600 # Lebensdauer eines Cache-Eintrags in Sekunden
+LEG_SPOOL_PATH           = 'data/leg_spool.ndjson' # Spool-Datei für Legs, die nicht gespeichert werden konnten
+LEG_SPOOL_REPLAY_INTERVAL = 30   # Sekunden zwischen zwei Replay-Versuchen
+THROW_FLUSH_INTERVAL     = 5     # Spätestens nach so vielen Sekunden werden gepufferte Darts geschrieben
+SESSION_JOURNAL_PATH     = 'data/session_journal.ndjson' # Sitzungs-Journal für den schnellen Neustart während eines Matches
+INSTANCE_STATUS_SOCKET   = True  # Status-Socket, über den ein zweiter Start den Zustand der laufenden Instanz abfragt
+LOG_QUEUE_SIZE           = 10000 # Maximale Anzahl wartender Log-Einträge, weitere werden verworfen und gezählt
+LOG_REPEAT_WINDOW        = 60    # Identische Warnungen/Fehler werden innerhalb so vieler Sekunden nur einmal ausgegeben
+DEBUG_LOG_PATH           = 'data/debuglog' # Segmentdateien der Debug-Logs (/api/debug, /api/debugad, /api/debugadall)
+DEBUG_LOG_SEGMENT_MB     = 4     # Größe eines Segments, danach wird ein neues begonnen
+DEBUG_LOG_MAX_SEGMENTS   = 32    # Segmente pro Debug-Log, ältere werden gelöscht
+BOARD_TELEMETRY_INTERVAL_MS = 1000 # Abstand der Telemetrie-Abfragen beim Board Manager
+BOARD_TELEMETRY_HISTORY  = 600   # Anzahl der Telemetrie-Einträge im Ringpuffer
+BOARD_CONFIG_TTL         = 30    # Sekunden, die die Board-Manager-Konfiguration im Cache gültig ist
+AUTODARTS_HTTP_CACHE_PATH = 'data/autodarts_http_cache.json' # Antwort-Cache (ETag/Last-Modified) für Board- und Match-Abfragen
 
 # --- Webserver & Spiel-Konfiguration ---
 SUPPORTED_GAME_VARIANTS  = ['Bull-off', 'X01', 'Cricket/Tactics', "Bermuda", "Shanghai", "Gotcha", "Around the Clock", "Round the World", "Count Up", "Segment Training", "Bob's 27"]
@@ -46,17 +67,16 @@ AUTODARTS_WEBSOCKET_URL  = 'wss://api.autodarts.io/ms/v0/subscribe'
 
 # --- Geteilte Applikations-Objekte (Platzhalter) ---
 # Werden durch das Programm gesetzt. Müssen nicht in config.py definiert werden
-ad_debug_log             = []   # Speichert die formatierten Log-Einträge für die /debugad-Webseite (Autodarts-Rohdaten).
-autodarts_raw_log        = []   # Speichert alle rohen, ungefilterten WebSocket-Nachrichten vom Autodarts-Server.
 boardManagerAddress      = None # Speichert die ermittelte IP-Adresse des lokalen Board-Managers.
-debug_log                = []   # Speichert die Log-Einträge für die /debug-Webseite (Backend -> Frontend Events).
 game_data_lock           = None # Ein Threading-Lock, um den konkurrierenden Zugriff auf geteilte Zustandsvariablen zu verhindern.
 logger                   = None # Der globale Logger für die Anwendung zur Ausgabe von Informationen auf der Konsole.
 socketio                 = None # Die Flask-SocketIO-Server-Instanz für die Kommunikation mit den Clients.
 ws_greenlet              = None # Der gevent-Greenlet, der die persistente WebSocket-Verbindung zu Autodarts verwaltet.
+startup_started_at       = None # perf_counter() beim Programmstart (app_backend.py), Basis für die Startzeit-Messung
+startup_phases           = {}   # Dauer der einzelnen Startphasen in ms (Banner, /api/metrics)
 
-# Globale Variablen für die Token-Laufzeiten
-token_access_expires_in  = "N/A"
+# Zustand des Refresh-Tokens. Die Restlaufzeit des Access-Tokens wird bei jeder Abfrage neu
+# berechnet (security_module.get_token_expires_in(), angezeigt unter /api/state).
 token_refresh_status     = "N/A"
 
 # --- Geteilte Match- und Spiel-Zustandsvariablen ---
@@ -65,7 +85,7 @@ active_match_id          = None # Speichert die ID des aktuell laufenden Matches
 last_websocket_message   = None # Speichert die letzte WebSocket-Nachricht, um doppelte Verarbeitungen zu vermeiden.
 last_message_to_frontend = {}   # Speichert die zuletzt ans Frontend gesendete Message oder ein leeres Element
 player_data_map          = {}   # In-Memory-Cache für spielerbezogene Daten (Typ, Gesamt-Average, Indizes)
-processed_leg_ids        = set() # Ein Set, das sich die IDs der bereits gespeicherten Legs merkt (z.B. "matchid-1", "matchid-2")
+processed_leg_ids        = ProcessedLegIds() # Begrenzter Vorfilter der zuletzt gespeicherten Legs (z.B. "matchid-1-1"), die Datenbank ist maßgeblich
 bull_off_winner          = None # Gewinner des Ausbullens
 checkoutsCounter         = {}   # Zählt die Checkout-Versuche pro Spieler.
 lobbyPlayers             = []   # Speichert eine Liste der Spieler, die sich aktuell in einer Lobby befinden.
@@ -0,0 +1,99 @@
+# Backend/modules/core/socket_rooms.py
+
+# Socket.IO-Räume nach Board und Rolle.
+#
+# broadcast() hat bisher jedes Event an alle Clients des Standard-Namespaces geschickt: Die
+# Relays der Scoreboards bekamen Board-Status-Meldungen, die cmd-Seiten jedes Spiel-Update.
+# Jetzt meldet jeder Client beim Verbindungsaufbau seine Rolle (auth={'role': ...}) und landet
+# im Raum '<Board-ID>:<Rolle>'. Welche Rollen ein Event bekommen, steht in EVENT_ROLES, so
+# kosten zusätzliche cmd- oder Debug-Tablets auf dem Weg zu den Scoreboards keine Arbeit.
+# Clients ohne Angabe (ältere Relays, Browser direkt am Backend) gelten als Scoreboard.
+# Gesendete Events und Mitglieder pro Raum stehen unter /api/metrics.
+
+from flask_socketio import join_room
+
+from . import shared_state as g
+from . import constants as c
+from .metrics import register_metrics_provider
+
+ROLE_SCOREBOARD = 'scoreboard'
+ROLE_CMD        = 'cmd'
+ROLE_DEBUG      = 'debug'
+ROLES           = (ROLE_SCOREBOARD, ROLE_CMD, ROLE_DEBUG)
+DEFAULT_ROLE    = ROLE_SCOREBOARD
+
+# Dispatcher-Dictionary: Event -> Rollen, die es bekommen (sonst DEFAULT_EVENT_ROLES)
+EVENT_ROLES = {
+    c.EVT_GAME_UPDATE:   (ROLE_SCOREBOARD, ROLE_DEBUG),
+    c.EVT_MATCH_STARTED: (ROLE_SCOREBOARD, ROLE_DEBUG),
+    c.EVT_MATCH_ENDED:   (ROLE_SCOREBOARD, ROLE_CMD, ROLE_DEBUG),
+    c.EVT_LOBBY:         (ROLE_SCOREBOARD, ROLE_DEBUG),
+    'Board Status':      (ROLE_CMD, ROLE_DEBUG)
+}
+DEFAULT_EVENT_ROLES = (ROLE_SCOREBOARD, ROLE_DEBUG)
+
+_members = {}   # Raum -> Menge der sids
+_emits   = {}   # Raum -> Anzahl gesendeter Events
+
+#----------------------------------------------------
+
+def role_room(role, board_id=None):
+    """Name des Raums für eine Rolle (standardmäßig auf dem eigenen Board)."""
+    return f"{board_id or g.AUTODARTS_BOARD_ID}:{role}"
+
+
+def join_role(sid, auth=None):
+    """Nimmt einen Client in den Raum seiner Rolle auf (im Connect-Handler aufrufen).
+
+        Args:
+            sid (str):   Session-ID des Clients.
+            auth (dict): Die beim Verbinden mitgeschickten Daten, z.B. {'role': 'cmd', 'board_id': '...'}.
+
+        Returns:
+            str: Der Raum, dem der Client beigetreten ist.
+    """
+    auth = auth if isinstance(auth, dict) else {}
+    role = auth.get('role') if auth.get('role') in ROLES else DEFAULT_ROLE
+    room = role_room(role, auth.get('board_id'))
+    join_room(room, sid=sid)
+    _members.setdefault(room, set()).add(sid)
+    return room
+
+
+def leave_roles(sid):
+    """Vergisst einen getrennten Client (im Disconnect-Handler aufrufen). Aus den Räumen
+       selbst nimmt ihn Socket.IO beim Trennen heraus."""
+    for members in _members.values():
+        members.discard(sid)
+
+#----------------------------------------------------
+
+def reaches_scoreboard(event_name):
+    """Geht das Event (auch) an die Scoreboards? Nur dort kann ein leeres Event die Anzeige zurücksetzen."""
+    return ROLE_SCOREBOARD in EVENT_ROLES.get(event_name, DEFAULT_EVENT_ROLES)
+
+
+def emit_to_roles(event_name, data, roles=None):
+    """Sendet ein Event an die Räume der Rollen, die es brauchen (EVENT_ROLES).
+
+        Ein Client in mehreren dieser Räume bekommt das Event trotzdem nur einmal,
+        leere Räume werden übersprungen.
+    """
+    rooms = [room for room in (role_room(role) for role in (roles or EVENT_ROLES.get(event_name, DEFAULT_EVENT_ROLES)))
+             if _members.get(room)]
+    if not rooms or not g.socketio:
+        return
+    for room in rooms:
+        _emits[room] = _emits.get(room, 0) + 1
+    g.socketio.emit(event_name, data, to=rooms)
+
+#----------------------------------------------------
+
+def socket_rooms_stats():
+    """Liefert Mitglieder und gesendete Events pro Raum für /api/metrics."""
+    return {
+        room: {'members': len(_members.get(room, ())), 'emits': _emits.get(room, 0)}
+        for room in sorted(_members.keys() | _emits.keys())
+    }
+
+register_metrics_provider('socket_rooms', socket_rooms_stats)
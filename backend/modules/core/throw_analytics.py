@@ -0,0 +1,270 @@
+# Backend/modules/core/throw_analytics.py
+
+# Auswertungen über die einzelnen Darts aus 'throws_history' (NumPy, vollständig vektorisiert).
+#
+#   - Heatmap der Trefferpunkte, kartesisch (x/y-Raster) oder polar (Ringe x 20 Sektoren).
+#   - Streuung (Kovarianz-Ellipse, 95%) der Darts je angespieltem Ziel und Abweichung des
+#     Mittelpunkts vom Zielpunkt aus FIELD_COORDS.
+#   - Angespieltes Ziel vs. tatsächlich getroffenes Segment (Trefferquote, häufigste Treffer).
+#
+# Alle Berechnungen arbeiten auf NumPy-Arrays ohne Python-Schleifen über die Darts
+# (np.histogram2d, np.bincount, np.unique), 100.000 Darts dauern wenige Millisekunden.
+# Die Ergebnisse pro Spieler werden gecached, bis neue Darts geschrieben wurden.
+
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from . import shared_state as g
+from .database_handler import get_db_connection, THROW_HISTORY_TABLE
+from .throw_recorder import throws_data_version
+from .board_geometry import SECTOR_ORDER, SECTOR_WIDTH
+from .metrics import register_metrics_provider
+
+# Zielpunkte aller Segmente als Arrays (Reihenfolge wie in FIELD_COORDS)
+TARGET_NAMES = np.array(list(g.FIELD_COORDS.keys()))
+TARGET_XY    = np.array([[p['x'], p['y']] for p in g.FIELD_COORDS.values()])
+
+# Schreibweisen des Servers für dasselbe Segment vereinheitlichen (Schlüssel wie in FIELD_COORDS)
+HIT_ALIASES = {'Bull': '50', 'BULL': '50', 'D25': '50', 'S25': '25'}
+
+CHI2_95_2D          = 5.991  # Chi²-Quantil (2 Freiheitsgrade, 95%) für die Ellipsen-Halbachsen
+MIN_DARTS_PER_GROUP = 3     # Weniger Darts ergeben keine sinnvolle Kovarianz
+
+ANALYTICS_CACHE_MAX = 64
+ANALYTICS_CACHE_TTL = 300   # Sekunden, zusätzlich zur Invalidierung durch neue Darts
+
+_cache      = OrderedDict()
+_cache_lock = threading.Lock()
+_cache_stats = {'hits': 0, 'misses': 0, 'last_compute_ms': None}
+
+#----------------------------------------------------
+# Heatmaps
+
+def heatmap_cartesian(x, y, bins=40, extent=1.2):
+    """Zählt die Darts in einem quadratischen x/y-Raster um die Boardmitte.
+
+        Args:
+            x, y (np.ndarray): Normalisierte Board-Koordinaten (Doppelring außen = 1.0).
+            bins (int):        Anzahl der Felder pro Achse.
+            extent (float):    Halbe Kantenlänge des Rasters.
+
+        Returns:
+            dict: 'counts' (Zeilen = y von unten nach oben, Spalten = x), 'x_edges', 'y_edges'.
+    """
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins, range=[[-extent, extent], [-extent, extent]])
+    return {
+        'mode':    'cartesian',
+        'counts':  counts.T.astype(int).tolist(),
+        'x_edges': x_edges.round(4).tolist(),
+        'y_edges': y_edges.round(4).tolist()
+    }
+
+
+def heatmap_polar(x, y, radial_bins=12, extent=1.2):
+    """Zählt die Darts nach Abstand zur Mitte und Board-Sektor.
+
+        Der Winkel wird im Uhrzeigersinn ab oben gemessen und um einen halben Sektor
+        verschoben, so dass jede Winkelspalte genau einem Sektor entspricht (SECTOR_ORDER).
+
+        Returns:
+            dict: 'counts' (Zeilen = Radius-Bereiche, Spalten = Sektoren), 'r_edges', 'sectors'.
+    """
+    r     = np.hypot(x, y)
+    theta = (np.degrees(np.arctan2(x, y)) + SECTOR_WIDTH / 2) % 360.0
+
+    r_edges     = np.linspace(0.0, extent, radial_bins + 1)
+    theta_edges = np.linspace(0.0, 360.0, len(SECTOR_ORDER) + 1)
+    counts, _, _ = np.histogram2d(r, theta, bins=[r_edges, theta_edges])
+    return {
+        'mode':    'polar',
+        'counts':  counts.astype(int).tolist(),
+        'r_edges': r_edges.round(4).tolist(),
+        'sectors': SECTOR_ORDER
+    }
+
+# Dispatcher-Dictionary für die Art der Heatmap
+HEATMAP_HANDLERS = {
+    'cartesian': heatmap_cartesian,
+    'polar':     heatmap_polar
+}
+
+#----------------------------------------------------
+# Streuung je Ziel
+
+def dispersion_by_target(x, y, targets):
+    """Berechnet je angespieltem Ziel Mittelpunkt, Kovarianz-Ellipse (95%) und Abweichung
+       vom Zielpunkt. Alle Gruppen werden gemeinsam über np.bincount berechnet.
+
+        Args:
+            x, y (np.ndarray):  Koordinaten der Darts.
+            targets (np.ndarray): Ziel je Dart (Schlüssel aus FIELD_COORDS), '' = kein Ziel.
+
+        Returns:
+            dict: {ziel: {'darts', 'mean', 'offset', 'mean_error', 'ellipse'}}
+    """
+    mask = targets != ''
+    if not mask.any():
+        return {}
+    x, y, targets = x[mask], y[mask], targets[mask]
+
+    names, inv = np.unique(targets, return_inverse=True)
+    n  = np.bincount(inv).astype(float)
+    mx = np.bincount(inv, x) / n
+    my = np.bincount(inv, y) / n
+
+    dx, dy = x - mx[inv], y - my[inv]
+    dof = np.maximum(n - 1, 1)
+    sxx = np.bincount(inv, dx * dx) / dof
+    syy = np.bincount(inv, dy * dy) / dof
+    sxy = np.bincount(inv, dx * dy) / dof
+
+    # Eigenwerte der 2x2-Kovarianzmatrix in geschlossener Form
+    half_trace = (sxx + syy) / 2
+    disc       = np.sqrt(np.maximum(half_trace ** 2 - (sxx * syy - sxy ** 2), 0.0))
+    major      = np.sqrt(np.maximum(half_trace + disc, 0.0) * CHI2_95_2D)
+    minor      = np.sqrt(np.maximum(half_trace - disc, 0.0) * CHI2_95_2D)
+    angle      = np.degrees(0.5 * np.arctan2(2 * sxy, sxx - syy))
+
+    # Zielpunkte der Gruppen und mittlerer Abstand der Darts zum Zielpunkt
+    lookup   = {name: i for i, name in enumerate(TARGET_NAMES)}
+    aim_idx  = np.array([lookup.get(name, -1) for name in names])
+    aim      = np.where(aim_idx[:, None] >= 0, TARGET_XY[aim_idx], np.nan)
+    error    = np.hypot(x - aim[inv, 0], y - aim[inv, 1])
+    mean_err = np.bincount(inv, error) / n
+
+    result = {}
+    for i, name in enumerate(names):
+        if n[i] < MIN_DARTS_PER_GROUP:
+            continue
+        result[str(name)] = {
+            'darts':      int(n[i]),
+            'mean':       [round(float(mx[i]), 4), round(float(my[i]), 4)],
+            'offset':     [round(float(mx[i] - aim[i, 0]), 4), round(float(my[i] - aim[i, 1]), 4)],
+            'mean_error': round(float(mean_err[i]), 4),
+            'ellipse':    {'semi_major': round(float(major[i]), 4), 'semi_minor': round(float(minor[i]), 4), 'angle': round(float(angle[i]), 1)}
+        }
+    return result
+
+#----------------------------------------------------
+# Angespieltes Ziel vs. Treffer
+
+def intended_vs_hit(targets, hits, top=3):
+    """Vergleicht je Ziel das angespielte mit dem getroffenen Segment.
+
+        Args:
+            targets (np.ndarray): Ziel je Dart (Schlüssel aus FIELD_COORDS), '' = kein Ziel.
+            hits (np.ndarray):    Getroffenes Segment je Dart (z.B. 'T20', 'S1', '25').
+            top (int):            Anzahl der häufigsten Treffer pro Ziel.
+
+        Returns:
+            dict: {ziel: {'darts', 'hit_rate', 'top_hits': [[segment, anzahl], ...]}}
+    """
+    mask = targets != ''
+    if not mask.any():
+        return {}
+    targets, hits = targets[mask], hits[mask]
+
+    t_names, t_inv = np.unique(targets, return_inverse=True)
+    h_names, h_inv = np.unique(hits, return_inverse=True)
+
+    # Kreuztabelle Ziel x Treffer mit einem einzigen bincount
+    matrix = np.bincount(t_inv * len(h_names) + h_inv, minlength=len(t_names) * len(h_names)).reshape(len(t_names), len(h_names))
+    totals = matrix.sum(axis=1)
+    exact  = (t_names[:, None] == h_names[None, :])
+    hit_rate = (matrix * exact).sum(axis=1) / totals
+
+    order = np.argsort(-matrix, axis=1)[:, :top]
+    result = {}
+    for i, name in enumerate(t_names):
+        result[str(name)] = {
+            'darts':    int(totals[i]),
+            'hit_rate': round(float(hit_rate[i]), 4),
+            'top_hits': [[str(h_names[j]), int(matrix[i, j])] for j in order[i] if matrix[i, j] > 0]
+        }
+    return result
+
+#----------------------------------------------------
+# Daten laden und gecachte Gesamtauswertung
+
+def load_player_throws(player_name, variant=None):
+    """Lädt die Koordinaten, Treffer und Ziele aller gespeicherten Darts eines Spielers.
+
+        Returns:
+            tuple: (x, y, hits, targets) als NumPy-Arrays oder None ohne DB-Verbindung.
+    """
+    sql    = f"SELECT x, y, segment_name, target FROM {THROW_HISTORY_TABLE} WHERE player_name = %s AND x IS NOT NULL AND y IS NOT NULL"
+    params = [player_name]
+    if variant:
+        sql += " AND variant = %s"
+        params.append(variant)
+
+    with get_db_connection() as conn:
+        if not conn:
+            return None
+        cursor = conn.cursor()
+        cursor.execute(sql, tuple(params))
+        rows = cursor.fetchall()
+
+    if not rows:
+        empty = np.empty(0)
+        return empty, empty, np.empty(0, dtype=str), np.empty(0, dtype=str)
+
+    x, y, hits, targets = zip(*rows)
+    return (np.asarray(x, dtype=float), np.asarray(y, dtype=float),
+            np.array([HIT_ALIASES.get(h, h) or '' for h in hits]), np.array([t or '' for t in targets]))
+
+
+def get_player_analytics(player_name, variant=None, heatmap='polar', bins=12):
+    """Liefert Heatmap, Streuung und Ziel/Treffer-Vergleich eines Spielers.
+
+        Das Ergebnis wird gecached, bis neue Darts geschrieben wurden (throws_data_version)
+        oder ANALYTICS_CACHE_TTL abgelaufen ist.
+
+        Returns:
+            dict: Die Auswertung oder None, wenn die Datenbank nicht erreichbar ist.
+    """
+    key     = (player_name.lower(), variant, heatmap, bins)
+    version = throws_data_version()
+
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry and entry['version'] == version and time.monotonic() - entry['created'] < ANALYTICS_CACHE_TTL:
+            _cache.move_to_end(key)
+            _cache_stats['hits'] += 1
+            return dict(entry['result'], cached=True)
+        _cache_stats['misses'] += 1
+
+    data = load_player_throws(player_name, variant)
+    if data is None:
+        return None
+    x, y, hits, targets = data
+
+    start  = time.perf_counter()
+    result = {
+        'player':          player_name,
+        'variant':         variant,
+        'darts':           int(len(x)),
+        'heatmap':         HEATMAP_HANDLERS[heatmap](x, y, bins),
+        'dispersion':      dispersion_by_target(x, y, targets),
+        'intended_vs_hit': intended_vs_hit(targets, hits)
+    }
+    result['compute_ms'] = round((time.perf_counter() - start) * 1000, 2)
+
+    with _cache_lock:
+        _cache_stats['last_compute_ms'] = result['compute_ms']
+        _cache[key] = {'version': version, 'created': time.monotonic(), 'result': result}
+        while len(_cache) > ANALYTICS_CACHE_MAX:
+            _cache.popitem(last=False)
+
+    return dict(result, cached=False)
+
+
+def analytics_stats():
+    """Liefert die Kennzahlen des Caches für /api/metrics."""
+    with _cache_lock:
+        return dict(_cache_stats, entries=len(_cache))
+
+register_metrics_provider('throw_analytics', analytics_stats)
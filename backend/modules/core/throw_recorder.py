@@ -0,0 +1,225 @@
+# Backend/modules/core/throw_recorder.py
+
+# Speichert jeden einzelnen Dart (Segment und Board-Koordinaten) in der Tabelle 'throws_history'.
+#
+# Der Pfad pro Dart (record_throws, aufgerufen für jedes Live-Update) schreibt NIE direkt in die
+# Datenbank, sondern legt die Darts nur in einen Puffer im Speicher. Ein Hintergrund-Greenlet
+# schreibt den Puffer mit einem Bulk-Insert weg:
+#   - sobald eine Aufnahme beendet ist (Spieler, Runde oder Leg wechselt) oder
+#   - spätestens alle THROW_FLUSH_INTERVAL Sekunden.
+# Ist die Datenbank nicht erreichbar, bleiben die Darts im (begrenzten) Puffer und werden beim
+# nächsten Versuch geschrieben.
+# Hat eine Aufnahme weniger Darts als zuvor (Undo, Korrektur), fliegen die überzähligen Darts aus
+# dem Puffer, und beim nächsten Schreiben werden sie auch in der Tabelle gelöscht.
+
+import collections
+
+import logging
+import threading
+import time
+
+import gevent
+from gevent.event import Event
+
+from . import shared_state as g
+from ..core import constants as c
+from .database_handler import get_db_connection, save_throws_to_history, delete_undone_throws_from_history, DB_ERRORS
+from .metrics import register_metrics_provider
+
+THROW_BUFFER_MAX = 5000  # Mehr Darts werden nicht gepuffert (älteste fliegen raus)
+TURN_COUNTS_MAX  = 256   # Aufnahmen, deren Dart-Anzahl für das Erkennen von Korrekturen gemerkt wird
+
+_lock      = threading.Lock()
+_buffer    = {}     # Natürlicher Schlüssel -> Zeile (ein korrigierter Dart überschreibt den alten Wert)
+_last_turn = None
+_counts    = collections.OrderedDict()  # Aufnahme -> zuletzt gesehene Anzahl Darts
+_undone    = {}     # Aufnahme -> verbliebene Anzahl Darts, darüber liegende werden beim Schreiben gelöscht
+_wake      = Event()
+_flusher   = None
+
+_stats = {
+    'flushes':        0,
+    'rows_written':   0,
+    'rows_dropped':   0,
+    'corrections':    0,
+    'last_flush_ms':  None,
+    'last_error':     None
+}
+
+#----------------------------------------------------
+
+def _target_key(target):
+    """Wandelt das Ziel der Aufnahme (event.turn.target) in einen Schlüssel aus
+       FIELD_COORDS um (z.B. "20" -> "S20", "D5", "Bull" -> "25"). Modi ohne festes
+       Ziel (X01, Cricket, ...) liefern None.
+    """
+    if isinstance(target, dict):
+        # Segment Training: {'segment': 20, 'mode': 'Triple'}
+        number, mode = str(target.get('segment') or ''), str(target.get('mode') or '')
+        if number in ('25', c.TARGET_BULL):
+            return '50' if c.TARGET_DOUBLE in mode else '25'
+        prefix = 'T' if c.TARGET_TRIPLE in mode else 'D' if c.TARGET_DOUBLE in mode else 'S'
+        target = prefix + number
+
+    target = str(target) if target is not None else ''
+    if target == c.TARGET_BULL:
+        return '25'
+    if target == c.TARGET_BULLSEYE:
+        return '50'
+    if target.isdigit():
+        target = 'S' + target
+    return target if target in g.FIELD_COORDS else None
+
+#----------------------------------------------------
+
+def record_throws(live_game_data, target=None):
+    """Übernimmt die Darts der aktuellen Aufnahme aus einem Live-Update in den Puffer.
+
+        Args:
+            live_game_data (dict): Der vollständige Live-Spielzustand vom Autodarts-WebSocket.
+            target:                Das Ziel der Aufnahme aus dem GameEvent (turn.target), falls
+                                   der Spielmodus eines vorgibt (ATC, Shanghai, Segment Training, ...).
+    """
+    global _last_turn
+    if not g.USE_DATABASE:
+        return
+
+    turns   = live_game_data.get(c.KEY_TURNS) or [{}]
+    throws  = turns[0].get(c.STATE_THROWS) or []
+    players = live_game_data.get(c.KEY_PLAYERS, [])
+    index   = live_game_data.get(c.KEY_PLAYER, 0)
+
+    player_name = players[index].get(c.KEY_NAME) if index < len(players) else None
+    match_id    = live_game_data.get(c.KEY_ID)
+    set_number  = live_game_data.get(c.KEY_SET, 1)
+    leg_number  = live_game_data.get(c.KEY_LEG, 1)
+    round_nr    = live_game_data.get(c.KEY_ROUND, 1)
+    variant     = live_game_data.get(c.KEY_VARIANT)
+    target_key  = _target_key(target)
+
+    turn_key = (match_id, set_number, leg_number, round_nr, player_name)
+
+    with _lock:
+        # Aufnahme beendet: Der Greenlet soll den Puffer jetzt schreiben
+        if _last_turn is not None and turn_key != _last_turn:
+            _wake.set()
+        _last_turn = turn_key
+
+        if not player_name or player_name.lower().startswith('test'):
+            return
+
+        # Weniger Darts als zuvor: Die überzähligen wurden rückgängig gemacht oder weg-korrigiert
+        count    = len(throws)
+        previous = _counts.pop(turn_key, 0)
+        _counts[turn_key] = count
+        while len(_counts) > TURN_COUNTS_MAX:
+            _counts.popitem(last=False)
+
+        if count < previous:
+            for key in [k for k in _buffer if k[:5] == turn_key and k[5] > count]:
+                del _buffer[key]
+            _undone[turn_key] = min(count, _undone.get(turn_key, count))
+            _stats['corrections'] += 1
+
+        for dart_nr, throw in enumerate(throws, start=1):
+            segment = throw.get(c.KEY_SEGMENT) or {}
+            coords  = throw.get('coords') or {}
+            key     = turn_key + (dart_nr,)
+            _buffer.pop(key, None)
+            _buffer[key] = (match_id, set_number, leg_number, player_name, round_nr, dart_nr, variant, target_key,
+                            segment.get(c.KEY_NAME), segment.get('number'), segment.get('multiplier'),
+                            coords.get('x'), coords.get('y'))
+
+        while len(_buffer) > THROW_BUFFER_MAX:
+            _buffer.pop(next(iter(_buffer)))
+            _stats['rows_dropped'] += 1
+
+#----------------------------------------------------
+
+def flush_throws():
+    """Schreibt den Puffer mit einem Bulk-Insert in die Datenbank. Vorher werden die
+        rückgängig gemachten Darts gelöscht.
+
+        Returns:
+            int: Die Anzahl der geschriebenen Darts.
+    """
+    with _lock:
+        if not _buffer and not _undone:
+            return 0
+        pending = dict(_buffer)
+        undone  = dict(_undone)
+
+    start = time.perf_counter()
+    with get_db_connection() as conn:
+        if not conn:
+            return 0
+        cursor = conn.cursor()
+        try:
+            # Erst löschen, dann schreiben: Ein danach neu geworfener Dart darf nicht verschwinden
+            delete_undone_throws_from_history(cursor, [(match_id, set_number, leg_number, player_name, round_nr, count)
+                                                       for (match_id, set_number, leg_number, round_nr, player_name), count in undone.items()])
+            save_throws_to_history(cursor, list(pending.values()))
+            conn.commit()
+        except DB_ERRORS as e:
+            conn.rollback()
+            _stats['last_error'] = str(e)
+            logging.error("Darts konnten nicht gespeichert werden: %s", e)
+            return 0
+
+    with _lock:
+        # Nur entfernen, was in der Zwischenzeit nicht erneut (korrigiert) gepuffert wurde
+        for key, row in pending.items():
+            if _buffer.get(key) == row:
+                del _buffer[key]
+        for turn_key, count in undone.items():
+            if _undone.get(turn_key) == count:
+                del _undone[turn_key]
+
+    _stats['flushes']       += 1
+    _stats['rows_written']  += len(pending)
+    _stats['last_flush_ms']  = round((time.perf_counter() - start) * 1000, 2)
+    return len(pending)
+
+#----------------------------------------------------
+
+def _flusher_loop():
+    while True:
+        _wake.wait(timeout=g.THROW_FLUSH_INTERVAL)
+        _wake.clear()
+        try:
+            flush_throws()
+        except Exception as e:
+            _stats['last_error'] = str(e)
+            logging.error("Fehler beim Schreiben der Darts: %s", e)
+
+#----------------------------------------------------
+
+def start_throw_recorder():
+    """Startet den Hintergrund-Greenlet, der den Puffer regelmäßig schreibt."""
+    global _flusher
+    if g.USE_DATABASE and _flusher is None:
+        _flusher = gevent.spawn(_flusher_loop)
+
+
+def stop_throw_recorder():
+    """Beendet den Greenlet und schreibt den restlichen Puffer (beim Herunterfahren)."""
+    global _flusher
+    if _flusher is not None:
+        _flusher.kill()
+        _flusher = None
+        flush_throws()
+
+#----------------------------------------------------
+
+def throws_data_version():
+    """Zähler, der sich bei jedem erfolgreichen Schreiben ändert (für Caches der Auswertungen)."""
+    return _stats['flushes']
+
+#----------------------------------------------------
+
+def throw_recorder_stats():
+    """Liefert die Kennzahlen des Puffers für /api/metrics."""
+    with _lock:
+        return dict(_stats, buffered=len(_buffer), pending_deletes=len(_undone), flush_interval=g.THROW_FLUSH_INTERVAL)
+
+register_metrics_provider('throw_recorder', throw_recorder_stats)
@@ -6,39 +6,74 @@ import inspect
 import json
 import logging
 import os
-import psutil
 import pprint
 import sys
-from datetime import datetime
-from rich.logging import RichHandler
-from rich.console import Console
-from rich.theme import Theme
+import time
 
 from . import shared_state as g
+from . import constants as c
+from .log_pipeline import install_log_queue
+from .debug_log_store import STORES, debug_log_append
+from .socket_rooms import emit_to_roles, reaches_scoreboard
 
 
+# Aufrufstatistik der mit @log_function_call markierten Funktionen (nur bei DEBUG > 1)
+# "modul.funktion" -> [Aufrufe, Gesamtzeit in s, längster Aufruf in s]
+_function_profile = {}
+
 # einen "Decorator" erstellen
 # Ein Decorator ist eine Funktion, die eine andere Funktion "einhüllt", um ihr vor oder nach der Ausführung zusätzliches Verhalten hinzuzufügen.
 # Das ist perfekt, um wiederkehrenden Code wie Ihre Logging-Zeile zu vermeiden.
 def log_function_call(func):
     """
-    Ein Decorator, der den Aufruf einer Funktion loggt,
-    wenn der globale Debug-Modus aktiv ist.
+    Ein Decorator, der im Debug-Modus (DEBUG > 1) die Aufrufe einer Funktion zählt und
+    ihre Laufzeit misst (Profil-Tabelle unter /api/profile).
+
+    Die Entscheidung fällt einmalig beim Dekorieren, also beim Import des Moduls. Deshalb
+    wird die Konfiguration vor den eigenen Modulen geladen (app_backend.py, gunicorn.conf.py).
+    Ohne Debug-Modus wird die Funktion unverändert zurückgegeben und kostet nichts extra.
     """
+    if g.DEBUG <= 1:
+        return func
+
+    profile = _function_profile.setdefault(f"{func.__module__}.{func.__qualname__}", [0, 0.0, 0.0])
+
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed     = time.perf_counter() - start
+            profile[0] += 1
+            profile[1] += elapsed
+            if elapsed > profile[2]:
+                profile[2] = elapsed
 
-        # 1. Die Logging-Aktion, die vor der Funktion ausgeführt wird
-        if g.DEBUG > 1:
-            # func.__name__ ist der saubere Weg, den Namen der Funktion zu bekommen
-            log_event(f"Funktionsaufruf: {func.__name__}")
-        
-        # 2. Die ursprüngliche Funktion ausführen und ihr Ergebnis zurückgeben
-        return func(*args, **kwargs)
-        
-    # 3. Die "eingehüllte" Funktion zurückgeben
     return wrapper
-    
+
+#----------------------------------------------------
+
+def get_function_profile():
+    """Liefert die Profil-Tabelle, sortiert nach der Gesamtzeit (teuerste Funktion zuerst)."""
+    rows = [
+        {
+            'function': name,
+            'calls':    calls,
+            'total_ms': round(total * 1000, 3),
+            'avg_us':   round(total / calls * 1e6, 1) if calls else 0.0,
+            'max_ms':   round(longest * 1000, 3)
+        }
+        for name, (calls, total, longest) in list(_function_profile.items())
+    ]
+    return sorted(rows, key=lambda row: row['total_ms'], reverse=True)
+
+
+def reset_function_profile():
+    """Setzt alle Zähler der Profil-Tabelle auf 0."""
+    for profile in _function_profile.values():
+        profile[:] = [0, 0.0, 0.0]
+
 
 
 #----------------------------------------------------
@@ -46,23 +81,16 @@ def log_function_call(func):
 def log_event(title, data=None):
     """
     Fügt einen Eintrag zum Debug-Log hinzu und sendet ihn an die Debug-Webseite.
+    Die Einträge werden in Segmentdateien gespeichert (debug_log_store.py).
     """
-   
-   
-    if not hasattr(g, 'debug_log'):
-        g.debug_log = []
-
     if title == 'clear_log':
-        g.socketio.emit('clear_log', namespace='/debug')
+        STORES['debug'].mark_cleared()
+        if g.socketio:
+            g.socketio.emit('clear_log', namespace='/debug')
 
     else:
-        log_entry = {
-            "time": datetime.now().strftime("%H:%M:%S.%f")[:-3],
-            "title": title,
-            # Wende hier die rekursive Sortierung an
-            "data": get_sorted_dict(data) if data else None
-        }
-        g.debug_log.append(log_entry)
+        # Wende hier die rekursive Sortierung an
+        log_entry = debug_log_append('debug', title, get_sorted_dict(data) if data else None)
 
         # Sende das Update an alle verbundenen Debug-Clients
         if g.socketio:
@@ -75,11 +103,8 @@ def log_event_ad(title, data=None):
     Fügt einen Eintrag zum Autodarts-Debug-Log hinzu und sortiert den
     inneren 'data'-Teil für eine bessere Lesbarkeit.
     """
-    if not hasattr(g, 'ad_debug_log'):
-        g.ad_debug_log = []
-
     if title == 'clear_log':
-        g.ad_debug_log.clear()
+        STORES['debugad'].mark_cleared()
 
         if g.socketio:
             g.socketio.emit('clear_log', namespace='/debugad')
@@ -100,14 +125,8 @@ def log_event_ad(title, data=None):
     event_type = data.get('data', {}).get('event', 'state') # Holt 'start', 'finish' oder 'state'
     log_title  = f"{data.get('channel')} - {event_type}"
 
-    log_entry = {
-        "time":  datetime.now().strftime("%H:%M:%S.%f")[:-3],
-        "title": log_title,
-        "data":  processed_data # Verwende die teil-sortierten Daten
-    }
-
-    # An das korrekte Log-Array anhängen
-    g.ad_debug_log.append(log_entry)
+    # Im Stream des /debugad-Logs speichern (mit den teil-sortierten Daten)
+    log_entry = debug_log_append('debugad', log_title, processed_data)
 
     # Sende das Update an alle verbundenen Debug-Clients
     if g.socketio:
@@ -118,7 +137,7 @@ def log_event_ad(title, data=None):
 @log_function_call
 def broadcast(data):
     """
-    Sendet ein Event an alle verbundenen Frontend-Clients (Scoreboard).
+    Sendet ein Event an die Clients, deren Rolle es braucht (EVENT_ROLES in socket_rooms.py).
     Protokolliert das Event und filtert leere/ungültige Game-Events,
     um ein ungewolltes Zurücksetzen des Frontends zu verhindern.
     """
@@ -129,21 +148,22 @@ def broadcast(data):
     # --- Filter gegen leere/ungültige Events ---
     # Prüfe, ob das Event Spielerdaten enthalten sollte, aber nicht tut.
     # Ein 'match-ended' Event darf explizit leer sein, um das Frontend zurückzusetzen.
-    # {'event': 'Board Status', 'data': {'status': 'Board Started'}}
-    # {'event': 'Board Status', 'data': {'status': 'Manual reset'}}
-    # würden dazu führen, dass die Frontendanzeige zurückgesetzt wird und daher hier ausgefiltert
-    if event_name != 'match-ended' and not data.get('players'):
+    # Lobby-Events tragen nur den einen Spieler ('player') und setzen nichts zurück.
+    # Events, die nur an cmd- und Debug-Seiten gehen (EVENT_ROLES), z.B.
+    # {'event': 'Board Status', 'data': {'status': 'Board Started'}},
+    # erreichen kein Scoreboard und können es daher auch nicht zurücksetzen.
+    if (event_name not in (c.EVT_MATCH_ENDED, c.EVT_LOBBY) and reaches_scoreboard(event_name)
+            and not data.get('players')):
         if g.DEBUG > 0:
             logging.warning(f"Senden von leerem Event '{event_name}' unterdrückt, um Frontend-Reset zu verhindern.", stack_info=True)
             logging.warning(data)
-            return # Sendevorgang hier abbrechen
+        return # Sendevorgang hier abbrechen
     # --- Ende des Filters ---
 
     # Event für das Debug-Log protokollieren
     log_event(f"Event gesendet: '{event_name}'", data)
 
-    if g.socketio:
-        g.socketio.emit(event_name, data)
+    emit_to_roles(event_name, data)
         
 #----------------------------------------------------
 
@@ -182,25 +202,6 @@ def get_executable_directory():
 
 #----------------------------------------------------
 
-@log_function_call
-def check_already_running():
-    max_count = 2
-    count = 0
-    me, extension = os.path.splitext(os.path.basename(sys.argv[0]))
-    logging.info("Process is %s", me)
-    for proc in psutil.process_iter(['pid', 'name']):
-        proc_name = proc.info['name'].lower()
-        proc_name, extension = os.path.splitext(proc_name)
-
-        if proc_name == me:
-            count += 1
-
-            if count >= max_count:
-                logging.info("%s is already running. Exit", me)
-            return True
-    return False # False zurückgeben, wenn alles ok ist
-
-#----------------------------------------------------
 
 def write_json_to_file(datei, modus, data, formated=True, SeparatorLine=None):
     """
@@ -275,6 +276,11 @@ def setup_logger():
     zu gesprächige INFO-Meldungen von Drittanbieter-Bibliotheken, indem deren
     Loglevel gezielt auf WARNING gesetzt wird.
     """
+    # rich wird erst hier geladen, das spart Zeit beim Import der Module
+    from rich.logging import RichHandler
+    from rich.console import Console
+    from rich.theme import Theme
+
     # Das Format und der Handler bleiben gleich
     log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 
@@ -310,8 +316,9 @@ def setup_logger():
         console=force_console
     )
     
-    # Füge den neuen Handler zum Root Logger hinzu.
-    root_logger.addHandler(rich_handler)
+    # Der RichHandler hängt nicht direkt am Root Logger: Die Aufrufer legen die Einträge nur in eine
+    # begrenzte Warteschlange, geschrieben wird im Hintergrund (log_pipeline.py).
+    install_log_queue(root_logger, rich_handler)
 
     # Schritt 5 Bring die "gesprächigen" Bibliotheken zum Schweigen.
     # Wir holen uns ihre Logger und setzen ihr Level manuell auf ERROR.
@@ -7,16 +7,28 @@ import threading
 import logging
 import time
 from   flask import Flask, render_template, request, jsonify
-from   flask_socketio import SocketIO
+from   flask_socketio import SocketIO, join_room, leave_room
 from   flask_cors import CORS
 
 
 from . import shared_state as g
 from . import constants as c
-from .utils_backend import log_function_call, unicast
+from . import security_module
+from .utils_backend import log_function_call, unicast, get_function_profile, reset_function_profile
+from .metrics import collect_metrics
+from .command_pool import submit_command
+from .socket_rooms import join_role, leave_roles
+from .throw_analytics import get_player_analytics, HEATMAP_HANDLERS
+from .debug_log_store import STORES
 from ..autodarts.local_board_client import (
     start_board, stop_board, reset_board, calibrate_board,
-    restart_board, get_config, patch_config, get_stats, get_cams_stats, get_cams_state
+    restart_board
+)
+from ..autodarts.board_config import cached_config, patch_config_cached
+from ..autodarts.board_calibration import calibrate_all_cameras
+from ..autodarts.board_telemetry import (
+    cached_stats, cached_cams_stats, cached_cams_state, subscribe_telemetry,
+    unsubscribe_telemetry, get_telemetry_history, TELEMETRY_ROOM
 )
 from ..autodarts.autodarts_api_client import (
     fetch_and_update_board_address, correct_throw, start_match, 
@@ -116,7 +128,7 @@ def debug_state_view():
     # Gehe durch alle Attribute des 'g'-Moduls
     for key in dir(g):
         # Filtere interne Python-Attribute und Module heraus
-        if key.startswith('__') or key in ['socketio', 'logger', 'game_data_lock', 'ws_greenlet', 'server_greenlet', 'keycloak_client', 'ad_debug_log', 'debug_log', 'FIELD_COORDS', 'autodarts_raw_log', 'last_websocket_message'] or 'PASSWORD' in key.upper():
+        if key.startswith('__') or key in ['socketio', 'logger', 'game_data_lock', 'ws_greenlet', 'server_greenlet', 'keycloak_client', 'FIELD_COORDS', 'last_websocket_message'] or 'PASSWORD' in key.upper():
             continue
 
         value = getattr(g, key)
@@ -134,6 +146,13 @@ def debug_state_view():
 
         state_data[key] = formatted_value
 
+    # Die Restlaufzeit des Access-Tokens steht nicht in g, sondern wird bei jeder Abfrage berechnet
+    # (ältere security_module.py ohne get_token_expires_in() zeigen "N/A")
+    if hasattr(security_module, 'get_token_expires_in'):
+        state_data['token_access_expires_in'] = repr(security_module.get_token_expires_in())
+    else:
+        state_data['token_access_expires_in'] = repr("N/A")
+
     # Übergebe die formatierten Daten an das neue Template
     return render_template('debug_state.html', state_data=state_data)
 
@@ -150,83 +169,190 @@ def get_current_game_state():
 
 #----------------------------------------------------
 
+@app.route('/api/metrics')
+@app.route('/api/metrics/')
+@log_function_call
+def get_metrics():
+    """Gibt die Laufzeit-Kennzahlen aller Module (Cache-Treffer, Warteschlangen,
+       Latenzen, ...) als JSON zurück.
+    """
+    return jsonify(collect_metrics())
+
+#----------------------------------------------------
+
+@app.route('/api/profile')
+@app.route('/api/profile/')
+def get_profile():
+    """Gibt die Profil-Tabelle der mit @log_function_call markierten Funktionen zurück
+       (Aufrufe, Gesamt-, Durchschnitts- und Maximalzeit). Nur mit DEBUG > 1 gefüllt.
+
+       Query-Parameter:
+           reset: '1' setzt die Zähler nach der Ausgabe zurück.
+    """
+    profile = get_function_profile()
+    if request.args.get('reset') == '1':
+        reset_function_profile()
+    return jsonify({'enabled': g.DEBUG > 1, 'functions': profile})
+
+#----------------------------------------------------
+
+@app.route('/api/analytics/throws/<player_name>')
+@log_function_call
+def get_throw_analytics(player_name):
+    """Gibt Heatmap, Streuung je Ziel und Ziel/Treffer-Vergleich eines Spielers
+       aus den gespeicherten Einzeldarts als JSON zurück (gecached).
+
+       Query-Parameter:
+           variant: Nur Darts dieses Spielmodus (z.B. 'X01', 'ATC').
+           heatmap: 'polar' (Standard) oder 'cartesian'.
+           bins:    Anzahl der Radius-Bereiche (polar) bzw. Felder pro Achse (cartesian).
+    """
+    if not g.USE_DATABASE:
+        return jsonify({'error': 'Die Datenbank ist deaktiviert.'}), 404
+
+    heatmap = request.args.get('heatmap', 'polar')
+    if heatmap not in HEATMAP_HANDLERS:
+        return jsonify({'error': f"Unbekannte Heatmap '{heatmap}'. Erlaubt: {', '.join(HEATMAP_HANDLERS)}"}), 400
+
+    bins   = min(max(request.args.get('bins', 12, type=int), 1), 200)
+    result = get_player_analytics(player_name, request.args.get('variant'), heatmap, bins)
+    if result is None:
+        return jsonify({'error': 'Die Datenbank ist nicht erreichbar.'}), 503
+
+    return jsonify(result)
+
+#----------------------------------------------------
+
+@app.route('/api/board/telemetry')
+@app.route('/api/board/telemetry/')
+def get_board_telemetry():
+    """Gibt den Verlauf der Board-Telemetrie (FPS gesamt und pro Kamera, Kamerazustand)
+       aus dem Ringpuffer zurück.
+
+       Query-Parameter:
+           since: Nur Einträge nach diesem Unix-Zeitstempel.
+    """
+    return jsonify(get_telemetry_history(request.args.get('since', type=float)))
+
+#----------------------------------------------------
+
+@app.route('/api/debuglog/<stream>')
+def get_debug_log_page(stream):
+    """Gibt eine Seite gespeicherter Debug-Log-Einträge zurück, damit die Debug-Seiten
+       auch über Stunden zurückblättern können (debug_log_store.py).
+
+       Args:
+           stream (str): 'debug', 'debugad' oder 'debugadall'.
+
+       Query-Parameter:
+           before / after: Einträge vor bzw. nach dieser Nummer ('seq').
+           since / until:  Zeitbereich als Unix-Zeitstempel.
+           limit:          Anzahl der Einträge (Standard 100, höchstens 1000).
+    """
+    store = STORES.get(stream)
+    if store is None:
+        return jsonify({'error': f"Unbekanntes Debug-Log '{stream}'. Erlaubt: {', '.join(STORES)}"}), 404
+
+    return jsonify(store.read(
+        before = request.args.get('before', type=int),
+        after  = request.args.get('after',  type=int),
+        since  = request.args.get('since',  type=float),
+        until  = request.args.get('until',  type=float),
+        limit  = request.args.get('limit', 100, type=int)
+    ))
+
+#----------------------------------------------------
+
+# Dispatcher-Dictionary für die 'command'-Befehle der cmd-Seite
+COMMAND_DISPATCHER = {
+    # Befehle für local_board_client.py
+    'start_board': start_board,
+    'stop_board': stop_board,
+    'reset_board': reset_board,
+    'calibrate_board': calibrate_board,
+    'restart_board': restart_board,
+    # Alle Kameras gleichzeitig kalibrieren, Fortschritt per 'board_calibration' (board_calibration.py)
+    'calibrate_all': calibrate_all_cameras,
+    # Konfiguration aus dem Cache, Änderungen auch in den Cache (board_config.py)
+    'get_config': cached_config,
+    'patch_config': patch_config_cached,
+    # Stats und Kamera-Daten kommen aus dem Telemetrie-Cache (board_telemetry.py)
+    'get_stats': cached_stats,
+    'get_cams_state': cached_cams_state,
+    'get_cams_stats': cached_cams_stats,
+    'get_telemetry_history': get_telemetry_history,
+
+     # HGibt die Board-Adresse 1:1 aus dem globalen State zurück.
+    'get_board_address': lambda: {
+        'board_manager_address': g.boardManagerAddress if g.boardManagerAddress else 'N/A'
+    },
+
+    # Befehle für autodarts_api_client.py
+    'undo_throw': undo_throw,
+    'next_player': request_next_player,
+    'next_game': next_game,
+    'start_match': start_match,
+    'correct_throw': correct_throw
+}
+
+# Zeitlimit in Sekunden pro Befehl (command_pool.py), sonst COMMAND_TIMEOUT_DEFAULT.
+# Die Kalibrierung und der Neustart des Board Managers dauern länger als die übrigen Aufrufe.
+COMMAND_TIMEOUT_DEFAULT = 15
+COMMAND_TIMEOUTS = {
+    'calibrate_board': 30,
+    'restart_board':   30,
+    'calibrate_all':   90,
+    'get_stats':       5,
+    'get_cams_state':  5,
+    'get_cams_stats':  5
+}
+
 # --- NEUER EVENT-HANDLER FÜR BEFEHLE ---
 @socketio.on('command')
 @log_function_call
 def handle_command(data):
     """
-    Empfängt strukturierte JSON-Befehle und sendet die Antwort explizit
-    über das 'command_response'-Event zurück.
+    Empfängt strukturierte JSON-Befehle, übergibt sie an den Befehls-Pool (command_pool.py)
+    und sendet das Ergebnis nach der Ausführung über das 'command_response'-Event zurück.
+    Der Event-Handler selbst wartet nicht auf die Ausführung.
     """
     sid = request.sid
     action = data.get('action')
     params = data.get('params', {})
     callback_id = data.get('callback_id') # Die ID vom Client
 
-    command_dispatcher = {
-        # Befehle für local_board_client.py
-        'start_board': start_board,
-        'stop_board': stop_board,
-        'reset_board': reset_board,
-        'calibrate_board': calibrate_board,
-        'restart_board': restart_board,
-        'get_config': get_config,
-        'patch_config': patch_config,
-        'get_stats': get_stats,
-        'get_cams_state': get_cams_state,
-        'get_cams_stats': get_cams_stats,
-
-         # HGibt die Board-Adresse 1:1 aus dem globalen State zurück.
-        'get_board_address': lambda: {
-            'board_manager_address': g.boardManagerAddress if g.boardManagerAddress else 'N/A'
-        },
-
-        # Befehle für autodarts_api_client.py
-        'undo_throw': undo_throw,
-        'next_player': request_next_player,
-        'next_game': next_game,
-        'start_match': start_match,
-        'correct_throw': correct_throw
-    }
-
-    handler = command_dispatcher.get(action)
-    result = None
+    def respond(result):
+        if g.DEBUG > 1 and not (isinstance(result, dict) and 'error' in result):
+            logging.info("Befehl '%s' vom Frontend erfolgreich ausgeführt.", action)
+        # Sende die Antwort nur, wenn der Client eine Callback-ID mitgeschickt hat.
+        if callback_id:
+            socketio.emit('command_response', {'callback_id': callback_id, 'data': result}, room=sid)
 
+    handler = COMMAND_DISPATCHER.get(action)
     if handler:
-        try:
-            result = handler(**params) if params else handler()
-            if g.DEBUG >1:
-                logging.info("Befehl '%s' vom Frontend erfolgreich ausgeführt.", action)
-        except Exception as e:
-            logging.error("Fehler bei der Ausführung des Befehls '%s': %s", action, e)
-            result = {'error': str(e)}
+        submit_command(action, handler, params, respond, COMMAND_TIMEOUTS.get(action, COMMAND_TIMEOUT_DEFAULT))
     else:
         logging.warning("Unbekannter Befehl '%s' vom Frontend empfangen.", action)
-        result = {'error': f"Unbekannter Befehl: {action}"}
-
-    # Sende die Antwort nur, wenn der Client eine Callback-ID mitgeschickt hat.
-    if callback_id:
-        # HIER: Die Antwort wird explizit gesendet
-        socketio.emit('command_response', {'callback_id': callback_id, 'data': result}, room=sid)
-
-    # Diese Funktion hat keinen 'return'-Wert mehr.
+        respond({'error': f"Unbekannter Befehl: {action}"})
     
 #----------------------------------------------------
 
 
 @socketio.on('connect')
 @log_function_call
-def handle_connect():
+def handle_connect(auth=None):
     """Behandelt den Verbindungsaufbau eines neuen Socket.IO-Clients. Loggt die 
-       Session-ID, IP-Adresse und den User-Agent des Clients.
+       Session-ID, IP-Adresse und den User-Agent des Clients und nimmt ihn in den Raum
+       seiner Rolle auf (auth={'role': 'scoreboard' | 'cmd' | 'debug'}, socket_rooms.py).
     """
     with g.game_data_lock:
         cid        = str(request.sid)
         ip         = str(request.remote_addr)
         namespace  = str(request.namespace)
         user_agent = request.headers.get('User-Agent', 'Unbekannt')
+        room       = join_role(cid, auth)
         
-        logging.info('NEW CLIENT CONNECTED to %s: %s - IP: %s - User Agent: %s', namespace, cid, ip, user_agent)
+        logging.info('NEW CLIENT CONNECTED to %s: %s (%s) - IP: %s - User Agent: %s', namespace, cid, room, ip, user_agent)
 
 #----------------------------------------------------
 
@@ -239,11 +365,33 @@ def handle_disconnect():
     with g.game_data_lock:
         cid = str(request.sid)
 
+        unsubscribe_telemetry(cid)
+        leave_roles(cid)
+
         if g.DEBUG > 0:
            logging.info('CLIENT DISCONNECTED: %s', cid)
 
 #----------------------------------------------------
 
+@socketio.on('subscribe_telemetry')
+@log_function_call
+def handle_subscribe_telemetry():
+    """Meldet den Client für die Board-Telemetrie an. Er bekommt sofort den vollständigen
+       Stand und danach per 'board_telemetry' nur noch die geänderten Teile.
+    """
+    join_room(TELEMETRY_ROOM)
+    socketio.emit('board_telemetry', dict(subscribe_telemetry(request.sid), full=True), to=request.sid)
+
+
+@socketio.on('unsubscribe_telemetry')
+@log_function_call
+def handle_unsubscribe_telemetry():
+    """Meldet den Client von der Board-Telemetrie ab."""
+    leave_room(TELEMETRY_ROOM)
+    unsubscribe_telemetry(request.sid)
+
+#----------------------------------------------------
+
 @socketio.on('connect', namespace='/debug')
 @log_function_call
 def handle_debug_connect():
@@ -254,7 +402,7 @@ def handle_debug_connect():
     if g.DEBUG > 0:
         logging.info('Client connected to /debug namespace.')
 
-    g.socketio.emit('full_log', g.debug_log, namespace='/debug')
+    socketio.emit('full_log', STORES['debug'].recent(), namespace='/debug', to=request.sid)
 
 #----------------------------------------------------
 
@@ -268,8 +416,7 @@ def handle_debugad_connect():
     if g.DEBUG > 0:
         logging.info('Client connected to /debugad namespace.')
 
-    if g.ad_debug_log:
-        socketio.emit('full_ad_log', g.ad_debug_log, namespace='/debugad', room=request.sid)
+    socketio.emit('full_log', STORES['debugad'].recent(), namespace='/debugad', to=request.sid)
 
 #----------------------------------------------------
 
@@ -282,9 +429,8 @@ def handle_debugadall_connect():
     if g.DEBUG > 0:
         logging.info('Client connected to /debugadall namespace.')
 
-    if hasattr(g, 'autodarts_raw_log'):
-        # Sende die komplette Liste nur an diesen einen neuen Client
-        socketio.emit('full_log', g.autodarts_raw_log, namespace='/debugadall', to=request.sid)
+    # Sende die letzten Einträge nur an diesen einen neuen Client, ältere holt die Seite über /api/debuglog
+    socketio.emit('full_log', STORES['debugadall'].recent(), namespace='/debugadall', to=request.sid)
 
 #----------------------------------------------------
 
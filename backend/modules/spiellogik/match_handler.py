@@ -1,20 +1,21 @@
 # Backend/modules/spiellogik/match_handler.py
 
 import json
-import requests
 import logging
 import traceback
 from ..core import shared_state as g
 from ..core import constants as c
-from ..core import security_module
 from ..core.utils_backend import (
     log_event, log_function_call, 
     broadcast, reset_checkouts_counter, write_json_to_file, log_event_ad
 )
-from ..core.database_handler import get_db_connection, get_player_data_from_db, STAT_CONFIG
+from ..core.database_handler import get_db_connection, get_players_data_from_db, get_or_create_players, cache_players, STAT_CONFIG
+from ..core.player_stats_cache import player_stats_cache
+from ..core.session_journal import journal_state, journal_reset
 from ..core.event_structure import GameEvent, MatchInfo, TurnInfo, PlayerInfo
 from ..autodarts.local_board_client import reset_board
 from ..autodarts.autodarts_api_client import request_next_player, undo_throw
+from ..autodarts.autodarts_rest_client import autodarts_rest
 
 # ==============================================================================
 # === Kickstart-FUNKTIONEN ===
@@ -38,14 +39,8 @@ def _request_initial_game_update():
 
         # Baue die URL für den PATCH-Request zusammen
         url = f"{g.AUTODARTS_MATCHES_URL}{g.active_match_id}/throws"
-        response = requests.patch(
-            url,
-            json={},
-            headers=security_module.get_auth_header()
-        )
+        response = autodarts_rest.patch(url, 'matches.throws_patch', json={})
 
-        response.raise_for_status()
-        
         if response.status_code == 200:
 
             if g.DEBUG > 0:
@@ -69,23 +64,33 @@ def orchestrate_match_start_and_finish(match_event_data, websocket_connection):
     with g.game_data_lock:
         if match_event_data.get(c.KEY_EVENT) == 'start':
             try:
-                g.active_match_id = match_event_data.get(c.KEY_ID)
+                match_id = match_event_data.get(c.KEY_ID)
+
+                # Wurde die Sitzung dieses Matches bereits aus dem Sitzungs-Journal wiederhergestellt
+                # (Neustart) oder läuft sie noch (Wiederverbindung), bleiben player_data_map inkl.
+                # display_order und das zuletzt gesendete Event erhalten. Nur das Laden des Matches
+                # und der Spielerdaten entfällt dann.
+                resumed = match_id == g.active_match_id and bool(g.player_data_map) and bool(g.last_message_to_frontend)
+                g.active_match_id = match_id
 
                 if g.DEBUG:
-                    logging.info('Listen to match: %s', g.active_match_id)
+                    logging.info('Listen to match: %s (resumed: %s)', g.active_match_id, resumed)
                 
-                # Dieser Aufruf ist notwendig, um die Spielerliste und deren
-                # Status (Gast, registriert etc.) für die Average-Logik zu erhalten.
-                res = requests.get(g.AUTODARTS_MATCHES_URL + g.active_match_id, headers=security_module.get_auth_header())
-                match_data = res.json()
+                if not resumed:
+                    # Dieser Aufruf ist notwendig, um die Spielerliste und deren
+                    # Status (Gast, registriert etc.) für die Average-Logik zu erhalten.
+                    # Über den Antwort-Cache: Ein erneuter Start desselben Matches kostet nur ein 304.
+                    match_data = autodarts_rest.get_json_cached(g.AUTODARTS_MATCHES_URL + g.active_match_id, 'matches.get')
 
-                # Diese Funktion lädt nun die Averages, den Spielertyp und die Inidizes für alle Spieler
-                _initialize_player_data_map(match_data)
-                
-                # Setzt die Liste der verarbeiteten Legs für das neue Match zurück.
-                g.processed_leg_ids.clear()
+                    # Diese Funktion lädt nun die Averages, den Spielertyp und die Inidizes für alle Spieler
+                    _initialize_player_data_map(match_data)
 
-                reset_checkouts_counter()
+                    reset_checkouts_counter()
+
+                # g.processed_leg_ids wird hier bewusst NICHT geleert: Bei einem fortgesetzten
+                # Match (z.B. nach einem Neustart) müssen die bereits gespeicherten Legs bekannt bleiben.
+
+                journal_state(active_match_id=g.active_match_id, player_data_map=g.player_data_map, checkoutsCounter=g.checkoutsCounter)
 
                 # Abonieren der Autodarts-Bhannel für das Board und die Matches
                 paramsSubscribeTakeOut =       { "channel": c.AUTODARTS_BOARDS, c.KEY_TYPE: c.TYPE_SUBSCRIBE, "topic": g.AUTODARTS_BOARD_ID + ".events" }
@@ -93,6 +98,8 @@ def orchestrate_match_start_and_finish(match_event_data, websocket_connection):
                 paramsSubscribeMatchesEvents = { "channel": c.AUTODARTS_MATCHES, c.KEY_TYPE: c.TYPE_SUBSCRIBE, "topic": g.active_match_id + ".state" }
                 websocket_connection.send(json.dumps(paramsSubscribeMatchesEvents))
 
+                # Auch bei einer fortgesetzten Sitzung: Der Stand aus dem Journal kann veraltet sein
+                # (Darts während der Unterbrechung), der Kickstart holt den aktuellen Spielstand
                 _request_initial_game_update()
 
                 if g.DEBUG:
@@ -109,6 +116,7 @@ def orchestrate_match_start_and_finish(match_event_data, websocket_connection):
             g.active_match_id = None
             g.player_data_map = {}
             g.last_message_to_frontend = {}
+            journal_reset()
             
             # Sendet ein leeres Event, um das Frontend zurückzusetzen
             reset_event = { c.KEY_EVENT: c.EVT_MATCH_ENDED, c.KEY_PLAYERS: [] }
@@ -120,8 +128,10 @@ def orchestrate_match_start_and_finish(match_event_data, websocket_connection):
 def _initialize_player_data_map(initial_match_data):
     """
     Initialisiert den Zustand für ein neues Match. Bestimmt den Typ jedes
-    Spielers (Gast, Registriert, Owner), lädt die Averages, erstellt Indizes
-    und speichert alles im zentralen player_data_map Dictionary.
+    Spielers (Gast, Registriert, Owner), lädt die Averages und DB-IDs aller
+    Spieler (aus dem prozessweiten player_stats_cache oder mit einer gebündelten
+    Abfrage), erstellt Indizes und speichert alles im zentralen player_data_map
+    Dictionary.
     """
  
     if g.DEBUG > 0:
@@ -134,60 +144,93 @@ def _initialize_player_data_map(initial_match_data):
     variant = initial_match_data.get(c.KEY_SETTINGS, {}).get(c.KEY_GAME_MODE, initial_match_data.get(c.KEY_VARIANT, '')).lower()
 
     game_mode_simple = MODE_MAP.get(variant, 'x01')
-    
-    with get_db_connection() as conn:
-        cursor = conn.cursor(dictionary=True) if conn else None
-        
-        for p_data in initial_match_data.get(c.KEY_PLAYERS, []):
-            player_name = p_data.get(c.KEY_NAME, '')
 
-            if not player_name: continue
+    # Gast-Spieler werden nur für Spielmodi angelegt, für die am Leg-Ende auch
+    # Statistiken gespeichert werden (z.B. nicht für Bull-off, Bermuda, ...).
+    create_guests = variant == 'x01' or variant in MODE_MAP
+
+    players_list = [p for p in initial_match_data.get(c.KEY_PLAYERS, []) if p.get(c.KEY_NAME)]
+    player_names = [p.get(c.KEY_NAME) for p in players_list]
+    db_names     = [name for name in player_names if not name.lower().startswith('test')]
+
+    # Hole den Spaltennamen und den Cache-Schlüssel aus der zentralen Konfiguration
+    stat_column        = STAT_CONFIG[game_mode_simple]['column']
+    stat_key_to_update = STAT_CONFIG[game_mode_simple]['cache_key']
+
+    # Bekannte Spieler kommen aus dem prozessweiten Cache, nur Fehltreffer gehen an die DB
+    players_db_info = {}
+    missing_names   = []
+    for name in db_names:
+        cached = player_stats_cache.get(game_mode_simple, name)
+        if cached and cached.get('db_id') is not None:
+            players_db_info[name.lower()] = {'id': cached['db_id'], 'is_registered': cached['is_registered'], stat_column: cached['stat']}
+        else:
+            missing_names.append(name)
+
+    # Alle übrigen Spieler werden mit EINER Abfrage geladen, fehlende Gäste mit EINEM INSERT angelegt
+    if missing_names:
+        with get_db_connection() as conn:
+            if conn:
+                cursor = conn.cursor(dictionary=True)
+                try:
+                    if create_guests:
+                        created = get_or_create_players(cursor, missing_names, game_mode_simple)
+                        conn.commit()
+                        # Neue Gäste erst nach dem Commit cachen, ihre IDs gibt es vorher nicht sicher
+                        cache_players(game_mode_simple, created)
+                        players_db_info.update(created)
+                    else:
+                        players_db_info.update(get_players_data_from_db(cursor, missing_names, game_mode_simple))
+                except Exception as e:
+                    logging.error("Fehler beim Laden der Spielerdaten: %s", e)
+                    conn.rollback()
+
+    for p_data in players_list:
+        player_name = p_data.get(c.KEY_NAME, '')
 
-            # Ermittle Spielertyp
-            player_type = c.PLAYER_TYPE_GUEST
+        # Ermittle Spielertyp
+        player_type = c.PLAYER_TYPE_GUEST
 
-            # Ein Spieler ist der Owner, wenn seine User-ID mit der Host-ID übereinstimmt
-            if p_data.get('userId') and p_data.get('userId') == p_data.get('hostId'):
-                player_type = c.PLAYER_TYPE_OWNER
+        # Ein Spieler ist der Owner, wenn seine User-ID mit der Host-ID übereinstimmt
+        if p_data.get('userId') and p_data.get('userId') == p_data.get('hostId'):
+            player_type = c.PLAYER_TYPE_OWNER
 
-            # Ein Spieler ist registriert, wenn er ein 'user'-Objekt hat, aber nicht der Owner ist
-            elif p_data.get(c.KEY_USER) is not None:
-                player_type = c.PLAYER_TYPE_REGISTERED
-            
-            # 1. Initialisiere alle Statistik-Felder mit 0.0
-            player_stats = {
-                c.KEY_OA_AVERAGE: 0.0, c.KEY_OA_MPR: 0.0,
-                c.KEY_OA_HIT_RATE: 0.0, c.KEY_OA_PPR: 0.0
-            }
-            stat_value = 0.0
-
-
-            # 2. Lade den EINEN relevanten Wert aus der DB oder vom Server
-            if player_type in [c.PLAYER_TYPE_OWNER, c.PLAYER_TYPE_REGISTERED] and game_mode_simple == 'x01':
-                stat_value = float(p_data.get(c.KEY_USER, {}).get(c.KEY_AVERAGE, 0.0))
-            elif conn:
-                player_db_info = get_player_data_from_db(cursor, player_name, game_mode=game_mode_simple)
-                # Hole den Spaltennamen aus der zentralen Konfiguration
-                stat_column = STAT_CONFIG[game_mode_simple]['column']
-                if player_db_info and player_db_info.get(stat_column) is not None:
-                    stat_value = player_db_info.get(stat_column)
-
-            # 3. Finde den korrekten Cache-Schlüssel und setze den Wert im player_stats Dictionary
-            stat_key_to_update = STAT_CONFIG[game_mode_simple]['cache_key']
-            player_stats[stat_key_to_update] = stat_value
-            
-            # 4. Baue den finalen Eintrag zusammen
-            # Erstelle zuerst das Basis-Dictionary
-            player_entry = {
-                c.KEY_TYPE:           player_type,
-                'stable_index':       p_data.get('index'),
-                'display_order':      None
-            }
-            # Füge dann das (jetzt korrekte) player_stats-Dictionary hinzu
-            player_entry.update(player_stats)
-            
-            # Weise das fertige, kombinierte Dictionary der Map zu
-            g.player_data_map[player_name.lower()] = player_entry
+        # Ein Spieler ist registriert, wenn er ein 'user'-Objekt hat, aber nicht der Owner ist
+        elif p_data.get(c.KEY_USER) is not None:
+            player_type = c.PLAYER_TYPE_REGISTERED
+        
+        # 1. Initialisiere alle Statistik-Felder mit 0.0
+        player_stats = {
+            c.KEY_OA_AVERAGE: 0.0, c.KEY_OA_MPR: 0.0,
+            c.KEY_OA_HIT_RATE: 0.0, c.KEY_OA_PPR: 0.0
+        }
+        stat_value = 0.0
+        player_db_info = players_db_info.get(player_name.lower())
+
+        # 2. Übernimm den EINEN relevanten Wert aus der DB oder vom Server
+        if player_type in [c.PLAYER_TYPE_OWNER, c.PLAYER_TYPE_REGISTERED] and game_mode_simple == 'x01':
+            stat_value = float(p_data.get(c.KEY_USER, {}).get(c.KEY_AVERAGE, 0.0))
+        elif player_db_info and player_db_info.get(stat_column) is not None:
+            stat_value = player_db_info.get(stat_column)
+
+        # 3. Setze den Wert unter dem korrekten Cache-Schlüssel im player_stats Dictionary
+        player_stats[stat_key_to_update] = stat_value
+        
+        # 4. Baue den finalen Eintrag zusammen
+        # Erstelle zuerst das Basis-Dictionary
+        player_entry = {
+            c.KEY_TYPE:           player_type,
+            'stable_index':       p_data.get('index'),
+            'display_order':      None,
+            # Die DB-ID wird gecached, damit der Leg-Ende-Pfad den Spieler nicht erneut per Name sucht
+            c.KEY_DB_ID:          player_db_info.get('id') if player_db_info else None,
+            c.KEY_DB_MODE:        game_mode_simple if player_db_info else None
+        }
+        # Füge dann das (jetzt korrekte) player_stats-Dictionary hinzu
+        player_entry.update(player_stats)
+        
+        # Weise das fertige, kombinierte Dictionary der Map zu
+        g.player_data_map[player_name.lower()] = player_entry
 
 #----------------------------------------------------
 
@@ -2,10 +2,33 @@
 
 from ..core.utils_backend import log_function_call
 from ..core.event_structure import MatchInfo
+from ..core.board_geometry import segment_at, distance_to_bull
 from .match_handler import create_universal_game_event
 from ..core import constants as c
 from ..core import shared_state as g
 
+def _bull_off_ranking(live_game_data):
+    """Ordnet die Bull-off-Darts nach ihrem Abstand zur Boardmitte (kleinster zuerst).
+
+    Returns:
+        list: [{'player', 'segment', 'distance_mm'}, ...] für alle Spieler mit Koordinaten.
+    """
+    players    = live_game_data.get(c.KEY_PLAYERS, [])
+    stats_list = live_game_data.get(c.KEY_STATS, [])
+    ranking    = []
+
+    for player, stats in zip(players, stats_list):
+        coords = stats.get(c.KEY_LEG_STATS, {}).get('coords') or {}
+        if coords.get('x') is None or coords.get('y') is None:
+            continue
+        ranking.append({
+            c.KEY_PLAYER:  player.get(c.KEY_NAME, ''),
+            'segment':     segment_at(coords['x'], coords['y']),
+            'distance_mm': round(distance_to_bull(coords['x'], coords['y'], mm=True), 1)
+        })
+
+    return sorted(ranking, key=lambda entry: entry['distance_mm'])
+
 @log_function_call
 def process_match_bull_off(live_game_data):
     """Verarbeitet ein Live-Update für die 'Bull-off'-Phase.
@@ -16,7 +39,8 @@ def process_match_bull_off(live_game_data):
     2. Formatiert den Punktestand der Spieler (zeigt '-' statt 0 an).
     3. Implementiert die spezielle Logik zur Zustandsermittlung, die prüft, ob
        alle Spieler geworfen haben, um dann einen Sieger oder ein Unentschieden
-       festzustellen.
+       festzustellen. Zusätzlich wird der Abstand jedes Darts zur Boardmitte
+       ermittelt (winner_info['distances']).
 
     Args:
         live_game_data (dict): Der vollständige Live-Spielzustand vom
@@ -55,12 +79,13 @@ def process_match_bull_off(live_game_data):
             g.player_data_map[player_name][c.KEY_DISPLAY_ORDER] = None
 
         winner_index = live_game_data.get(c.KEY_GAME_WINNER, -1)
+        distances    = _bull_off_ranking(live_game_data)
 
         if winner_index != -1:
             # Es gibt einen Gewinner
             event.game_state = c.STATE_LEG_WON
             winner_name = live_game_data.get(c.KEY_PLAYERS, [])[winner_index].get('name', '')
-            event.winner_info = {c.KEY_PLAYER: winner_name, 'type': 'Bull-off'}
+            event.winner_info = {c.KEY_PLAYER: winner_name, 'type': 'Bull-off', 'distances': distances}
 
             # Setze den aktiven Spieler-Index auf den Gewinner für die Anzeige
             event.current_player_index = winner_index
@@ -71,6 +96,7 @@ def process_match_bull_off(live_game_data):
         else:
             # Es ist ein Unentschieden
             event.game_state = "bull_off_tie"
+            event.winner_info = {'type': 'Bull-off', 'distances': distances}
             g.bull_off_winner = None # Sicherstellen, dass bei Unentschieden zurückgesetzt wird
 
     return event.to_dict()
\ No newline at end of file
@@ -6,7 +6,10 @@ from ..core import shared_state as g
 from ..core import constants as c
 from ..core.event_structure import MatchInfo
 from .match_handler import create_universal_game_event
-from ..core.database_handler import get_db_connection, get_player_data_from_db, create_guest_player, save_leg_to_history, calculate_and_update_guest_average
+from ..core.database_handler import get_db_connection, resolve_player_db_ids, save_leg_to_history, calculate_and_update_guest_average, cache_player_stat
+from ..core.player_stats_cache import player_stats_cache
+from ..core.leg_spool import spool_leg
+from ..core.processed_legs import leg_id_of
 
 @log_function_call
 def process_match_countup(live_game_data):
@@ -56,11 +59,18 @@ def update_countup_statistic_after_leg(event_data):
         logging.info(f"PPR-VERARBEITUNG FÜR {game_mode.upper()} LEG {event_data.get(c.KEY_LEG)} GESTARTET")
 
     with get_db_connection() as conn:
-        if not conn: return
+        if not conn:
+            # Datenbank nicht erreichbar: Leg für den späteren Replay sichern statt es zu verwerfen
+            spool_leg(event_data)
+            return False
         cursor = conn.cursor(dictionary=True)
         try:
             match_id = event_data.get(c.KEY_ID)
             current_leg = event_data.get(c.KEY_LEG)
+            current_set = event_data.get(c.KEY_SET, 1)
+            # Die DB-IDs kommen aus dem beim Matchstart befüllten Cache (g.player_data_map)
+            player_db_ids = resolve_player_db_ids(cursor, event_data.get(c.KEY_PLAYERS, []), game_mode=game_mode)
+
             for i, player in enumerate(event_data.get(c.KEY_PLAYERS, [])):
                 player_name = player.get(c.KEY_NAME)
                 player_name_lower = player_name.lower()
@@ -70,23 +80,25 @@ def update_countup_statistic_after_leg(event_data):
                 stats_block = event_data.get(c.KEY_STATS, [])[i]
                 leg_stats = stats_block.get(c.KEY_LEG_STATS, {})
                 
-                player_info = get_player_data_from_db(cursor, player_name, game_mode=game_mode)
-                if not player_info:
-                    player_db_id = create_guest_player(cursor, player_name, game_mode=game_mode)
-                    conn.commit()
-                    if player_db_id is None: continue
-                    player_info = {'id': player_db_id}
-
-                player_db_id = player_info.get('id')
+                player_db_id = player_db_ids.get(player_name_lower)
+                if player_db_id is None: continue
 
                 if leg_stats.get('dartsThrown', 0) > 0:
-                    save_leg_to_history(cursor, player_db_id, match_id, current_leg, leg_stats, game_mode=game_mode)
+                    save_leg_to_history(cursor, player_db_id, match_id, current_set, current_leg, leg_stats, game_mode=game_mode)
 
                 new_ppr = calculate_and_update_guest_average(cursor, player_db_id, game_mode=game_mode)
 
-                if player_name_lower in g.player_data_map:
-                    g.player_data_map[player_name_lower][c.KEY_OA_PPR] = new_ppr
+                cache_player_stat(player_name, game_mode, new_ppr)
             conn.commit()
+
+            # Nach erfolgreichem Speichern wird die Leg-ID hinzugefügt.
+            g.processed_leg_ids.add(leg_id_of(event_data))
+            return True
         except Exception as e:
             logging.error(f"Fehler bei PPR-Verarbeitung: {e}")
-            conn.rollback()
\ No newline at end of file
+            conn.rollback()
+            # Bereits per write-through geschriebene Werte sind nach dem Rollback nicht mehr gültig
+            player_stats_cache.invalidate(game_mode)
+            # Das Leg für einen erneuten Versuch sichern (Leg-Spool), statt es zu verwerfen
+            spool_leg(event_data, error=e)
+            return False
\ No newline at end of file
@@ -7,9 +7,12 @@ from ..core.utils_backend import log_function_call
 from ..core.event_structure import MatchInfo
 from .match_handler import create_universal_game_event
 from ..core.database_handler import (
-    get_db_connection, get_player_data_from_db, create_guest_player,
-    save_leg_to_history, calculate_and_update_guest_average
+    get_db_connection, resolve_player_db_ids,
+    save_leg_to_history, calculate_and_update_guest_average, cache_player_stat
 )
+from ..core.player_stats_cache import player_stats_cache
+from ..core.leg_spool import spool_leg
+from ..core.processed_legs import leg_id_of
 
 @log_function_call
 def process_match_cricket(live_game_data):
@@ -107,13 +110,20 @@ def update_cricket_tactics_statistic_after_leg(event_data):
         logging.info(f"MPR-VERARBEITUNG FÜR {game_mode.upper()} LEG {event_data.get(c.KEY_LEG)} GESTARTET")
 
     with get_db_connection() as conn:
-        if not conn: return
+        if not conn:
+            # Datenbank nicht erreichbar: Leg für den späteren Replay sichern statt es zu verwerfen
+            spool_leg(event_data)
+            return False
         cursor = conn.cursor(dictionary=True)
         try:
             match_id = event_data.get(c.KEY_ID)
             current_leg = event_data.get(c.KEY_LEG)
+            current_set = event_data.get(c.KEY_SET, 1)
             segments_data = event_data.get(c.KEY_STATE, {}).get('segments', {})
 
+            # Die DB-IDs kommen aus dem beim Matchstart befüllten Cache (g.player_data_map)
+            player_db_ids = resolve_player_db_ids(cursor, event_data.get(c.KEY_PLAYERS, []), game_mode=game_mode_str)
+
             for i, player in enumerate(event_data.get(c.KEY_PLAYERS, [])):
                 player_name = player.get(c.KEY_NAME)
                 # KORREKTUR: Variable für kleingeschriebenen Namen erstellen
@@ -131,34 +141,32 @@ def update_cricket_tactics_statistic_after_leg(event_data):
                     if i < len(hits_list):
                         total_marks += hits_list[i]
                 
-                # Hole oder erstelle den Spieler in der richtigen Tabelle
-                # KORREKTUR: 'table_prefix' zu 'game_mode' und korrekte Variable übergeben
-                player_info = get_player_data_from_db(cursor, player_name, game_mode=game_mode_str)
-                if not player_info:
-                    # KORREKTUR: 'table_prefix' zu 'game_mode' und korrekte Variable übergeben
-                    player_db_id = create_guest_player(cursor, player_name, game_mode=game_mode_str)
-                    conn.commit()
-                    if player_db_id is None: continue
-                    player_info = {'id': player_db_id}
-
-                player_db_id = player_info.get('id')
+                player_db_id = player_db_ids.get(player_name_lower)
+                if player_db_id is None: continue
 
                 # Schritt 3: Speichere Leg in der History
                 leg_stats = {'marks': total_marks, 'darts': leg_darts}
                 if leg_darts > 0:
                     # KORREKTUR: 'table_prefix' zu 'game_mode' und korrekte Variable übergeben
-                    save_leg_to_history(cursor, player_db_id, match_id, current_leg, leg_stats, game_mode=game_mode_str)
+                    save_leg_to_history(cursor, player_db_id, match_id, current_set, current_leg, leg_stats, game_mode=game_mode_str)
 
                 # Schritt 4 & 5: Berechne und speichere neuen Gesamt-MPR
                 # KORREKTUR: korrekte Variable übergeben
                 new_mpr = calculate_and_update_guest_average(cursor, player_db_id, game_mode=game_mode_str)
                 
                 # NEU: Aktualisiere das korrekte Feld im Cache
-                if player_name_lower in g.player_data_map:
-                    # KORREKTUR: c.KEY_OA_MPR aus constants verwenden
-                    g.player_data_map[player_name_lower][c.KEY_OA_MPR] = new_mpr
+                cache_player_stat(player_name, game_mode_str, new_mpr)
 
             conn.commit()
+
+            # Nach erfolgreichem Speichern wird die Leg-ID hinzugefügt.
+            g.processed_leg_ids.add(leg_id_of(event_data))
+            return True
         except Exception as e:
             logging.error(f"Ein schwerwiegender Fehler ist bei der MPR-Verarbeitung aufgetreten: {e}")
-            conn.rollback()
\ No newline at end of file
+            conn.rollback()
+            # Bereits per write-through geschriebene Werte sind nach dem Rollback nicht mehr gültig
+            player_stats_cache.invalidate(game_mode_str)
+            # Das Leg für einen erneuten Versuch sichern (Leg-Spool), statt es zu verwerfen
+            spool_leg(event_data, error=e)
+            return False
\ No newline at end of file
@@ -7,10 +7,13 @@ from ..core import constants as c
 from .match_handler import create_universal_game_event
 
 from ..core.database_handler import (
-    get_db_connection, get_player_data_from_db, create_guest_player,
+    get_db_connection, resolve_player_db_ids,
     save_leg_to_history, update_and_register_player, 
-    calculate_and_update_guest_average
+    calculate_and_update_guest_average, cache_player_stat
 )
+from ..core.player_stats_cache import player_stats_cache
+from ..core.leg_spool import spool_leg
+from ..core.processed_legs import leg_id_of
 
 @log_function_call
 def process_match_x01(live_game_data):
@@ -47,61 +50,47 @@ def process_match_x01(live_game_data):
 @log_function_call
 def update_x01_statistic_after_leg(event_data):
     """
-    Bündelt die gesamte Logik zur Average-Verarbeitung am Ende eines Legs
-    und verhindert doppeltes Speichern für dasselbe Leg.
+    Bündelt die gesamte Logik zur Average-Verarbeitung am Ende eines Legs.
+    Doppeltes Speichern desselben Legs verhindert die Datenbank (INSERT IGNORE
+    auf player_id, match_id, set_number, leg_number), g.processed_leg_ids ist nur der
+    schnelle Vorfilter in _handle_matches_channel.
     """
 
-    match_id = event_data.get(c.KEY_ID)
-    current_leg = event_data.get(c.KEY_LEG)
-
-    # --- Mechanismus zur Verhinderung doppelter Speicherung ---
-    # Der Autodasrts_Server sendet Beim Matchende sofort nach dem Gewinn des Finalen Legs ein Event, das alle Daten (inkl. des Matchgewinners) enthält.
-    # Nach dem Klick auf den Finish-Button sendet er ein - bis auf den Zeitstempel - absolut identisches Event.
-    # Ohne sich (in g.processed_leg_ids) zu merkjen, für welches Leg dieses Matches bereits Daten in die Datenbank geschrieben wurden, würden
-    # die Daten des letzten Legs 2maö egspeichert. Einmalö zum Leg-Ende und einmal nach dem Klick auf Finish.
-    leg_id = f"{match_id}-{current_leg}"
-    if leg_id in g.processed_leg_ids:
-        if g.DEBUG > 0:
-            logging.info(f"Leg {leg_id} wurde bereits verarbeitet. Überspringe doppeltes Speichern.")
-        return
-    # --- Ende des Mechanismus ---
-
     if g.DEBUG:
         logging.info("AVERAGE-VERARBEITUNG FÜR LEG %s GESTARTET", event_data.get(c.KEY_LEG))
 
     with get_db_connection() as conn:
         if not conn:
-            return
+            # Datenbank nicht erreichbar: Leg für den späteren Replay sichern statt es zu verwerfen
+            spool_leg(event_data)
+            return False
 
         cursor = conn.cursor(dictionary=True)
 
         try:
             match_id = event_data.get(c.KEY_ID)
             current_leg = event_data.get(c.KEY_LEG)
+            current_set = event_data.get(c.KEY_SET, 1)
             board_owner_name = event_data.get('host', {}).get(c.KEY_NAME)
 
             if not all([match_id, current_leg, board_owner_name]):
                 logging.info("FEHLER: Notwendige Daten (match_id, leg, host) im Event nicht gefunden.")
                 return
 
+            # Die DB-IDs kommen aus dem beim Matchstart befüllten Cache (g.player_data_map)
+            player_db_ids = resolve_player_db_ids(cursor, event_data.get(c.KEY_PLAYERS, []), game_mode='x01')
+
             for i, player in enumerate(event_data.get(c.KEY_PLAYERS, [])):
                 player_name = player.get(c.KEY_NAME)
-                player_name_lower = player_name.lower()
 
                 if not player_name or player_name.lower().startswith('test'):
                     continue
 
+                player_name_lower = player_name.lower()
                 stats_block = event_data.get(c.KEY_STATS, [])[i] if i < len(event_data.get(c.KEY_STATS, [])) else {}
-                player_info = get_player_data_from_db(cursor, player_name, game_mode='x01')
-
-
-                if not player_info:
-                    player_db_id = create_guest_player(cursor, player_name, game_mode='x01')
-                    conn.commit()
-                    if player_db_id is None: continue
-                    player_info = {'id': player_db_id}
 
-                player_db_id = player_info.get('id')
+                player_db_id = player_db_ids.get(player_name_lower)
+                if player_db_id is None: continue
 
                 # Unterscheide zwischen Gast und registriertem Spieler
                 is_registered_user = player.get(c.KEY_USER) is not None
@@ -109,7 +98,7 @@ def update_x01_statistic_after_leg(event_data):
                 leg_stats = stats_block.get(c.KEY_LEG_STATS, {})
                 # Stelle sicher, dass das Leg Statistiken hat, bevor du speicherst
                 if leg_stats and leg_stats.get('dartsThrown', 0) > 0:
-                    save_leg_to_history(cursor, player_db_id, match_id, current_leg, leg_stats, game_mode='x01')
+                    save_leg_to_history(cursor, player_db_id, match_id, current_set, current_leg, leg_stats, game_mode='x01')
 
                 if is_registered_user:
                     # Der Spieler ist registriert oder der Board-Owner
@@ -122,7 +111,7 @@ def update_x01_statistic_after_leg(event_data):
                     update_and_register_player(cursor, player_db_id, server_overall_avg, game_mode='x01')
 
                     # Aktualisiere den Cache
-                    g.player_data_map[player_name_lower][c.KEY_OA_AVERAGE] = float(server_overall_avg)
+                    cache_player_stat(player_name, 'x01', float(server_overall_avg))
 
                     if g.DEBUG:
                         logging.info("Gesamt-Avg: %.2f (vom Server übernommen und DB-Flag gesetzt)", float(server_overall_avg))
@@ -130,7 +119,7 @@ def update_x01_statistic_after_leg(event_data):
                 else:
                     # Der Spieler ist ein Gast
                     calculated_avg = calculate_and_update_guest_average(cursor, player_db_id, game_mode='x01')
-                    g.player_data_map[player_name_lower][c.KEY_OA_AVERAGE] = calculated_avg
+                    cache_player_stat(player_name, 'x01', calculated_avg)
 
                     if g.DEBUG:
                         logging.info("Gesamt-Avg: %.2f (aus Historie berechnet und gecached)", float(calculated_avg))
@@ -141,11 +130,17 @@ def update_x01_statistic_after_leg(event_data):
             conn.commit()
 
             # Nach erfolgreichem Speichern wird die Leg-ID hinzugefügt.
-            g.processed_leg_ids.add(leg_id)
+            g.processed_leg_ids.add(leg_id_of(event_data))
             
             if g.DEBUG:
                 logging.info("\n== AVERAGE-VERARBEITUNG ERFOLGREICH BEENDET ==")
+            return True
 
         except Exception as e:
             logging.info(f"Ein schwerwiegender Fehler ist bei der Average-Verarbeitung aufgetreten: {e}")
             conn.rollback()
+            # Bereits per write-through geschriebene Werte sind nach dem Rollback nicht mehr gültig
+            player_stats_cache.invalidate('x01')
+            # Das Leg für einen erneuten Versuch sichern (Leg-Spool), statt es zu verwerfen
+            spool_leg(event_data, error=e)
+            return False
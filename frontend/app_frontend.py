@@ -28,6 +28,7 @@ import logging
 
 # Importiere das neue shared_state Modul
 import modules.core.shared_state_frontend as g
+from modules.core.client_queues import open_client, close_client, send_to, send_to_all, client_queue_stats
 
 # --- Setup (Warnings, Logging, Custom Classes) ---
 urllib3.disable_warnings(InsecureRequestWarning)
@@ -116,7 +117,7 @@ def connect():
         g.is_backend_connected = True
         
         # 2. Sende das "backend_connected" Event mit den Modi an den Browser
-        g.socketio_server.emit('backend_connected', {'modes': game_modes})
+        send_to_all('backend_connected', {'modes': game_modes})
 
         # 3. Logge das Banner in der Konsole
         is_gunicorn = "gunicorn" in sys.argv[0]
@@ -139,11 +140,11 @@ def connect():
 
         if g.DataFromBackend:
             logging.info("✅ Aktueller Spielzustand vom Backend synchronisiert.")
-            g.socketio_server.emit('status_update', g.DataFromBackend)
+            send_to_all('status_update', g.DataFromBackend)
 
     except requests.exceptions.RequestException as e:
         logging.error(f"FEHLER bei der Initialisierung nach Verbindung: {e}")
-        g.socketio_server.emit('backend_disconnected')
+        send_to_all('backend_disconnected')
 
 
 #---------------------------------
@@ -157,7 +158,7 @@ def disconnect():
     g.is_backend_connected = False
 
     # Sende ein Event an alle verbundenen Browser-Clients
-    g.socketio_server.emit('backend_disconnected')
+    send_to_all('backend_disconnected')
 
 #---------------------------------
 
@@ -170,7 +171,8 @@ def on_backend_events(data):
         logging.info(f"DEBUG: Event vom Backend empfangen: {data}")
     with game_lock:
         g.DataFromBackend = data.copy()
-    g.socketio_server.emit('status_update', data)
+    # Über die Warteschlangen pro Browser: ein langsamer Browser bekommt nur den neuesten Stand
+    send_to_all('status_update', data)
 
 #---------------------------------
 # --- Routen und Event-Handler für Browser-Clients ---
@@ -200,6 +202,13 @@ def status():
 
 #---------------------------------
 
+@app.route('/metrics')
+def metrics():
+    """Warteschlangen-Tiefe und Sende-Kennzahlen pro verbundenem Browser (client_queues.py)."""
+    return jsonify({'clients': client_queue_stats()})
+
+#---------------------------------
+
 @app.route('/static/images:*')
 @app.route('/static/videos:*')
 def static_files(filename):
@@ -211,11 +220,13 @@ def static_files(filename):
 #---------------------------------
 
 @socketio_server.on('connect')
-def handle_browser_connect():
-    """Sendet den initialen Spielstatus an einen neuen Browser."""
+def handle_browser_connect(auth=None):
+    """Sendet den initialen Spielstatus an einen neuen Browser. Bestätigt der Browser
+       Events (auth={'acks': true}), wartet seine Warteschlange jeweils auf das Ack."""
     ip_address = request.headers.get('X-Forwarded-For', request.remote_addr)
     user_agent = request.headers.get('User-Agent', 'Unbekannt')
     logging.info(f'✅ NEW CLIENT CONNECTED: IP: {ip_address} - User Agent: {user_agent}')
+    open_client(request.sid, auth)
 
     # --- ANPASSUNG START ---
     # Prüfe, ob das Frontend bereits mit dem Backend verbunden ist.
@@ -224,12 +235,19 @@ def handle_browser_connect():
         if g.DEBUG:
             logging.info("Backend ist bereits verbunden. Sende 'backend_connected' an neuen Client.")
         # 'to=request.sid' stellt sicher, dass nur der neue Client die Nachricht bekommt.
-        g.socketio_server.emit('backend_connected', {'modes': g.SUPPORTED_GAME_VARIANTS}, to=request.sid)
+        send_to(request.sid, 'backend_connected', {'modes': g.SUPPORTED_GAME_VARIANTS})
     # --- ANPASSUNG ENDE ---
 
     with game_lock:
         data_copy = g.DataFromBackend.copy()
-    g.socketio_server.emit('status_update', data_copy, to=request.sid)
+    send_to(request.sid, 'status_update', data_copy)
+
+#---------------------------------
+
+@socketio_server.on('disconnect')
+def handle_browser_disconnect():
+    """Entfernt die Sende-Warteschlange des getrennten Browsers."""
+    close_client(request.sid)
 
 ######################################################
 # --- Block für den direkten Start (ohne Gunicorn) ---
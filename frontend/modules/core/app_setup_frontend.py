@@ -14,6 +14,7 @@ from config_frontend import DEBUG, SERVER_ADDRESS
 
 # Importiere das neue shared_state Modul
 from . import shared_state_frontend as g
+from .client_queues import send_to_all
 
 #---------------------------------
 
@@ -27,7 +28,8 @@ def start_darts_client():
     connect_options = {
         'transports': ['websocket'],
         'socketio_path': '/api/socket.io/',
-        'headers': {'User-Agent': 'Himues-Autodarts-Scoreboard'}
+        'headers': {'User-Agent': 'Himues-Autodarts-Scoreboard'},
+        'auth': {'role': 'scoreboard'} # Das Backend schickt nur Events für Scoreboards (socket_rooms.py)
     }
 
     while True:
@@ -47,7 +49,7 @@ def start_darts_client():
             g.SUPPORTED_GAME_VARIANTS.extend(game_modes)
             
             # Sende das neue Event mit den Spielmodi an alle Browser
-            g.socketio_server.emit('backend_connected', {'modes': game_modes})
+            send_to_all('backend_connected', {'modes': game_modes})
 
             # Jetzt wird das Banner mit den korrekten Daten ausgegeben
             is_gunicorn = "gunicorn" in sys.argv[0]
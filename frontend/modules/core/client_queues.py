@@ -0,0 +1,160 @@
+# Frontend/modules/core/client_queues.py
+
+# Eigene Sende-Warteschlange pro Browser.
+#
+# Bisher ging jedes Update per socketio_server.emit() sofort an alle Browser. Ein Smart-TV im
+# schwachen WLAN bekam so einen immer längeren Rückstand, zeigte dann veraltete Darts im
+# Schnelldurchlauf, und der Puffer für ihn wuchs auf dem Server. Jetzt:
+#   - Pro Browser eine Warteschlange mit höchstens CLIENT_QUEUE_SIZE Einträgen und ein Greenlet,
+#     das sendet. Das nächste Event geht erst raus, wenn der Browser das vorige bestätigt hat
+#     (Socket.IO-Ack) oder ACK_TIMEOUT abgelaufen ist.
+#   - Zustands-Events (status_update mit Spielstand, backend_connected/-disconnected) ersetzen
+#     ein noch nicht gesendetes älteres Event derselben Art ("latest wins").
+#   - Wichtige Events (Match-Start und -Ende) werden weder ersetzt noch verworfen.
+#   - Ist die Warteschlange voll, fällt das älteste Zustands-Event heraus.
+# Ob ein Browser bestätigt, meldet er selbst beim Verbindungsaufbau (auth={'acks': true},
+# scoreboard.js). Browser mit einer älteren Seite ohne diese Angabe werden ohne Warten bedient.
+# Ein verspätetes Ack schaltet nichts um, es zählt nur als ack_timeout. Die Kennzahlen pro
+# Browser stehen unter /metrics.
+
+import collections
+import logging
+import time
+
+import gevent
+from gevent.event import Event
+
+from . import shared_state_frontend as g
+
+CLIENT_QUEUE_SIZE = 16   # Einträge pro Browser
+ACK_TIMEOUT       = 5    # Sekunden, die auf die Bestätigung eines Events gewartet wird
+
+# Spielstände, die nie ersetzt oder verworfen werden dürfen (data['event'] von status_update)
+CRITICAL_GAME_EVENTS = frozenset({'match-started', 'match-ended'})
+
+# Dispatcher-Dictionary: Socket.IO-Event -> Schlüssel, unter dem neuere Events ältere ersetzen
+SNAPSHOT_KEYS = {
+    'status_update':        'status',
+    'backend_connected':    'connection',
+    'backend_disconnected': 'connection'
+}
+
+_clients = {}   # sid -> ClientQueue
+
+#----------------------------------------------------
+
+def _snapshot_key(event_name, data):
+    """Schlüssel für "latest wins" oder None für ein wichtiges Event."""
+    if event_name == 'status_update' and isinstance(data, dict) and data.get('event') in CRITICAL_GAME_EVENTS:
+        return None
+    return SNAPSHOT_KEYS.get(event_name)
+
+
+class ClientQueue:
+    """Warteschlange und Sende-Greenlet eines Browsers."""
+
+    def __init__(self, sid, acks=False):
+        self.sid       = sid
+        self.items     = collections.deque()    # (event_name, data, snapshot_key)
+        self._wake     = Event()
+        self.acks      = acks                   # Bestätigt der Browser Events (beim Verbinden gemeldet)?
+        self.stats     = {'sent': 0, 'coalesced': 0, 'dropped': 0, 'ack_timeouts': 0, 'max_depth': 0, 'last_ack_ms': None}
+        self._greenlet = gevent.spawn(self._sender_loop)
+
+    def put(self, event_name, data):
+        key = _snapshot_key(event_name, data)
+        if key is not None:
+            # Ein noch nicht gesendetes älteres Event derselben Art ersetzen. Gesucht wird nur
+            # hinter dem letzten wichtigen Event, damit die Reihenfolge erhalten bleibt.
+            for index in range(len(self.items) - 1, -1, -1):
+                pending_key = self.items[index][2]
+                if pending_key is None:
+                    break
+                if pending_key == key:
+                    del self.items[index]
+                    self.stats['coalesced'] += 1
+                    break
+
+        if len(self.items) >= CLIENT_QUEUE_SIZE:
+            # Voll: das älteste Zustands-Event verwerfen, wichtige Events bleiben immer erhalten
+            for index, item in enumerate(self.items):
+                if item[2] is not None:
+                    del self.items[index]
+                    self.stats['dropped'] += 1
+                    break
+
+        self.items.append((event_name, data, key))
+        self.stats['max_depth'] = max(self.stats['max_depth'], len(self.items))
+        self._wake.set()
+
+    def _send(self, event_name, data):
+        args = () if data is None else (data,)   # Events ohne Daten (backend_disconnected) ohne Argument senden
+        if not self.acks:
+            g.socketio_server.emit(event_name, *args, to=self.sid)
+            return
+
+        acked   = Event()
+        started = time.perf_counter()
+        g.socketio_server.emit(event_name, *args, to=self.sid, callback=lambda *_: acked.set())
+        if acked.wait(ACK_TIMEOUT):
+            self.stats['last_ack_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        else:
+            # Langsamer Browser (z.B. Smart-TV beim ersten Rendern): weiter mit dem nächsten Event
+            self.stats['ack_timeouts'] += 1
+
+    def _sender_loop(self):
+        while True:
+            while not self.items:
+                self._wake.clear()
+                self._wake.wait()
+            event_name, data, _ = self.items.popleft()
+            try:
+                self._send(event_name, data)
+                self.stats['sent'] += 1
+            except Exception as e:
+                logging.error("Event '%s' konnte nicht an %s gesendet werden: %s", event_name, self.sid, e)
+
+    def close(self):
+        self._greenlet.kill(block=False)
+
+#----------------------------------------------------
+
+def open_client(sid, auth=None):
+    """Legt die Warteschlange für einen neu verbundenen Browser an.
+
+        Args:
+            sid (str):   Session-ID des Browsers.
+            auth (dict): Die beim Verbinden mitgeschickten Daten, {'acks': True} wenn der
+                         Browser jedes Event bestätigt.
+    """
+    if sid not in _clients:
+        _clients[sid] = ClientQueue(sid, acks=isinstance(auth, dict) and auth.get('acks') is True)
+
+
+def close_client(sid):
+    """Entfernt die Warteschlange eines getrennten Browsers."""
+    client = _clients.pop(sid, None)
+    if client:
+        client.close()
+
+
+def send_to(sid, event_name, data=None):
+    """Stellt ein Event für einen Browser in dessen Warteschlange."""
+    client = _clients.get(sid)
+    if client:
+        client.put(event_name, data)
+
+
+def send_to_all(event_name, data=None):
+    """Stellt ein Event für alle verbundenen Browser in die Warteschlangen."""
+    for client in list(_clients.values()):
+        client.put(event_name, data)
+
+#----------------------------------------------------
+
+def client_queue_stats():
+    """Warteschlangen-Tiefe und Kennzahlen pro Browser für /metrics."""
+    return {
+        sid: dict(client.stats, depth=len(client.items), acks=client.acks)
+        for sid, client in list(_clients.items())
+    }
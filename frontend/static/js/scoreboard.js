@@ -101,7 +101,8 @@ Object.assign(UI, {
  $(document).ready(function() {
     
     // --- Socket.IO Event-Handler ---
-    socket = io();
+    // acks: Diese Seite bestätigt jedes Event (siehe unten), der Server wartet darauf
+    socket = io({ auth: { acks: true } });
 
     // Initiales UI-Setup wird an die Hilfsfunktion delegiert
     _setupInitialScreen();
@@ -120,7 +121,9 @@ Object.assign(UI, {
 
     //-------------------------------------------------------------
 
-    socket.on('backend_connected', (data) => {
+    // Der Server sendet das nächste Event erst nach der Bestätigung (ack) des vorigen und
+    // fasst bis dahin aufgelaufene Spielstände zusammen. Deshalb am Ende jedes Handlers ack().
+    socket.on('backend_connected', (data, ack) => {
         console.info("backend_connected")
         // Sobald dieses Event vom Frontend-Server kommt, wissen wir,
         // dass die Verbindung zum Backend steht und die Daten da sind.
@@ -137,11 +140,12 @@ Object.assign(UI, {
             // Die Funktion zum Neuzeichnen der Liste wird aufgerufen
             _setupInitialScreen();
         }
+        if (ack) ack();
     });
     
     //-------------------------------------------------------------
 
-    socket.on('backend_disconnected', () => {
+    socket.on('backend_disconnected', (ack) => {
         console.info("backend_disconnected")
         console.warn('Vom Frontend-Server gemeldet: Verbindung zum Backend verloren!');
 
@@ -149,6 +153,7 @@ Object.assign(UI, {
 
         _BackendOffline()
 
+        if (typeof ack === 'function') ack();
     });
 
 
@@ -158,17 +163,22 @@ Object.assign(UI, {
      * @summary Der zentrale Einstiegspunkt, wenn ein Update vom Server kommt.
      * Orchestriert den gesamten Update-Prozess.
      */
-    socket.on('status_update', (data) => {
+    socket.on('status_update', (data, ack) => {
         console.log('Neuer Status vom Server empfangen:', data);
 
-        // SCHRITT 1: Immer zuerst den globalen Zustand aktualisieren
-        _cacheLatestServerState(data);
-        
-        // SCHRITT 2: Auf spezielle Events reagieren (Overlays, Feuerwerk, etc.)
-        _processGameNotifications();
-        
-        // SCHRITT 3: Den finalen Zustand auf dem Bildschirm zeichnen
-        _routeToGameViewUpdater();
+        try {
+            // SCHRITT 1: Immer zuerst den globalen Zustand aktualisieren
+            _cacheLatestServerState(data);
+
+            // SCHRITT 2: Auf spezielle Events reagieren (Overlays, Feuerwerk, etc.)
+            _processGameNotifications();
+
+            // SCHRITT 3: Den finalen Zustand auf dem Bildschirm zeichnen
+            _routeToGameViewUpdater();
+        } finally {
+            // Erst nach dem Zeichnen bestätigen, sonst kommt der nächste Stand zu früh
+            if (ack) ack();
+        }
     });
 
 });
@@ -4,9 +4,12 @@ gevent.monkey.patch_all()
 
 import os
 import ssl
+import time
+import itertools
+import collections
 import requests
-from flask import Flask, render_template
-from flask_socketio import SocketIO
+from flask import Flask, render_template, request
+from flask_socketio import SocketIO, emit
 import socketio as sio_module
 
 from gevent.pywsgi import WSGIServer
@@ -41,6 +44,41 @@ sio_client = sio_module.Client(
     reconnection=True, reconnection_delay=5
 )
 
+# Letzter vollständiger Stand der Board-Telemetrie (Backend schickt danach nur Änderungen)
+latest_telemetry = {}
+
+# --- Zuordnung der Befehls-Antworten ---
+# Jeder Befehl eines Browsers bekommt eine eigene callback_id für das Backend. Die Antwort geht
+# anhand dieser Zuordnung nur an den Browser, der gefragt hat (statt an alle), mit seiner
+# ursprünglichen callback_id. Unbeantwortete Einträge verfallen nach RPC_EXPIRY Sekunden.
+RPC_EXPIRY = 120              # länger als das größte Zeitlimit eines Befehls im Backend (calibrate_all: 90 s)
+MAX_IN_FLIGHT_PER_CLIENT = 8  # offene Befehle pro Browser, weitere werden sofort abgelehnt
+
+pending_rpcs = collections.OrderedDict()  # Relay-ID -> (Browser-sid, callback_id des Browsers, Ablaufzeit)
+in_flight    = collections.Counter()      # Browser-sid -> Anzahl offener Befehle
+rpc_ids      = itertools.count(1)
+
+def _expire_rpcs():
+    """Entfernt verfallene Einträge (die ältesten stehen vorne)."""
+    now = time.monotonic()
+    while pending_rpcs:
+        relay_id, (sid, _, expires_at) = next(iter(pending_rpcs.items()))
+        if expires_at > now:
+            break
+        _pop_rpc(relay_id)
+
+def _pop_rpc(relay_id):
+    entry = pending_rpcs.pop(relay_id, None)
+    if entry:
+        sid = entry[0]
+        in_flight[sid] -= 1
+        if in_flight[sid] <= 0:
+            del in_flight[sid]
+    return entry
+
+def _reject(sid, callback_id, message):
+    socketio_server.emit('command_response', {'callback_id': callback_id, 'data': {'error': message}}, to=sid)
+
 # --- NEU: Gekapselte Initialisierungs-Logik ---
 def start_backend_client():
     """Baut die Verbindung zum Haupt-Backend auf."""
@@ -48,7 +86,8 @@ def start_backend_client():
         sio_client.connect(
             f'wss://{g.SERVER_ADDRESS}',
             transports=['websocket'],
-            socketio_path='/api/socket.io/'
+            socketio_path='/api/socket.io/',
+            auth={'role': 'cmd'} # Das Backend schickt nur Events für cmd-Seiten (socket_rooms.py)
         )
     except Exception as e:
         print(f"Fehler bei initialer Backend-Verbindung (wird im Hintergrund weiter versucht): {e}")
@@ -65,22 +104,82 @@ def cmd_page():
 @sio_client.event
 def connect():
     print(f"✅ Erfolgreich mit dem Backend-Hub ({g.SERVER_ADDRESS}) verbunden!")
+    # Ein Abo für alle Browser: Das Backend fragt den Board Manager nur einmal ab
+    sio_client.emit('subscribe_telemetry')
 
 @sio_client.event
 def disconnect():
     print(f"🔌 Verbindung zum Backend-Hub ({g.SERVER_ADDRESS}) verloren!")
+    # Auf offene Befehle kommt keine Antwort mehr
+    for relay_id in list(pending_rpcs):
+        sid, callback_id, _ = _pop_rpc(relay_id)
+        _reject(sid, callback_id, "Verbindung zum Backend verloren.")
 
 @socketio_server.on('command')
 def forward_command_to_backend(data):
+    sid = request.sid
+    callback_id = data.get('callback_id')
     # Zusätzliche Sicherheitsprüfung
-    if sio_client.connected:
-        sio_client.emit('command', data)
-    else:
+    if not sio_client.connected:
         print("Befehl konnte nicht weitergeleitet werden: Keine Verbindung zum Backend.")
+        if callback_id:
+            _reject(sid, callback_id, "Keine Verbindung zum Backend.")
+        return
+
+    if not callback_id:
+        # Ohne callback_id erwartet der Browser keine Antwort
+        sio_client.emit('command', data)
+        return
+
+    _expire_rpcs()
+    if in_flight[sid] >= MAX_IN_FLIGHT_PER_CLIENT:
+        _reject(sid, callback_id, "Zu viele offene Befehle, bitte warten.")
+        return
+
+    relay_id = f"r{next(rpc_ids)}"
+    pending_rpcs[relay_id] = (sid, callback_id, time.monotonic() + RPC_EXPIRY)
+    in_flight[sid] += 1
+    sio_client.emit('command', dict(data, callback_id=relay_id))
 
 @sio_client.on('command_response')
 def forward_response_to_browser(data):
-    socketio_server.emit('command_response', data)
+    entry = _pop_rpc(data.get('callback_id'))
+    if entry is None:
+        return # verfallen oder Browser bereits getrennt
+    sid, callback_id, _ = entry
+    socketio_server.emit('command_response', dict(data, callback_id=callback_id), to=sid)
+
+@sio_client.on('board_telemetry')
+def forward_telemetry_to_browser(data):
+    if data.get('full'):
+        latest_telemetry.clear()
+    latest_telemetry.update(data)
+    socketio_server.emit('board_telemetry', data)
+
+@sio_client.on('board_config')
+def forward_config_changes_to_browser(data):
+    socketio_server.emit('board_config', data)
+
+@sio_client.on('board_calibration')
+def forward_calibration_progress_to_browser(data):
+    socketio_server.emit('board_calibration', data)
+
+@sio_client.on('Board Status')
+def forward_board_status_to_browser(data):
+    socketio_server.emit('board_status', data.get('data', {}))
+
+@socketio_server.on('connect')
+def send_telemetry_snapshot():
+    # Neue Browser bekommen sofort den vollständigen Stand
+    if latest_telemetry:
+        emit('board_telemetry', dict(latest_telemetry, full=True))
+
+@socketio_server.on('disconnect')
+def forget_browser_rpcs():
+    # Antworten an einen getrennten Browser werden verworfen
+    sid = request.sid
+    for relay_id in [rid for rid, entry in pending_rpcs.items() if entry[0] == sid]:
+        _pop_rpc(relay_id)
 
 # --- Haupt-Ausführungsblock für direkten Start ---
 if __name__ == '__main__':
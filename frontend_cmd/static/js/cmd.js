@@ -2,23 +2,57 @@ $(document).ready(function() {
     const socket = io();
     let dashboardInterval = null;
 
-    // --- Hilfsfunktionen zum Senden von Befehlen (unverändert) ---
-    const commandCallbacks = {};
+    // Stats und Kamera-Daten schickt das Backend per 'board_telemetry' (nur Änderungen),
+    // Änderungen der Konfiguration per 'board_config'. Nur die Board-Adresse wird abgefragt.
+    const telemetry = { stats: null, cams_stats: null, cams_state: null };
+    let config = null;
+    let configVersion = null;
+    let boardAddress = null;
+
+    // --- Hilfsfunktionen zum Senden von Befehlen ---
+    // Die Antwort ('command_response') bekommt nur dieser Browser, der Relay ordnet sie zu.
+    const RPC_TIMEOUT_MS = 20000;
+    const RPC_TIMEOUTS_MS = { calibrate_board: 40000, restart_board: 40000, calibrate_all: 100000 }; // Backend: 30 s / 90 s
+    const pendingCommands = {};
     let commandId = 0;
+
+    /**
+     * @summary Sendet einen Befehl und wartet auf die Antwort.
+     * @returns {Promise} Wird mit den Antwortdaten erfüllt (Fehler des Befehls als { error }),
+     *                    abgelehnt, wenn keine Verbindung besteht oder die Antwort ausbleibt.
+     */
+    function rpc(action, params = {}, timeoutMs = RPC_TIMEOUTS_MS[action] || RPC_TIMEOUT_MS) {
+        return new Promise((resolve, reject) => {
+            if (!socket || !socket.connected) {
+                reject(new Error("Socket ist nicht verbunden."));
+                return;
+            }
+            const id = ++commandId;
+            const timer = setTimeout(() => {
+                delete pendingCommands[id];
+                reject(new Error(`Keine Antwort auf '${action}' nach ${timeoutMs / 1000} s.`));
+            }, timeoutMs);
+            pendingCommands[id] = (data) => { clearTimeout(timer); resolve(data); };
+            socket.emit('command', { action, params, callback_id: id });
+        });
+    }
+
     function sendCommand(action, params, callback) {
-        if (socket && socket.connected) {
-            commandId++;
-            if (callback) commandCallbacks[commandId] = callback;
-            socket.emit('command', { action, params, callback_id: commandId });
-        } else if (callback) {
-            callback({ error: "Socket ist nicht verbunden." });
-        }
+        rpc(action, params).then(
+            (data) => { if (callback) callback(data); },
+            (error) => {
+                console.warn(error.message);
+                if (callback) callback({ error: error.message });
+            }
+        );
     }
+
     socket.on('command_response', (response) => {
         const { callback_id, data } = response;
-        if (commandCallbacks[callback_id]) {
-            commandCallbacks[callback_id](data);
-            delete commandCallbacks[callback_id];
+        const resolve = pendingCommands[callback_id];
+        if (resolve) {
+            delete pendingCommands[callback_id];
+            resolve(data);
         }
     });
 
@@ -33,30 +67,85 @@ $(document).ready(function() {
         stopDashboardInterval();
     });
 
+    socket.on('board_telemetry', (data) => {
+        for (const key of Object.keys(telemetry)) {
+            if (data[key] !== undefined) telemetry[key] = data[key];
+        }
+        render();
+    });
+
+    // Geänderte Werte der Board-Konfiguration ({'cam.fps_max': 30, ...}) übernehmen
+    socket.on('board_config', (data) => {
+        if (!config || (configVersion !== null && data.version !== configVersion + 1)) {
+            // Kein Stand oder eine Änderung verpasst: komplett neu laden
+            configVersion = data.version;
+            loadConfig();
+            return;
+        }
+        configVersion = data.version;
+        for (const [path, value] of Object.entries(data.changes)) {
+            const keys = path.split('.');
+            let target = config;
+            keys.slice(0, -1).forEach(key => { target = target[key] = target[key] ?? {}; });
+            target[keys[keys.length - 1]] = value;
+        }
+        render();
+    });
+
     // --- Aktions-Buttons (unverändert) ---
     $('#start-board-btn').on('click', () => sendCommand('start_board'));
     $('#stop-board-btn').on('click', () => sendCommand('stop_board'));
     $('#reset-board-btn').on('click', () => sendCommand('reset_board'));
-    $('#calibrate-board-btn').on('click', () => sendCommand('calibrate_board'));
+    $('#calibrate-board-btn').on('click', () => {
+        // Alle Kameras gleichzeitig, der Fortschritt kommt per 'board_calibration'
+        $('#calibration-status').text('Kalibrierung gestartet...');
+        rpc('calibrate_all').catch((error) => $('#calibration-status').text(error.message));
+    });
+
+    // Status-Meldungen des Boards (z.B. 'Takeout Started', 'Board Stopped')
+    socket.on('board_status', (data) => {
+        $('#board-status').text(data.status || '');
+    });
+
+    // Fortschritt der Kalibrierung: { started, cams } / { cam, state, ... } / { finished, total_ms, estimated_sequential_ms, ... }
+    const calibrationStates = [];
+    socket.on('board_calibration', (data) => {
+        if (data.started) {
+            calibrationStates.length = 0;
+        } else if (data.cam !== undefined) {
+            calibrationStates[data.cam] = data.state;
+        }
+        let text = calibrationStates.map((state, i) => `Kamera ${i}: ${state}`).join(' | ');
+        if (data.finished) {
+            text += ` | Fertig in ${(data.total_ms / 1000).toFixed(1)} s (nacheinander geschätzt ${(data.estimated_sequential_ms / 1000).toFixed(1)} s)`;
+        }
+        $('#calibration-status').text(text || 'Kalibrierung läuft...');
+    });
 
     /**
-     * @summary Ruft alle benötigten Daten vom Backend ab und aktualisiert die Tabelle.
+     * @summary Lädt die vollständige Konfiguration (beim Verbinden oder nach einer verpassten Änderung).
+     */
+    function loadConfig() {
+        sendCommand('get_config', {}, (result) => {
+            config = result;
+            render();
+        });
+    }
+
+    /**
+     * @summary Ruft die Board-Adresse vom Backend ab und aktualisiert die Tabelle.
      */
     function updateDashboard() {
-        // Führe alle 5 Anfragen parallel aus
-        const configPromise = new Promise(resolve => sendCommand('get_config', {}, resolve));
-        const statsPromise = new Promise(resolve => sendCommand('get_stats', {}, resolve));
-        const camsStatePromise = new Promise(resolve => sendCommand('get_cams_state', {}, resolve));
-        const boardAddressPromise = new Promise(resolve => sendCommand('get_board_address', {}, resolve));
-        const camsStatsPromise = new Promise(resolve => sendCommand('get_cams_stats', {}, resolve)); // HIER: Der fehlende Aufruf
-
-        // Warte, bis alle 5 Antworten da sind
-        Promise.all([configPromise, statsPromise, camsStatePromise, boardAddressPromise, camsStatsPromise]).then((results) => {
-            const [config, stats, camsState, boardAddress, camsStats] = results;
-            renderTable(config, stats, camsState, boardAddress, camsStats);
+        sendCommand('get_board_address', {}, (result) => {
+            boardAddress = result;
+            render();
         });
     }
 
+    function render() {
+        renderTable(config, telemetry.stats, telemetry.cams_state, boardAddress, telemetry.cams_stats);
+    }
+
     /**
      * @summary Zeichnet die HTML-Tabelle mit den gesammelten Daten.
      */
@@ -110,8 +199,9 @@ $(document).ready(function() {
     
     function startDashboardInterval() {
         stopDashboardInterval();
+        loadConfig();
         updateDashboard(); // Einmal sofort ausführen
-        dashboardInterval = setInterval(updateDashboard, 1000); // Dann jede Sekunde
+        dashboardInterval = setInterval(updateDashboard, 10000); // Dann alle 10 Sekunden
     }
 
     function stopDashboardInterval() {
@@ -16,6 +16,7 @@ BACKEND_DIR = os.path.join(SCRIPT_DIR, "backend")
 FRONTEND_DIR = os.path.join(SCRIPT_DIR, "frontend")
 VENV_DIR = os.path.join(SCRIPT_DIR, "venv")
 REQUIREMENTS_FILE = os.path.join(SCRIPT_DIR, "requirements.txt")
+REQUIREMENTS_MARIADB_FILE = os.path.join(SCRIPT_DIR, "requirements-mariadb.txt")
 CONFIG_FILE = os.path.join(BACKEND_DIR, "config.py")
 ENV_FILE = os.path.join(BACKEND_DIR, ".env")
 DB_SCHEMA_FILE = os.path.join(BACKEND_DIR, "docs", "database_schema.sql")
@@ -150,7 +151,7 @@ def check_system():
 
 #-------------------------------------------------------------------------
     
-def setup_venv():
+def setup_venv(db_backend):
     print_header("Virtuelle Umgebung (venv) einrichten")
     if os.path.exists(VENV_DIR):
         print_success("Virtuelle Umgebung existiert bereits.")
@@ -169,6 +170,35 @@ def setup_venv():
     except FileNotFoundError:
         print_error(f"Datei nicht gefunden: {REQUIREMENTS_FILE}. Stelle sicher, dass sie existiert.")
 
+    # Der MariaDB-Connector wird nur für einen externen MariaDB-Server benötigt
+    if db_backend == 'mariadb':
+        print("Installiere den MariaDB-Connector aus requirements-mariadb.txt...")
+        try:
+            subprocess.check_call([pip_executable, "install", "-r", REQUIREMENTS_MARIADB_FILE])
+            print_success("MariaDB-Connector erfolgreich installiert.")
+        except subprocess.CalledProcessError as e:
+            print_error(f"Fehler bei der Installation des MariaDB-Connectors: {e}")
+
+#-------------------------------------------------------------------------
+    
+def choose_db_backend():
+    """Fragt, ob und mit welchem Backend Langzeit-Statistiken gespeichert werden sollen.
+
+        Returns:
+            'sqlite', 'mariadb' oder None (keine Datenbank).
+    """
+    print_header("Datenbank für Langzeit-Statistiken")
+    if not ask_question("Möchtest du eine Datenbank für Langzeit-Statistiken verwenden?"):
+        return None
+
+    print("  1 = SQLite  (lokale Datei, kein Datenbank-Server nötig, empfohlen für den Raspberry Pi)")
+    print("  2 = MariaDB (externer MariaDB/MySQL-Server)")
+    while True:
+        choice = input(f"{color.YELLOW}❓ Welches Datenbank-Backend soll verwendet werden? [1]: {color.END}").strip() or '1'
+        if choice in ['1', '2']:
+            return 'sqlite' if choice == '1' else 'mariadb'
+        print_error("Ungültige Eingabe. Bitte nur '1' oder '2' eingeben.", exit_script=False)
+
 #-------------------------------------------------------------------------
     
 def get_db_credentials():
@@ -273,14 +303,26 @@ def save_config(use_db, db_config, ad_config):
     
 #-------------------------------------------------------------------------
     
-def configure_application():
+def configure_application(db_backend):
     db_config = {}
-    use_db = ask_question("Möchtest du die MariaDB-Datenbank für Langzeit-Statistiken verwenden?")
-    if use_db:
+    use_db = db_backend is not None
+    if db_backend == 'sqlite':
+        # Die SQLite-Datei und ihre Tabellen legt das Backend beim ersten Start selbst an.
+        # Die MariaDB-Zugangsdaten bleiben leer, damit kein alter Wert stehen bleibt.
+        db_config = {
+            'DB_BACKEND':     'sqlite',
+            'DB_SQLITE_PATH': 'data/statistics.db',
+            'DB_USER':        '',
+            'DB_PASSWORD':    '',
+            'DB_HOST':        '',
+            'DB_DATABASE':    ''
+        }
+    elif db_backend == 'mariadb':
         db_config = get_db_credentials()
         if not setup_database(db_config):
             use_db = False
             print_warning("Datenbank-Setup fehlgeschlagen. DB-Nutzung wird deaktiviert.")
+        db_config['DB_BACKEND'] = 'mariadb'
     ad_config = get_autodarts_credentials()
     save_config(use_db, db_config, ad_config)
 
@@ -669,13 +711,15 @@ if __name__ == "__main__":
  
     print_header("Prüfe System-Voraussetzungen...")
     check_and_install_venv(USE_SUDO)
-    check_and_install_mariadb_dev(USE_SUDO)
+    db_backend = choose_db_backend()
+    if db_backend == 'mariadb':
+        check_and_install_mariadb_dev(USE_SUDO)
     check_and_install_build_tools(USE_SUDO)
     print_success("Alle System-Voraussetzungen sind erfüllt.")
     
     check_system()
-    setup_venv()
-    configure_application()
+    setup_venv(db_backend)
+    configure_application(db_backend)
 
      # Entscheide hier, welche Funktion aufgerufen wird
     if service_type == 'user':